@@ -0,0 +1,37 @@
+"""
+Measure how the throughput of `MatchDataProcessor.process_matches` scales
+with the number of worker processes.
+
+Usage: python -m benchmarks.batch_processing [n_matches] [max_workers]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.innings_builder import make_match
+from cricsheet.match_data_processor import MatchBatch, MatchDataProcessor
+
+
+def main(n_matches: int = 400, max_workers: int = os.cpu_count() or 1):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_idx in range(n_matches):
+            with open(Path(temp_dir) / f"{match_idx}.json", "w") as f:
+                json.dump(make_match(seed=match_idx), f)
+
+        print(f"{n_matches} matches, {os.cpu_count()} CPUs")
+        n_workers: int = 1
+        while n_workers <= max_workers:
+            start: float = time.perf_counter()
+            match_batch: MatchBatch = MatchDataProcessor.process_matches(temp_dir, n_workers=n_workers)
+            elapsed: float = time.perf_counter() - start
+            assert not match_batch.errors
+            print(f"{n_workers:>3} workers: {n_matches / elapsed:>8,.1f} matches/s, "
+                  f"{len(match_batch.ball_by_ball) / elapsed:>10,.0f} rows/s")
+            n_workers *= 2
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,105 @@
+"""
+Compare how fast the same matches are turned into ball-by-ball tables from
+Cricsheet's JSON and CSV formats.
+
+Usage: python -m benchmarks.csv_vs_json [n_matches] [n_overs]
+"""
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+from benchmarks.innings_builder import make_match
+from cricsheet.match_data_processor import MatchDataProcessor
+
+
+def to_csv2(match: dict, match_id: str) -> Tuple[str, str]:
+    """
+    Write a match in the JSON format out in the CSV format.
+
+    :return: Contents of the ball-by-ball file and of the info file.
+    """
+    info: dict = match["info"]
+    teams: list = info["teams"]
+
+    ball_by_ball = io.StringIO()
+    writer = csv.writer(ball_by_ball, lineterminator="\n")
+    writer.writerow([
+        "match_id", "season", "start_date", "venue", "innings", "ball", "batting_team", "bowling_team",
+        "striker", "non_striker", "bowler", "runs_off_bat", "extras", "wides", "noballs", "byes",
+        "legbyes", "penalty", "wicket_type", "player_dismissed", "other_wicket_type",
+        "other_player_dismissed"
+    ])
+    for innings_idx, innings in enumerate(match["innings"]):
+        batting_team: str = innings["team"]
+        bowling_team: str = teams[1] if batting_team == teams[0] else teams[0]
+        for over in innings["overs"]:
+            for ball, delivery in enumerate(over["deliveries"], start=1):
+                extras: dict = delivery.get("extras", {})
+                wicket: dict = delivery.get("wickets", [{}])[0]
+                writer.writerow([
+                    match_id, info["season"], info["dates"][0], info["venue"], innings_idx + 1,
+                    f"{over['over']}.{ball}", batting_team, bowling_team, delivery["batter"],
+                    delivery["non_striker"], delivery["bowler"], delivery["runs"]["batter"],
+                    delivery["runs"]["extras"]
+                ] + [extras.get(kind, "") for kind in ["wides", "noballs", "byes", "legbyes", "penalty"]] + [
+                    wicket.get("kind", ""), wicket.get("player_out", ""), "", ""
+                ])
+
+    info_rows: list = [["version", "2.1.0"], ["info", "balls_per_over", info["balls_per_over"]]]
+    info_rows += [["info", "team", team] for team in teams]
+    info_rows += [["info", key, info[key]] for key in ["gender", "season", "match_type", "team_type"]]
+    info_rows += [["info", "date", date.replace("-", "/")] for date in info["dates"]]
+    info_rows += [
+        ["info", "venue", info["venue"]],
+        ["info", "city", info["city"]],
+        ["info", "toss_winner", info["toss"]["winner"]],
+        ["info", "toss_decision", info["toss"]["decision"]]
+    ]
+    info_rows += [["info", "umpire", umpire] for umpire in info["officials"]["umpires"]]
+    info_rows += [["info", "reserve_umpire", umpire] for umpire in info["officials"]["reserve_umpires"]]
+    info_rows += [["info", "match_referee", referee] for referee in info["officials"]["match_referees"]]
+    info_rows += [["info", "winner", info["outcome"]["winner"]]]
+    info_rows += [["info", f"winner_{key}", value] for key, value in info["outcome"]["by"].items()]
+    info_rows += [["info", "player", team, player] for team in teams for player in info["players"][team]]
+    info_rows += [["info", "registry", "people", name, registry_id]
+                  for name, registry_id in info["registry"]["people"].items()]
+    info_file = io.StringIO()
+    csv.writer(info_file, lineterminator="\n").writerows(info_rows)
+
+    return ball_by_ball.getvalue(), info_file.getvalue()
+
+
+def main(n_matches: int = 200, n_overs: int = 90):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_dir: Path = Path(temp_dir) / "json"
+        csv_dir: Path = Path(temp_dir) / "csv"
+        json_dir.mkdir()
+        csv_dir.mkdir()
+        n_rows: int = 0
+        for match_idx in range(n_matches):
+            match: dict = make_match(n_innings=4, n_overs=n_overs, seed=match_idx)
+            n_rows += sum(len(over["deliveries"]) for innings in match["innings"] for over in innings["overs"])
+            (json_dir / f"{match_idx}.json").write_text(json.dumps(match))
+            ball_by_ball_csv, info_csv = to_csv2(match, str(match_idx))
+            (csv_dir / f"{match_idx}.csv").write_text(ball_by_ball_csv)
+            (csv_dir / f"{match_idx}_info.csv").write_text(info_csv)
+
+        print(f"{n_matches} four-innings matches x {n_overs} overs ({n_rows} deliveries)")
+        for name, data_dir in [("json", json_dir), ("csv", csv_dir)]:
+            match_fps: list = sorted(str(fp) for fp in data_dir.iterdir() if not fp.stem.endswith("_info"))
+            start: float = time.perf_counter()
+            for match_fp in match_fps:
+                match_data_processor = MatchDataProcessor(match_fp)
+                match_data_processor.get_match_info()
+                match_data_processor.get_ball_by_ball_table()
+            elapsed: float = time.perf_counter() - start
+            print(f"{name:>5}: {n_matches / elapsed:>8,.1f} matches/s, {n_rows / elapsed:>10,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,58 @@
+"""
+Compare the rows/second of each `DatabaseManager.update_table` method when
+loading ball-by-ball data into Postgres.
+
+Connection settings default to the container started by
+`code_from_lectures/week_1/ingest_data_in_postgres/simple_postgres_container.sh`
+and can be overridden with the CRICSHEET_DB_HOST, CRICSHEET_DB_PORT,
+CRICSHEET_DB_USERNAME, CRICSHEET_DB_PASSWORD and CRICSHEET_DB_NAME
+environment variables.
+
+Usage: python -m benchmarks.database_load [n_matches] [chunk_size]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from benchmarks.innings_builder import make_innings
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder
+from cricsheet.database_manager import DEFAULT_CHUNK_SIZE, UPDATE_TABLE_METHODS, DatabaseManager
+
+
+def make_ball_by_ball_table(n_matches: int, n_overs: int = 50) -> pd.DataFrame:
+    tables: list = []
+    for match_idx in range(n_matches):
+        table_builder = BallByBallTableBuilder(f"match_{match_idx}")
+        for innings_idx in range(2):
+            table_builder.add_innings(make_innings(n_overs, seed=2 * match_idx + innings_idx), "Team", innings_idx)
+        tables.append(table_builder.to_frame())
+    return pd.concat(tables, ignore_index=True)
+
+
+def main(n_matches: int = 100, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    database_manager = DatabaseManager(
+        os.environ.get("CRICSHEET_DB_HOST", "localhost"),
+        os.environ.get("CRICSHEET_DB_PORT", "5432"),
+        os.environ.get("CRICSHEET_DB_USERNAME", "root"),
+        os.environ.get("CRICSHEET_DB_PASSWORD", "root"),
+        os.environ.get("CRICSHEET_DB_NAME", "test")
+    )
+    ball_by_ball_table: pd.DataFrame = make_ball_by_ball_table(n_matches)
+    print(f"{len(ball_by_ball_table)} deliveries, chunk size {chunk_size}")
+
+    for method in UPDATE_TABLE_METHODS:
+        db_table_name: str = f"benchmark_ball_by_ball_{method}"
+        database_manager.create_table(db_table_name, ball_by_ball_table)
+        start: float = time.perf_counter()
+        database_manager.update_table(db_table_name, ball_by_ball_table, method=method, chunk_size=chunk_size)
+        elapsed: float = time.perf_counter() - start
+        print(f"{method:>8}: {len(ball_by_ball_table) / elapsed:>12,.0f} rows/s")
+        with database_manager.db_engine.begin() as conn:
+            conn.execute(text(f'DROP TABLE "{db_table_name}"'))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
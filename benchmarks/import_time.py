@@ -0,0 +1,88 @@
+"""
+Measure the import time of cricsheet modules with `python -X importtime`, and
+fail if any of them goes over its budget or imports one of the heavy
+dependencies, e.g. because a module started importing pandas, pyarrow or
+SQLAlchemy at the top level again.
+
+Each module is imported in a fresh interpreter `repeat` times, and the fastest
+run is compared with its budget, as the others mostly measure disk caches.
+
+Usage: python -m benchmarks.import_time [repeat]
+"""
+import subprocess
+import sys
+from typing import Dict, List
+
+# Budget of the cumulative import time of each module, in milliseconds: the
+# slowest of several measurements of the fastest of 5 runs, plus about 20%.
+IMPORT_TIME_BUDGETS_MS: Dict[str, float] = {
+    "cricsheet.country_resolver": 45,
+    "cricsheet.match_json_parser": 55,
+    "cricsheet.match_csv_parser": 55,
+    "cricsheet.match_data_processor": 70,
+    "cricsheet.database_manager": 50,
+    "cricsheet.data_ingestion_manager": 155,
+    "cricsheet.backfill_manager": 90,
+    "cricsheet.cli": 175,
+}
+
+# Dependencies none of the modules above may import, whatever their import
+# time, as they are only needed by some of their functions.
+HEAVY_DEPENDENCIES: List[str] = ["pandas", "sqlalchemy", "pyarrow", "geopy"]
+
+
+def get_import_time_ms(module_name: str) -> float:
+    """
+    Cumulative import time of a module in a fresh interpreter, as reported by
+    `python -X importtime`, whose last line is the requested module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # Lines look like "import time: self [us] | cumulative | imported package".
+    last_line: str = result.stderr.strip().splitlines()[-1]
+    return int(last_line.split("|")[1]) / 1000
+
+
+def get_heavy_dependencies(module_name: str) -> List[str]:
+    """
+    Those of `HEAVY_DEPENDENCIES` that are in `sys.modules` after importing a
+    module in a fresh interpreter.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module_name}\n"
+            f"print(' '.join(m for m in {HEAVY_DEPENDENCIES!r} if m in sys.modules))"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return result.stdout.split()
+
+
+def main(repeat: int = 5):
+    failures: List[str] = []
+    for module_name, budget_ms in IMPORT_TIME_BUDGETS_MS.items():
+        import_time_ms: float = min(get_import_time_ms(module_name) for _ in range(repeat))
+        heavy_dependencies: List[str] = get_heavy_dependencies(module_name)
+        status: str = "ok"
+        if import_time_ms > budget_ms:
+            status = "OVER BUDGET"
+            failures.append(f"{module_name} is over its import time budget")
+        if heavy_dependencies:
+            status = f"IMPORTS {', '.join(heavy_dependencies)}"
+            failures.append(f"{module_name} imports {', '.join(heavy_dependencies)}")
+        print(f"{module_name:>34}: {import_time_ms:7.1f} ms (budget {budget_ms:.0f} ms) {status}")
+
+    if failures:
+        sys.exit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
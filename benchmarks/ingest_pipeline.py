@@ -0,0 +1,76 @@
+"""
+Compare ingesting an archive of synthetic matches into Postgres with
+`DataIngestionManager.ingest_data`, which decompresses, parses and loads one
+stage after the other, against `ingest_data_concurrently`, which overlaps the
+stages. Each run loads into an empty throwaway schema.
+
+Postgres connection settings are read as in `benchmarks.database_load`.
+
+Usage: python -m benchmarks.ingest_pipeline [n_matches] [n_workers]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+from pathlib import Path
+
+from sqlalchemy import text
+
+from benchmarks.innings_builder import make_match
+from cricsheet.data_ingestion_manager import DataIngestionManager, IngestReport
+from cricsheet.database_manager import DatabaseManager
+
+
+def make_database_manager(schema: str) -> DatabaseManager:
+    return DatabaseManager(
+        os.environ.get("CRICSHEET_DB_HOST", "localhost"),
+        os.environ.get("CRICSHEET_DB_PORT", "5432"),
+        os.environ.get("CRICSHEET_DB_USERNAME", "root"),
+        os.environ.get("CRICSHEET_DB_PASSWORD", "root"),
+        os.environ.get("CRICSHEET_DB_NAME", "test"),
+        connect_args={"options": f"-csearch_path={schema}"}
+    )
+
+
+def timed_ingest(zip_fp: str, concurrent: bool, n_workers: int) -> float:
+    schema: str = f"benchmark_{uuid.uuid4().hex}"
+    database_manager: DatabaseManager = make_database_manager(schema)
+    with database_manager.db_engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    try:
+        data_ingestion_manager = DataIngestionManager(zip_fp=zip_fp)
+        start: float = time.perf_counter()
+        if concurrent:
+            report: IngestReport = asyncio.run(data_ingestion_manager.ingest_data_concurrently(
+                database_manager, batch_size=100, n_workers=n_workers
+            ))
+        else:
+            report = data_ingestion_manager.ingest_data(database_manager, batch_size=100)
+        elapsed: float = time.perf_counter() - start
+        assert not report.errors, report.errors
+    finally:
+        with database_manager.db_engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        database_manager.db_engine.dispose()
+    return elapsed
+
+
+def main(n_matches: int = 1000, n_workers: int = os.cpu_count()):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        with zipfile.ZipFile(zip_fp, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+            for match_idx in range(n_matches):
+                zip_file.writestr(f"{match_idx}.json", json.dumps(make_match(2, 20, seed=match_idx)))
+
+        print(f"{n_matches} matches, {n_workers} workers")
+        for name, concurrent in [("serial", False), ("concurrent", True)]:
+            elapsed: float = timed_ingest(zip_fp, concurrent, n_workers)
+            print(f"{name:>11}: {elapsed:6.2f} s ({n_matches / elapsed:6.1f} matches/s)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
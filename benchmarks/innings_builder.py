@@ -0,0 +1,159 @@
+"""
+Compare the rows/second of building a match's ball-by-ball table with the
+columnar builder against the list-of-dicts construction it replaced.
+
+Usage: python -m benchmarks.innings_builder [n_matches] [n_overs]
+"""
+import random
+import sys
+import time
+import zlib
+from typing import Callable
+
+import pandas as pd
+
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder
+
+
+def make_innings(n_overs: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    players: list = [f"Player {i}" for i in range(22)]
+    overs: list = []
+    for over_idx in range(n_overs):
+        deliveries: list = []
+        for _ in range(6):
+            delivery: dict = {
+                "batter": rng.choice(players),
+                "bowler": rng.choice(players),
+                "non_striker": rng.choice(players),
+                "runs": {"batter": rng.choice([0, 0, 1, 1, 2, 4, 6]), "extras": 0, "total": 0}
+            }
+            if rng.random() < 0.05:
+                delivery["extras"] = {"wides": 1}
+                delivery["runs"]["extras"] = 1
+            if rng.random() < 0.03:
+                delivery["wickets"] = [{
+                    "player_out": delivery["batter"],
+                    "kind": "caught",
+                    "fielders": [{"name": rng.choice(players)}]
+                }]
+            deliveries.append(delivery)
+        overs.append({"over": over_idx, "deliveries": deliveries})
+    return overs
+
+
+def make_match(n_innings: int = 2, n_overs: int = 50, seed: int = 0) -> dict:
+    teams: list = ["Kenya", "Netherlands"]
+    players: dict = {team: [f"{team} player {i}" for i in range(11)] for team in teams}
+    return {
+        "meta": {"data_version": "1.0.0", "created": "2023-01-01", "revision": 1},
+        "info": {
+            "balls_per_over": 6,
+            "city": "Nairobi",
+            "dates": ["2022-01-01"],
+            "gender": "male",
+            "match_type": "ODI",
+            "officials": {
+                "match_referees": ["Referee"],
+                "reserve_umpires": ["Reserve umpire"],
+                "umpires": ["Umpire 1", "Umpire 2"]
+            },
+            "outcome": {"winner": "Kenya", "by": {"runs": 10}},
+            "players": players,
+            "registry": {"people": {player: f"{zlib.crc32(player.encode()):08x}"
+                                    for team in teams for player in players[team]}},
+            "season": "2022",
+            "team_type": "international",
+            "teams": teams,
+            "toss": {"decision": "bat", "winner": "Kenya"},
+            "venue": "Gymkhana Club Ground"
+        },
+        "innings": [
+            {"team": teams[innings_idx % 2], "overs": make_innings(n_overs, seed=n_innings * seed + innings_idx)}
+            for innings_idx in range(n_innings)
+        ]
+    }
+
+
+def legacy_parse_delivery(delivery_data: dict) -> dict:
+    # The per-delivery dict built by `MatchJSONParser` before the columnar
+    # builder was introduced.
+    parsed_delivery_data: dict = {
+        "batsman": delivery_data["batter"],
+        "bowler": delivery_data["bowler"],
+        "non_striker": delivery_data["non_striker"],
+        "runs_by_batsman": delivery_data["runs"]["batter"],
+        "extras_type": None,
+        "runs_from_extras": delivery_data["runs"]["extras"],
+        "dismissed_batsman": None,
+        "dismissal_type": None,
+        "fielders_in_dismissal": None
+    }
+
+    if "extras" in delivery_data:
+        parsed_delivery_data["extras_type"] = next(iter(delivery_data["extras"]))
+
+    if "wickets" in delivery_data:
+        parsed_delivery_data["dismissed_batsman"] = delivery_data["wickets"][0]["player_out"]
+        parsed_delivery_data["dismissal_type"] = delivery_data["wickets"][0]["kind"]
+        if "fielders" in delivery_data["wickets"][0]:
+            parsed_delivery_data["fielders_in_dismissal"] = [fl["name"]
+                                                             for fl in delivery_data["wickets"][0]["fielders"]]
+
+    return parsed_delivery_data
+
+
+def legacy_parse_innings(innings_ball_by_ball_data: list, batting_team: str, innings_idx: int) -> pd.DataFrame:
+    # The list-of-dicts implementation of `_get_parsed_innings_data` before
+    # the columnar builder was introduced.
+    innings_data: list = []
+    for overs_data in innings_ball_by_ball_data:
+        for dd in overs_data["deliveries"]:
+            delivery_data: dict = {
+                "match_id": "benchmark",
+                "innings": innings_idx + 1,
+                "over": overs_data["over"] + 1,
+                "batting_team": batting_team
+            }
+            delivery_data.update(legacy_parse_delivery(dd))
+            innings_data.append(delivery_data.copy())
+    return pd.DataFrame(innings_data)
+
+
+def legacy_parse_match(match_innings: list) -> pd.DataFrame:
+    return pd.concat([
+        legacy_parse_innings(overs, "Team", innings_idx)
+        for innings_idx, overs in enumerate(match_innings)
+    ]).reset_index(drop=True)
+
+
+def columnar_parse_match(match_innings: list) -> pd.DataFrame:
+    table_builder = BallByBallTableBuilder("benchmark")
+    for innings_idx, overs in enumerate(match_innings):
+        table_builder.add_innings(overs, "Team", innings_idx)
+    return table_builder.to_frame()
+
+
+def rows_per_second(parse: Callable, matches: list, repeat: int = 3) -> float:
+    best: float = float("inf")
+    n_rows: int = 0
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        n_rows = sum(len(parse(match_innings)) for match_innings in matches)
+        best = min(best, time.perf_counter() - start)
+    return n_rows / best
+
+
+def main(n_matches: int = 50, n_overs: int = 50):
+    matches: list = [
+        [make_innings(n_overs, seed=4 * match_idx + innings_idx) for innings_idx in range(4)]
+        for match_idx in range(n_matches)
+    ]
+    n_rows: int = n_matches * 4 * n_overs * 6
+    print(f"{n_matches} four-innings matches x {n_overs} overs ({n_rows} deliveries)")
+    for name, parse in [("list-of-dicts", legacy_parse_match), ("columnar", columnar_parse_match)]:
+        print(f"{name:>15}: {rows_per_second(parse, matches):>12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
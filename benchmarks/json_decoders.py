@@ -0,0 +1,63 @@
+"""
+Compare how many match files per second each installed JSON decoder reads
+and decodes, and how many the full `MatchJSONParser` then turns into
+ball-by-ball tables.
+
+Usage: python -m benchmarks.json_decoders [match_dir | n_matches]
+
+Without a directory of Cricsheet JSON files, that many synthetic ODI-length
+matches (default 200) are written to a temporary directory first.
+"""
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from benchmarks.innings_builder import make_match
+from cricsheet.country_resolver import CountryResolver, GazetteerBackend
+from cricsheet.json_decoder import available_json_decoders, get_json_decoder, read_json_bytes
+from cricsheet.match_json_parser import MatchJSONParser
+
+
+def files_per_second(process: Callable[[Path], object], match_fps: List[Path], repeat: int = 3) -> float:
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        for match_fp in match_fps:
+            process(match_fp)
+        best = min(best, time.perf_counter() - start)
+    return len(match_fps) / best
+
+
+def run(match_dir: Path):
+    match_fps: List[Path] = sorted(match_dir.glob("*.json"))
+    # Offline, so that geocoding does not dominate the parser timings.
+    country_resolver = CountryResolver(backends=[GazetteerBackend()])
+    print(f"{len(match_fps)} match files in {match_dir}")
+    print(f"{'decoder':>10} {'decode files/s':>15} {'parse files/s':>15}")
+    for name in available_json_decoders():
+        decode = get_json_decoder(name)
+        decode_rate: float = files_per_second(lambda fp: decode(read_json_bytes(fp)), match_fps)
+        parse_rate: float = files_per_second(
+            lambda fp: MatchJSONParser(fp, country_resolver, json_decoder=name).ball_by_ball_data,
+            match_fps
+        )
+        print(f"{name:>10} {decode_rate:>15,.0f} {parse_rate:>15,.0f}")
+
+
+def main(source: str = "200"):
+    if not source.isdigit():
+        run(Path(source))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_idx in range(int(source)):
+            match: dict = make_match(n_innings=2, n_overs=50, seed=match_idx)
+            (Path(temp_dir) / f"{1_000_000 + match_idx}.json").write_text(json.dumps(match, indent=2))
+        run(Path(temp_dir))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,46 @@
+"""
+Compare the memory taken by the ball-by-ball table of many matches with the
+default dtypes against the compact dtypes in
+`COMPACT_BALL_BY_BALL_COLUMN_DTYPES`.
+
+Usage: python -m benchmarks.memory_footprint [n_matches] [n_overs]
+"""
+import sys
+
+import pandas as pd
+
+from benchmarks.innings_builder import make_match
+from cricsheet.ball_by_ball_table_builder import (
+    BallByBallTableBuilder,
+    compact_ball_by_ball_table,
+    concat_ball_by_ball_tables
+)
+
+
+def build_table(match: dict, match_id: str) -> pd.DataFrame:
+    table_builder = BallByBallTableBuilder(match_id)
+    for innings_idx, innings in enumerate(match["innings"]):
+        table_builder.add_innings(innings["overs"], innings["team"], innings_idx)
+    return table_builder.to_frame()
+
+
+def main(n_matches: int = 500, n_overs: int = 50):
+    ball_by_ball_table: pd.DataFrame = concat_ball_by_ball_tables(
+        build_table(make_match(n_innings=2, n_overs=n_overs, seed=match_idx), str(1_000_000 + match_idx))
+        for match_idx in range(n_matches)
+    )
+    compact_table: pd.DataFrame = compact_ball_by_ball_table(ball_by_ball_table)
+
+    print(f"{n_matches} two-innings matches x {n_overs} overs ({len(ball_by_ball_table)} deliveries)")
+    default_bytes: pd.Series = ball_by_ball_table.memory_usage(deep=True, index=False)
+    compact_bytes: pd.Series = compact_table.memory_usage(deep=True, index=False)
+    for column in ball_by_ball_table.columns:
+        print(f"{column:>22}: {default_bytes[column] / 2 ** 20:8.1f} MiB -> "
+              f"{compact_bytes[column] / 2 ** 20:8.1f} MiB")
+    print(f"{'total':>22}: {default_bytes.sum() / 2 ** 20:8.1f} MiB -> "
+          f"{compact_bytes.sum() / 2 ** 20:8.1f} MiB "
+          f"({default_bytes.sum() / compact_bytes.sum():.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
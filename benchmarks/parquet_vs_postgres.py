@@ -0,0 +1,97 @@
+"""
+Compare loading ball-by-ball data into Postgres with `DatabaseManager` against
+writing it as a partitioned Parquet dataset with `ParquetManager`, and the time
+to then sum one season's runs from each.
+
+Postgres connection settings are read as in `benchmarks.database_load`.
+
+Usage: python -m benchmarks.parquet_vs_postgres [n_matches] [n_seasons]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import text
+
+from benchmarks.database_load import make_ball_by_ball_table
+from cricsheet.database_manager import DatabaseManager
+from cricsheet.parquet_manager import BALL_BY_BALL_TABLE_NAME, MATCH_INFO_TABLE_NAME, ParquetManager
+
+
+def make_match_info(n_matches: int, n_seasons: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "match_id": [f"match_{match_idx}" for match_idx in range(n_matches)],
+        "season": [str(2000 + match_idx % n_seasons) for match_idx in range(n_matches)],
+        "match_type": ["ODI" if match_idx % 3 else "T20" for match_idx in range(n_matches)],
+        "gender": ["female" if match_idx % 4 == 0 else "male" for match_idx in range(n_matches)],
+        "venue": "Gymkhana Club Ground"
+    })
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    start: float = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_matches: int = 1000, n_seasons: int = 10):
+    database_manager = DatabaseManager(
+        os.environ.get("CRICSHEET_DB_HOST", "localhost"),
+        os.environ.get("CRICSHEET_DB_PORT", "5432"),
+        os.environ.get("CRICSHEET_DB_USERNAME", "root"),
+        os.environ.get("CRICSHEET_DB_PASSWORD", "root"),
+        os.environ.get("CRICSHEET_DB_NAME", "test")
+    )
+    ball_by_ball_table: pd.DataFrame = make_ball_by_ball_table(n_matches)
+    match_info: pd.DataFrame = make_match_info(n_matches, n_seasons)
+    season: str = match_info["season"].iloc[0]
+    print(f"{n_matches} matches over {n_seasons} seasons, {len(ball_by_ball_table)} deliveries")
+
+    db_table_names: dict = {
+        MATCH_INFO_TABLE_NAME: f"benchmark_{MATCH_INFO_TABLE_NAME}",
+        BALL_BY_BALL_TABLE_NAME: f"benchmark_{BALL_BY_BALL_TABLE_NAME}"
+    }
+    try:
+        _, postgres_load_time = timed(lambda: [
+            database_manager.update_table(db_table_names[MATCH_INFO_TABLE_NAME], match_info),
+            database_manager.update_table(db_table_names[BALL_BY_BALL_TABLE_NAME], ball_by_ball_table)
+        ])
+        with database_manager.db_engine.connect() as conn:
+            postgres_runs, postgres_scan_time = timed(lambda: conn.execute(text(
+                f'SELECT sum(b.runs_by_batsman) FROM "{db_table_names[BALL_BY_BALL_TABLE_NAME]}" b '
+                f'JOIN "{db_table_names[MATCH_INFO_TABLE_NAME]}" m USING (match_id) '
+                f'WHERE m.season = :season'
+            ), {"season": season}).scalar())
+            postgres_bytes: int = sum(conn.execute(text(
+                f"SELECT pg_total_relation_size('\"{db_table_name}\"')"
+            )).scalar() for db_table_name in db_table_names.values())
+    finally:
+        with database_manager.db_engine.begin() as conn:
+            for db_table_name in db_table_names.values():
+                conn.execute(text(f'DROP TABLE IF EXISTS "{db_table_name}"'))
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        parquet_manager = ParquetManager(data_dir)
+        _, parquet_load_time = timed(lambda: [
+            parquet_manager.update_table(MATCH_INFO_TABLE_NAME, match_info, match_info),
+            parquet_manager.update_table(BALL_BY_BALL_TABLE_NAME, ball_by_ball_table, match_info)
+        ])
+        parquet_runs, parquet_scan_time = timed(lambda: parquet_manager.read_table(
+            BALL_BY_BALL_TABLE_NAME, columns=["runs_by_batsman"], season=season
+        )["runs_by_batsman"].sum())
+        parquet_bytes: int = sum(fp.stat().st_size for fp in Path(data_dir).rglob("*.parquet"))
+
+    assert int(postgres_runs) == int(parquet_runs)
+    print(f"{'':>9} {'load (s)':>10} {'scan season (s)':>16} {'size (MiB)':>11}")
+    for name, load_time, scan_time, n_bytes in [
+        ("postgres", postgres_load_time, postgres_scan_time, postgres_bytes),
+        ("parquet", parquet_load_time, parquet_scan_time, parquet_bytes)
+    ]:
+        print(f"{name:>9} {load_time:>10.2f} {scan_time:>16.3f} {n_bytes / 2 ** 20:>11.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
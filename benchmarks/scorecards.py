@@ -0,0 +1,45 @@
+"""
+Time the scorecard aggregations of `cricsheet.scorecards` on a large synthetic
+ball-by-ball table, and compare the batting scorecard with the row-by-row loop
+it replaces.
+
+Usage: python -m benchmarks.scorecards [n_matches]
+"""
+import sys
+import time
+from collections import defaultdict
+
+import pandas as pd
+
+from benchmarks.database_load import make_ball_by_ball_table
+from cricsheet.scorecards import get_batting_scorecard, get_bowling_figures, get_fall_of_wickets, get_partnerships
+
+
+def loop_batting_scorecard(ball_by_ball_table: pd.DataFrame) -> dict:
+    # Runs and balls faced per batsman per innings, one delivery at a time.
+    batting: dict = defaultdict(lambda: [0, 0])
+    for delivery in ball_by_ball_table.itertuples(index=False):
+        batsman_stats: list = batting[(delivery.match_id, delivery.innings, delivery.batsman)]
+        batsman_stats[0] += delivery.runs_by_batsman
+        batsman_stats[1] += delivery.extras_type != "wides"
+    return dict(batting)
+
+
+def main(n_matches: int = 3000):
+    start: float = time.perf_counter()
+    ball_by_ball_table: pd.DataFrame = make_ball_by_ball_table(n_matches)
+    print(f"{n_matches} matches, {len(ball_by_ball_table):,} deliveries "
+          f"(built in {time.perf_counter() - start:.1f} s)")
+
+    for get_scorecard in [get_batting_scorecard, get_bowling_figures, get_partnerships, get_fall_of_wickets]:
+        start = time.perf_counter()
+        scorecard: pd.DataFrame = get_scorecard(ball_by_ball_table)
+        print(f"{get_scorecard.__name__:>22}: {time.perf_counter() - start:6.2f} s, {len(scorecard):,} rows")
+
+    start = time.perf_counter()
+    loop_batting_scorecard(ball_by_ball_table)
+    print(f"{'loop batting scorecard':>22}: {time.perf_counter() - start:6.2f} s (runs and balls only)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,74 @@
+"""
+Compare the peak resident memory of turning one long test match into
+ball-by-ball tables, innings by innings, with the whole-file JSON parser and
+with the streaming parser. Each parser is run in a fresh process, and the
+reported figure is how far the process's peak RSS rose above its RSS
+before parsing. Linux only: the peak is read from /proc/self/status after
+being reset through /proc/self/clear_refs.
+
+Usage: python -m benchmarks.streaming_memory [n_overs_per_innings] [n_innings]
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.innings_builder import make_match
+
+PARSERS: list = ["json", "stream"]
+
+
+def read_status_kib(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def measure(parser: str, match_fp: str):
+    # Imported before the baseline is taken, so only parsing is measured.
+    from cricsheet.country_resolver import CountryResolver, GazetteerBackend
+    from cricsheet.match_json_parser import MatchJSONParser
+    from cricsheet.match_json_stream_parser import MatchJSONStreamParser
+
+    country_resolver = CountryResolver(backends=[GazetteerBackend()])
+    # Resets the peak RSS to the current RSS, so that the peak reached while
+    # importing does not hide the one reached while parsing.
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    baseline_kib: int = read_status_kib("VmRSS")
+    if parser == "stream":
+        match_parser = MatchJSONStreamParser(match_fp, country_resolver)
+    else:
+        match_parser = MatchJSONParser(match_fp, country_resolver)
+    n_rows: int = 0
+    for innings_table in match_parser.iter_innings_data():
+        # Stands in for writing the innings downstream.
+        n_rows += len(innings_table)
+    peak_kib: int = read_status_kib("VmHWM")
+    print(json.dumps({"rows": n_rows, "peak_increase_mib": (peak_kib - baseline_kib) / 1024}))
+
+
+def main(n_overs: int = 1000, n_innings: int = 4):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fp: Path = Path(temp_dir) / "1000000.json"
+        match_fp.write_text(json.dumps(make_match(n_innings=n_innings, n_overs=n_overs), indent=2))
+        print(f"{n_innings} innings x {n_overs} overs, {match_fp.stat().st_size / 2 ** 20:.1f} MiB file")
+
+        for parser in PARSERS:
+            result: dict = json.loads(subprocess.run(
+                [sys.executable, "-m", "benchmarks.streaming_memory", "--measure", parser, str(match_fp)],
+                check=True,
+                capture_output=True,
+                text=True
+            ).stdout)
+            print(f"{parser:>7}: {result['rows']} rows, peak RSS +{result['peak_increase_mib']:.1f} MiB")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--measure"]:
+        measure(*sys.argv[2:])
+    else:
+        main(*[int(arg) for arg in sys.argv[1:]])
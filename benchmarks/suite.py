@@ -0,0 +1,222 @@
+"""
+Time the stages of the pipeline on synthetic matches of each format, see
+`benchmarks.synthetic_matches`, and save the timings as JSON under
+`benchmarks/results/`, named after the commit they were measured at. Each
+run is compared with the latest earlier results file, and benchmarks that
+got slower by more than `REGRESSION_THRESHOLD` are reported.
+
+The `DatabaseManager.update_table` benchmarks load into a throwaway schema
+of the Postgres database set by the CRICSHEET_DB_* environment variables, see
+`benchmarks.database_load`, and are skipped unless CRICSHEET_DB_HOST is set.
+
+Usage: python -m benchmarks.suite [n_matches] [repeat]
+"""
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from benchmarks.ingest_pipeline import make_database_manager
+from benchmarks.synthetic_matches import MATCH_FORMATS, make_synthetic_match_bytes
+from cricsheet.database_manager import UPDATE_TABLE_METHODS, DatabaseManager
+from cricsheet.match_data_processor import MatchDataProcessor
+from cricsheet.match_json_parser import MatchJSONParser
+
+# Directory the results of each run are saved in.
+RESULTS_DIR: Path = Path(__file__).parent / "results"
+
+# Ratio of a benchmark's new to old median time above which it is reported
+# as a regression. Timings of the same code vary by a few percent between
+# runs.
+REGRESSION_THRESHOLD: float = 1.2
+
+# Number of players the synthetic matches draw their players from.
+REGISTRY_SIZE: int = 500
+
+
+class Benchmark(NamedTuple):
+    # Name under which timings are saved, e.g. "json_parser_load[T20]"
+    name: str
+    # Returns the argument of `run`, outside of the timed section
+    setup: Callable[[], Any]
+    # Timed function, called once per match
+    run: Callable[[Any], Any]
+
+
+def _get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _make_processor(match_bytes: bytes) -> MatchDataProcessor:
+    processor = MatchDataProcessor(io.BytesIO(match_bytes))
+    processor.match_parser.match_id = "benchmark"
+    return processor
+
+
+def _make_parser(match_bytes: bytes) -> MatchJSONParser:
+    parser = MatchJSONParser(match_bytes)
+    parser.match_id = "benchmark"
+    return parser
+
+
+def _parse_innings(parser: MatchJSONParser) -> List[pd.DataFrame]:
+    return [
+        parser._get_parsed_innings_data(innings.get("overs", []), innings["team"], innings_idx)
+        for innings_idx, innings in enumerate(parser.data["innings"])
+    ]
+
+
+def get_parser_benchmarks(match_format: str, matches: List[bytes]) -> List[Benchmark]:
+    """
+    Benchmarks of parsing the matches of one format, from decoding a match
+    file to its match info and ball-by-ball tables.
+    """
+    def each_match(make: Callable[[bytes], Any]) -> Callable[[], list]:
+        return lambda: [make(match_bytes) for match_bytes in matches]
+
+    return [
+        Benchmark(f"json_parser_load[{match_format}]", lambda: matches, _make_parser),
+        Benchmark(f"get_parsed_innings_data[{match_format}]", each_match(_make_parser), _parse_innings),
+        Benchmark(f"get_match_info[{match_format}]", each_match(_make_processor),
+                  lambda processor: processor.get_match_info()),
+        Benchmark(f"get_ball_by_ball_table[{match_format}]", each_match(_make_processor),
+                  lambda processor: processor.get_ball_by_ball_table())
+    ]
+
+
+def get_database_benchmarks(database_manager: DatabaseManager, matches: List[bytes]) -> List[Benchmark]:
+    """
+    Benchmarks of loading the ball-by-ball table of all matches with each
+    `DatabaseManager.update_table` method, into an empty table every time.
+    """
+    ball_by_ball_table: pd.DataFrame = pd.concat([
+        _make_processor(match_bytes).get_ball_by_ball_table().assign(match_id=f"match_{match_idx}")
+        for match_idx, match_bytes in enumerate(matches)
+    ], ignore_index=True)
+
+    def make_setup(table_name: str) -> Callable[[], list]:
+        def setup() -> list:
+            if database_manager.table_exists(table_name):
+                database_manager.delete_table(table_name)
+            return [ball_by_ball_table]
+        return setup
+
+    return [
+        Benchmark(
+            f"update_table[{method}]",
+            make_setup(f"ball_by_ball_{method}"),
+            lambda table, table_name=f"ball_by_ball_{method}", method=method: database_manager.update_table(
+                table_name, table, method=method, primary_key=["match_id", "innings", "over", "ball"]
+            )
+        )
+        for method in UPDATE_TABLE_METHODS
+    ]
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int) -> Dict[str, float]:
+    """
+    Time a benchmark over all its arguments, `repeat` times.
+
+    :return: Fastest, median and slowest total time in seconds.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        arguments: list = benchmark.setup()
+        start: float = time.perf_counter()
+        for argument in arguments:
+            benchmark.run(argument)
+        timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings), "max": max(timings)}
+
+
+def compare_results(old_results: dict, new_results: dict) -> Dict[str, float]:
+    """
+    Ratio of new to old median time of each benchmark in both results.
+    """
+    return {
+        name: timings["median"] / old_results["benchmarks"][name]["median"]
+        for name, timings in new_results["benchmarks"].items()
+        if name in old_results["benchmarks"] and old_results["benchmarks"][name]["median"] > 0
+    }
+
+
+def _get_latest_results_fp(results_dir: Path) -> Optional[Path]:
+    results_fps: List[Path] = sorted(results_dir.glob("*.json"))
+    return results_fps[-1] if results_fps else None
+
+
+def main(n_matches: int = 20, repeat: int = 5):
+    results: dict = {
+        "commit": _get_commit(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "n_matches": n_matches,
+        "repeat": repeat,
+        "benchmarks": {}
+    }
+    matches: Dict[str, List[bytes]] = {
+        match_format: [make_synthetic_match_bytes(match_format, registry_size=REGISTRY_SIZE, seed=seed)
+                       for seed in range(n_matches)]
+        for match_format in MATCH_FORMATS
+    }
+
+    def run_benchmarks(benchmarks: List[Benchmark]):
+        for benchmark in benchmarks:
+            results["benchmarks"][benchmark.name] = time_benchmark(benchmark, repeat)
+            print(f"{benchmark.name:>40}: {results['benchmarks'][benchmark.name]['median']:8.4f} s")
+
+    for match_format, format_matches in matches.items():
+        run_benchmarks(get_parser_benchmarks(match_format, format_matches))
+
+    if "CRICSHEET_DB_HOST" in os.environ:
+        schema: str = f"benchmark_{uuid.uuid4().hex}"
+        database_manager: DatabaseManager = make_database_manager(schema)
+        with database_manager.db_engine.begin() as conn:
+            conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        try:
+            run_benchmarks(get_database_benchmarks(database_manager, matches["ODI"]))
+        finally:
+            with database_manager.db_engine.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+            database_manager.db_engine.dispose()
+    else:
+        print("CRICSHEET_DB_HOST is not set; skipping the update_table benchmarks")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    old_results_fp: Optional[Path] = _get_latest_results_fp(RESULTS_DIR)
+    # Named so that results files sort in the order they were created.
+    results_fp: Path = RESULTS_DIR / (
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{results['commit'] or 'unknown'}.json"
+    )
+    results_fp.write_text(json.dumps(results, indent=2))
+    print(f"Saved results to {results_fp}")
+
+    if old_results_fp is not None:
+        old_results: dict = json.loads(old_results_fp.read_text())
+        print(f"Compared with {old_results_fp.name} (commit {old_results['commit']}):")
+        for name, ratio in compare_results(old_results, results).items():
+            flag: str = "  REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+            print(f"{name:>40}: {ratio:6.2f}x{flag}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
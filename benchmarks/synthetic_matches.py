@@ -0,0 +1,238 @@
+"""
+Synthetic Cricsheet JSON matches for benchmarks, with the shape of real
+matches: batsmen come in as wickets fall, the strike rotates on odd runs and
+at the end of each over, bowlers take turns, and an innings ends when its
+overs run out or ten wickets have fallen.
+
+Usage: python -m benchmarks.synthetic_matches [n_matches] [registry_size]
+"""
+import json
+import random
+import sys
+import zlib
+from typing import Dict, List, NamedTuple, Optional
+
+
+class MatchFormat(NamedTuple):
+    # Cricsheet match type
+    match_type: str
+    # Number of innings of a completed match
+    n_innings: int
+    # Maximum number of overs of an innings, or the overs a Test innings
+    # typically lasts
+    n_overs: int
+
+
+MATCH_FORMATS: Dict[str, MatchFormat] = {
+    "T20": MatchFormat("T20", 2, 20),
+    "ODI": MatchFormat("ODI", 2, 50),
+    "Test": MatchFormat("Test", 4, 90)
+}
+
+# Relative frequency of each extras type among deliveries with extras.
+EXTRAS_TYPE_WEIGHTS: Dict[str, int] = {"wides": 40, "noballs": 10, "byes": 15, "legbyes": 35}
+
+# Relative frequency of each kind of dismissal, and whether it names a
+# fielder.
+DISMISSAL_KIND_WEIGHTS: Dict[str, int] = {
+    "caught": 55, "bowled": 20, "lbw": 13, "run out": 7, "stumped": 3, "caught and bowled": 2
+}
+FIELDED_DISMISSAL_KINDS: List[str] = ["caught", "run out", "stumped"]
+
+# Runs off the bat of a delivery, with their relative frequency.
+BATTER_RUNS_WEIGHTS: Dict[int, int] = {0: 45, 1: 30, 2: 8, 3: 1, 4: 11, 6: 5}
+
+TEAMS: List[str] = ["Kenya", "Netherlands", "Scotland", "Namibia", "Nepal", "Oman"]
+VENUES: Dict[str, str] = {
+    "Gymkhana Club Ground": "Nairobi",
+    "VRA Ground": "Amstelveen",
+    "The Grange": "Edinburgh",
+    "Wanderers Cricket Ground": "Windhoek"
+}
+
+
+def _get_person_id(name: str) -> str:
+    return f"{zlib.crc32(name.encode()):08x}"
+
+
+def _choose(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def make_innings(
+        batting_players: List[str],
+        bowling_players: List[str],
+        n_overs: int,
+        extras_rate: float = 0.05,
+        wicket_rate: float = 0.04,
+        rng: Optional[random.Random] = None
+) -> List[dict]:
+    """
+    Overs of one synthetic innings.
+
+    :param batting_players: Players of the batting side, in batting order.
+    :param bowling_players: Players of the fielding side. The last five
+    bowl.
+    :param n_overs: Number of overs, unless the batting side is bowled out
+    first.
+    :param extras_rate: Share of deliveries with extras.
+    :param wicket_rate: Share of deliveries on which a wicket falls.
+    :param rng: Random number generator.
+    :return: Overs in Cricsheet's JSON format.
+    """
+    rng = rng or random.Random(0)
+    bowlers: List[str] = bowling_players[-5:]
+    striker: str = batting_players[0]
+    non_striker: str = batting_players[1]
+    next_batsman_idx: int = 2
+    overs: List[dict] = []
+    for over_idx in range(n_overs):
+        bowler: str = bowlers[over_idx % len(bowlers)]
+        deliveries: List[dict] = []
+        n_legal_deliveries: int = 0
+        while n_legal_deliveries < 6:
+            delivery: dict = {"batter": striker, "bowler": bowler, "non_striker": non_striker}
+            batter_runs: int = _choose(rng, BATTER_RUNS_WEIGHTS)
+            extras_runs: int = 0
+            if rng.random() < extras_rate:
+                extras_type: str = _choose(rng, EXTRAS_TYPE_WEIGHTS)
+                extras_runs = 1 if extras_type in ("wides", "noballs") else rng.choice([1, 1, 2, 4])
+                if extras_type in ("wides", "byes", "legbyes"):
+                    batter_runs = 0
+                delivery["extras"] = {extras_type: extras_runs}
+                n_legal_deliveries += extras_type not in ("wides", "noballs")
+            else:
+                n_legal_deliveries += 1
+            delivery["runs"] = {"batter": batter_runs, "extras": extras_runs, "total": batter_runs + extras_runs}
+
+            if rng.random() < wicket_rate:
+                kind: str = _choose(rng, DISMISSAL_KIND_WEIGHTS)
+                wicket: dict = {"player_out": striker, "kind": kind}
+                if kind in FIELDED_DISMISSAL_KINDS:
+                    wicket["fielders"] = [{"name": rng.choice(bowling_players)}]
+                delivery["wickets"] = [wicket]
+                deliveries.append(delivery)
+                if next_batsman_idx == len(batting_players):
+                    overs.append({"over": over_idx, "deliveries": deliveries})
+                    return overs
+                striker = batting_players[next_batsman_idx]
+                next_batsman_idx += 1
+                continue
+
+            deliveries.append(delivery)
+            if (batter_runs + extras_runs) % 2 == 1:
+                striker, non_striker = non_striker, striker
+        overs.append({"over": over_idx, "deliveries": deliveries})
+        striker, non_striker = non_striker, striker
+    return overs
+
+
+def make_synthetic_match(
+        match_format: str = "ODI",
+        n_innings: Optional[int] = None,
+        extras_rate: float = 0.05,
+        wicket_rate: float = 0.04,
+        registry_size: int = 22,
+        seed: int = 0
+) -> dict:
+    """
+    Synthetic match in Cricsheet's JSON format.
+
+    :param match_format: One of `MATCH_FORMATS`.
+    :param n_innings: Number of innings. Defaults to the number of innings of
+    the format.
+    :param extras_rate: Share of deliveries with extras.
+    :param wicket_rate: Share of deliveries on which a wicket falls.
+    :param registry_size: Number of distinct players the players of all
+    matches are drawn from, and so the size of the player registry built
+    from many matches. At least 22.
+    :param seed: Seed of the match; matches with the same arguments and seed
+    are identical.
+    :return: Match data, as decoded from a match file.
+    """
+    if match_format not in MATCH_FORMATS:
+        raise ValueError(
+            f"Unknown match format '{match_format}'. Expected one of {list(MATCH_FORMATS)}."
+        )
+    if registry_size < 22:
+        raise ValueError(f"A registry of {registry_size} players cannot field two teams of 11.")
+
+    match_type, default_n_innings, n_overs = MATCH_FORMATS[match_format]
+    n_innings = default_n_innings if n_innings is None else n_innings
+    rng = random.Random(seed)
+
+    teams: List[str] = rng.sample(TEAMS, 2)
+    player_names: List[str] = [f"Player {player_idx}" for player_idx in rng.sample(range(registry_size), 22)]
+    players: Dict[str, List[str]] = {teams[0]: player_names[:11], teams[1]: player_names[11:]}
+    officials: Dict[str, List[str]] = {
+        "match_referees": ["Referee"],
+        "reserve_umpires": ["Reserve umpire"],
+        "umpires": ["Umpire 1", "Umpire 2"],
+        "tv_umpires": ["TV umpire"]
+    }
+    people: List[str] = player_names + [name for names in officials.values() for name in names]
+    venue: str = rng.choice(list(VENUES))
+    toss_winner: str = rng.choice(teams)
+    winner: str = rng.choice(teams)
+    year: int = 2000 + seed % 24
+
+    innings: List[dict] = []
+    for innings_idx in range(n_innings):
+        batting_team: str = teams[innings_idx % 2]
+        fielding_team: str = teams[(innings_idx + 1) % 2]
+        innings.append({
+            "team": batting_team,
+            "overs": make_innings(
+                players[batting_team],
+                players[fielding_team],
+                n_overs,
+                extras_rate=extras_rate,
+                wicket_rate=wicket_rate,
+                rng=rng
+            )
+        })
+
+    return {
+        "meta": {"data_version": "1.0.0", "created": f"{year}-12-31", "revision": 1},
+        "info": {
+            "balls_per_over": 6,
+            "city": VENUES[venue],
+            "dates": [f"{year}-06-{day:02d}" for day in range(1, 2 + (n_innings > 2) * 4)],
+            "gender": "male",
+            "match_type": match_type,
+            "officials": officials,
+            "outcome": {"winner": winner, "by": {"runs": rng.randint(1, 150)}},
+            "players": players,
+            "registry": {"people": {name: _get_person_id(name) for name in people}},
+            "season": str(year),
+            "team_type": "international",
+            "teams": teams,
+            "toss": {"decision": rng.choice(["bat", "field"]), "winner": toss_winner},
+            "venue": venue
+        },
+        "innings": innings
+    }
+
+
+def make_synthetic_match_bytes(match_format: str = "ODI", seed: int = 0, **match_kwargs) -> bytes:
+    """
+    Contents of a synthetic match file, see `make_synthetic_match`.
+    """
+    return json.dumps(make_synthetic_match(match_format, seed=seed, **match_kwargs)).encode()
+
+
+def main(n_matches: int = 100, registry_size: int = 500):
+    for match_format in MATCH_FORMATS:
+        matches: List[dict] = [
+            make_synthetic_match(match_format, registry_size=registry_size, seed=seed)
+            for seed in range(n_matches)
+        ]
+        n_deliveries: int = sum(len(over["deliveries"]) for match in matches
+                                for innings in match["innings"] for over in innings["overs"])
+        n_bytes: int = sum(len(json.dumps(match)) for match in matches)
+        print(f"{match_format:>5}: {n_deliveries / n_matches:7.0f} deliveries, "
+              f"{n_bytes / n_matches / 1024:6.0f} KiB per match")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,5 @@
+import sys
+
+from cricsheet.cli import main
+
+sys.exit(main())
@@ -0,0 +1,168 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Union
+
+from cricsheet.country_resolver import CountryResolver
+from cricsheet.database_manager import DatabaseManager
+from cricsheet.match_data_processor import MatchBatch, MatchDataProcessor, list_match_files
+from cricsheet.player_registry import PlayerRegistry
+
+# Name of the checkpoint used by `BackfillManager` unless told otherwise.
+DEFAULT_CHECKPOINT_NAME: str = "backfill"
+
+# Number of match files loaded per transaction by `BackfillManager.backfill`.
+DEFAULT_BACKFILL_BATCH_SIZE: int = 500
+
+
+class BackfillReport(NamedTuple):
+    """
+    Outcome of a backfill run, by match ID.
+    """
+    # Matches loaded by this run
+    loaded: List[str]
+    # Matches committed by an earlier, interrupted run, which were not read
+    # again
+    skipped: List[str]
+    # Error message for each match file that could not be processed, keyed
+    # by path. Their batch is still committed, but as they are not in the
+    # match registry, they are retried whenever the backfill is resumed.
+    errors: Dict[str, str]
+
+
+def _get_match_id(match_fp: str) -> str:
+    return Path(match_fp).stem
+
+
+class BackfillManager:
+    def __init__(
+            self,
+            database_manager: DatabaseManager,
+            checkpoint_name: str = DEFAULT_CHECKPOINT_NAME
+    ):
+        """
+        Load a large set of match files, e.g. a full Cricsheet archive
+        extracted to disk, in a way that survives interruptions. Files are
+        loaded in batches of one transaction each, and every transaction
+        also saves a checkpoint of how many files have been loaded. A run
+        that is restarted after a failure carries on after the last
+        committed batch, without parsing or loading its matches again.
+        Files that could not be processed are retried instead, as they may
+        have been fixed in the meantime.
+
+        :param database_manager: Manager of the database to load into.
+        :param checkpoint_name: Name under which progress is saved in the
+        database. Backfills of different sets of files should use
+        different names.
+        """
+        self.database_manager = database_manager
+        self.checkpoint_name = checkpoint_name
+
+    @property
+    def checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Progress saved by the last committed batch, see
+        `DatabaseManager.get_ingest_checkpoint`.
+        """
+        return self.database_manager.get_ingest_checkpoint(self.checkpoint_name)
+
+    def reset(self):
+        """
+        Forget the saved progress, so that the next backfill starts over.
+        Matches already loaded are replaced rather than duplicated then.
+        """
+        self.database_manager.delete_ingest_checkpoint(self.checkpoint_name)
+
+    def _get_remaining_match_files(
+            self,
+            match_files: List[str],
+            checkpoint: Optional[Dict[str, Any]]
+    ) -> List[str]:
+        if checkpoint is None:
+            return match_files
+
+        # The match registry is updated in the same transactions as the
+        # checkpoint, so it holds exactly the matches of the committed
+        # batches, wherever they are in `match_files`. Files that could not
+        # be processed are not in it, so they are always retried, unlike with
+        # a position saved in the checkpoint.
+        existing_match_ids: Set[str] = self.database_manager.get_existing_match_ids(refresh=True)
+        return [match_fp for match_fp in match_files
+                if _get_match_id(match_fp) not in existing_match_ids]
+
+    def backfill(
+            self,
+            match_fps: Union[str, Iterable[str]],
+            batch_size: int = DEFAULT_BACKFILL_BATCH_SIZE,
+            n_workers: Optional[int] = None,
+            chunk_size: int = 16,
+            country_resolver: Optional[CountryResolver] = None,
+            stream: bool = False,
+            player_registry: Optional[PlayerRegistry] = None
+    ) -> BackfillReport:
+        """
+        Load match files into the database, resuming from the saved
+        checkpoint if there is one.
+
+        :param match_fps: Paths to match files, or a directory of such
+        files.
+        :param batch_size: Number of match files loaded per transaction.
+        Smaller batches lose less work to a failure; larger batches load
+        faster.
+        :param n_workers: Number of worker processes parsing matches, see
+        `MatchDataProcessor.iter_match_batches`.
+        :param chunk_size: Number of files sent to a worker at a time.
+        :param country_resolver: Resolver used to find the country each match
+        was played in.
+        :param stream: Decode JSON files innings by innings, see
+        `MatchDataProcessor.iter_match_batches`.
+        :param player_registry: Player dimension, e.g. from
+        `DatabaseManager.load_player_registry`. If given, players are loaded
+        as player keys, see `DatabaseManager.update_match_tables`.
+        :return: Which matches were loaded, skipped or failed.
+        """
+        match_files: List[str] = list_match_files(match_fps)
+        checkpoint: Optional[Dict[str, Any]] = self.checkpoint
+        remaining_match_files: List[str] = self._get_remaining_match_files(match_files, checkpoint)
+        remaining_match_ids: Set[str] = {_get_match_id(match_fp) for match_fp in remaining_match_files}
+        report = BackfillReport(
+            loaded=[],
+            skipped=[_get_match_id(match_fp) for match_fp in match_files
+                     if _get_match_id(match_fp) not in remaining_match_ids],
+            errors={}
+        )
+
+        n_batches: int = checkpoint["n_batches"] if checkpoint is not None else 0
+        n_match_files: int = len(match_files) - len(remaining_match_files)
+        batch_start: int = 0
+        match_batch: MatchBatch
+        for match_batch in MatchDataProcessor.iter_match_batches(
+                remaining_match_files,
+                batch_size=batch_size,
+                n_workers=n_workers,
+                chunk_size=chunk_size,
+                country_resolver=country_resolver,
+                player_registry=player_registry,
+                stream=stream
+        ):
+            # Batches hold `batch_size` files, including those that could
+            # not be processed, except for the last one.
+            batch_match_files: List[str] = remaining_match_files[batch_start:batch_start + batch_size]
+            batch_start += batch_size
+            loaded_match_ids: List[str] = list(match_batch.match_info.get("match_id", []))
+            n_batches += 1
+            n_match_files += len(batch_match_files)
+            with self.database_manager.transaction():
+                if loaded_match_ids:
+                    self.database_manager.update_match_tables(
+                        match_batch, mode="upsert", player_registry=player_registry
+                    )
+                    self.database_manager.register_match_ids(loaded_match_ids)
+                self.database_manager.save_ingest_checkpoint(
+                    self.checkpoint_name,
+                    n_batches=n_batches,
+                    n_match_files=n_match_files,
+                    last_match_id=_get_match_id(batch_match_files[-1])
+                )
+            report.loaded.extend(loaded_match_ids)
+            report.errors.update(match_batch.errors)
+
+        return report
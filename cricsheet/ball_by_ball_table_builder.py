@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+from cricsheet.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Columns of the ball-by-ball table, in order, with the dtype each one is
+# built with.
+BALL_BY_BALL_COLUMN_DTYPES: Dict[str, str] = {
+    "match_id": "object",
+    "innings": "int64",
+    "over": "int64",
+    "ball": "int64",
+    "batting_team": "object",
+    "batsman": "object",
+    "bowler": "object",
+    "non_striker": "object",
+    "runs_by_batsman": "int64",
+    "extras_type": "object",
+    "runs_from_extras": "int64",
+    "dismissed_batsman": "object",
+    "dismissal_type": "object",
+    "fielders_in_dismissal": "object"
+}
+
+# Columns that together identify a delivery.
+BALL_BY_BALL_PRIMARY_KEY: List[str] = ["match_id", "innings", "over", "ball"]
+
+# Memory-efficient dtypes of the ball-by-ball table, used when a compact table
+# is asked for. Names repeat on nearly every row, so they are stored as
+# categoricals, i.e. small integer codes into one array of distinct names;
+# missing extras and dismissal values become NaN rather than None. Runs and
+# innings fit in int8, and overs in int16 even for the longest test innings.
+# `fielders_in_dismissal` holds lists and is left as it is.
+COMPACT_BALL_BY_BALL_COLUMN_DTYPES: Dict[str, str] = {
+    "match_id": "category",
+    "innings": "int8",
+    "over": "int16",
+    "ball": "int8",
+    "batting_team": "category",
+    "batsman": "category",
+    "bowler": "category",
+    "non_striker": "category",
+    "runs_by_batsman": "int8",
+    "extras_type": "category",
+    "runs_from_extras": "int8",
+    "dismissed_batsman": "category",
+    "dismissal_type": "category",
+    "fielders_in_dismissal": "object"
+}
+
+
+class BallByBallTableBuilder:
+    def __init__(self, match_id: str):
+        """
+        Build the ball-by-ball table of a match column by column. Deliveries
+        are appended straight into one list or typed array per column and
+        the DataFrame is constructed once, in `to_frame`, with explicit
+        dtypes.
+
+        :param match_id: ID of the match the deliveries belong to.
+        """
+        self.match_id = match_id
+
+        # Innings-level values are stored once per innings along with the
+        # number of deliveries in it, and expanded in `to_frame`.
+        self.innings_numbers: List[int] = []
+        self.batting_teams: List[str] = []
+        self.innings_lengths: List[int] = []
+
+        self.overs: array = array("q")
+        self.balls: array = array("q")
+        self.runs_by_batsman: array = array("q")
+        self.runs_from_extras: array = array("q")
+        self.batsmen: List[str] = []
+        self.bowlers: List[str] = []
+        self.non_strikers: List[str] = []
+        self.extras_types: List[Optional[str]] = []
+        self.dismissed_batsmen: List[Optional[str]] = []
+        self.dismissal_types: List[Optional[str]] = []
+        self.fielders_in_dismissals: List[Optional[list]] = []
+
+    def __len__(self) -> int:
+        return len(self.overs)
+
+    def add_innings(
+            self,
+            innings_ball_by_ball_data: list,
+            batting_team: str,
+            innings_idx: int
+    ):
+        """
+        Append every delivery of an innings.
+
+        :param innings_ball_by_ball_data: The `overs` list of an innings in
+        a Cricsheet JSON file.
+        :param batting_team: Team batting in the innings.
+        :param innings_idx: 0-indexed position of the innings in the match.
+        """
+        n_deliveries_before: int = len(self)
+
+        # Bound methods are looked up once rather than once per delivery.
+        append_over = self.overs.append
+        append_ball = self.balls.append
+        append_runs_by_batsman = self.runs_by_batsman.append
+        append_runs_from_extras = self.runs_from_extras.append
+        append_batsman = self.batsmen.append
+        append_bowler = self.bowlers.append
+        append_non_striker = self.non_strikers.append
+        append_extras_type = self.extras_types.append
+        append_dismissed_batsman = self.dismissed_batsmen.append
+        append_dismissal_type = self.dismissal_types.append
+        append_fielders = self.fielders_in_dismissals.append
+
+        overs_data: dict
+        for overs_data in innings_ball_by_ball_data:
+            # In cricket parlance, overs and balls are 1-indexed
+            over: int = overs_data["over"] + 1
+            ball: int
+            dd: dict
+            for ball, dd in enumerate(overs_data["deliveries"], start=1):
+                append_over(over)
+                append_ball(ball)
+                append_batsman(dd["batter"])
+                append_bowler(dd["bowler"])
+                append_non_striker(dd["non_striker"])
+                runs: dict = dd["runs"]
+                append_runs_by_batsman(runs["batter"])
+                append_runs_from_extras(runs["extras"])
+
+                extras: Optional[dict] = dd.get("extras")
+                append_extras_type(next(iter(extras)) if extras else None)
+
+                wickets: Optional[list] = dd.get("wickets")
+                if wickets:
+                    wicket: dict = wickets[0]
+                    append_dismissed_batsman(wicket["player_out"])
+                    append_dismissal_type(wicket["kind"])
+                    fielders: Optional[list] = wicket.get("fielders")
+                    append_fielders(
+                        [fl["name"] for fl in fielders] if fielders else None
+                    )
+                else:
+                    append_dismissed_batsman(None)
+                    append_dismissal_type(None)
+                    append_fielders(None)
+
+        self.innings_numbers.append(innings_idx + 1)
+        self.batting_teams.append(batting_team)
+        self.innings_lengths.append(len(self) - n_deliveries_before)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Construct the ball-by-ball table from the deliveries added so far.
+
+        :return: Pandas dataframe with the columns in
+        `BALL_BY_BALL_COLUMN_DTYPES`.
+        """
+        n_deliveries: int = len(self)
+        innings_lengths: np.ndarray = np.array(self.innings_lengths, dtype="int64")
+
+        def object_column(values: list) -> np.ndarray:
+            # Unlike `np.array`, this never tries to turn the lists in
+            # `fielders_in_dismissal` into an extra dimension.
+            return np.fromiter(values, dtype="object", count=len(values))
+
+        def int_column(values: array) -> np.ndarray:
+            return np.array(values, dtype="int64")
+
+        columns: Dict[str, np.ndarray] = {
+            "match_id": object_column([self.match_id] * n_deliveries),
+            "innings": np.repeat(
+                np.array(self.innings_numbers, dtype="int64"), innings_lengths
+            ),
+            "over": int_column(self.overs),
+            "ball": int_column(self.balls),
+            "batting_team": np.repeat(
+                object_column(self.batting_teams), innings_lengths
+            ),
+            "batsman": object_column(self.batsmen),
+            "bowler": object_column(self.bowlers),
+            "non_striker": object_column(self.non_strikers),
+            "runs_by_batsman": int_column(self.runs_by_batsman),
+            "extras_type": object_column(self.extras_types),
+            "runs_from_extras": int_column(self.runs_from_extras),
+            "dismissed_batsman": object_column(self.dismissed_batsmen),
+            "dismissal_type": object_column(self.dismissal_types),
+            "fielders_in_dismissal": object_column(self.fielders_in_dismissals)
+        }
+
+        return pd.DataFrame(columns, columns=list(BALL_BY_BALL_COLUMN_DTYPES))
+
+
+def compact_ball_by_ball_table(ball_by_ball_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert a ball-by-ball table to `COMPACT_BALL_BY_BALL_COLUMN_DTYPES`,
+    which takes several times less memory than the default dtypes.
+
+    :param ball_by_ball_table: Ball-by-ball table with the default dtypes.
+    :return: New ball-by-ball table with the compact dtypes.
+    """
+    # Player columns that already hold player keys, see `PlayerRegistry`,
+    # are left as they are.
+    compact_dtypes: Dict[str, str] = {
+        column: dtype for column, dtype in COMPACT_BALL_BY_BALL_COLUMN_DTYPES.items()
+        if dtype != "category" or ball_by_ball_table[column].dtype == "object"
+    }
+    return ball_by_ball_table.astype(compact_dtypes)
+
+
+def concat_ball_by_ball_tables(ball_by_ball_tables: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate ball-by-ball tables, e.g. those of several matches. Unlike
+    `pd.concat`, this keeps categorical columns categorical when the tables
+    have different categories, by merging their categories first.
+
+    :param ball_by_ball_tables: Ball-by-ball tables, all with the default or
+    all with the compact dtypes.
+    :return: Ball-by-ball table with a fresh index.
+    """
+    ball_by_ball_tables = list(ball_by_ball_tables)
+    if not ball_by_ball_tables:
+        return BallByBallTableBuilder("").to_frame()
+
+    categorical_columns: List[str] = [
+        column for column, dtype in ball_by_ball_tables[0].dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
+    ]
+    if categorical_columns and len(ball_by_ball_tables) > 1:
+        categories: Dict[str, pd.Index] = {
+            column: pd.api.types.union_categoricals(
+                [table[column] for table in ball_by_ball_tables],
+                ignore_order=True
+            ).categories
+            for column in categorical_columns
+        }
+        ball_by_ball_tables = [
+            table.assign(**{
+                column: table[column].cat.set_categories(column_categories)
+                for column, column_categories in categories.items()
+            })
+            for table in ball_by_ball_tables
+        ]
+    return pd.concat(ball_by_ball_tables, ignore_index=True)
+
@@ -0,0 +1,613 @@
+"""
+Command-line entry point of the pipeline, run as `python -m cricsheet`:
+
+    ingest    Load the matches of an archive or directory that are not loaded
+              yet into Postgres, or write them as Parquet datasets.
+    backfill  Load a directory of match files into Postgres in checkpointed
+              batches, resuming an interrupted run.
+    export    Copy the match tables of Postgres to Parquet datasets.
+    bench     Process an archive or directory without writing anything, for
+              each combination of worker counts and batch sizes.
+
+Every command prints the throughput of its run when it is done, and exits
+with a non-zero status if any match could not be processed. The database
+is chosen with the --db-* options, which default to the CRICSHEET_DB_HOST,
+CRICSHEET_DB_PORT, CRICSHEET_DB_USERNAME and CRICSHEET_DB_NAME environment
+variables; the password is only read from CRICSHEET_DB_PASSWORD, so that it
+does not show up in process listings.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+from cricsheet.backfill_manager import DEFAULT_BACKFILL_BATCH_SIZE, DEFAULT_CHECKPOINT_NAME, BackfillManager
+from cricsheet.country_resolver import CountryResolver, GazetteerBackend, get_default_cache_fp
+from cricsheet.data_ingestion_manager import (
+    DEFAULT_INGEST_BATCH_SIZE,
+    LAST_MONTH_JSON_DATA_URL,
+    DataIngestionManager
+)
+from cricsheet.database_manager import DatabaseManager
+from cricsheet.instrumentation import instrumentation
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_profiler import MatchProfiler
+from cricsheet.parquet_manager import ParquetManager
+from cricsheet.player_registry import PlayerRegistry
+from cricsheet.table_schemas import BALL_BY_BALL_TABLE_NAME, MATCH_INFO_TABLE_NAME, get_table_schemas
+
+if TYPE_CHECKING:
+    from cricsheet.match_data_processor import MatchBatch
+
+asyncio = lazy_import("asyncio")
+pd = lazy_import("pandas")
+
+# Where `ingest` writes the tables it builds.
+SINKS: List[str] = ["postgres", "parquet"]
+
+# Number of matches sent to a worker process at a time, unless told otherwise.
+DEFAULT_CHUNK_SIZE: int = 16
+
+# Number of error messages printed at the end of a run. All errors are
+# counted.
+MAX_PRINTED_ERRORS: int = 10
+
+# Exit status of a run in which some matches could not be processed.
+EXIT_STATUS_ERRORS: int = 1
+
+# Source of match files: a directory, or an archive, either on disk or
+# downloaded.
+_MatchSource = Union[str, DataIngestionManager]
+
+
+class RunStats(NamedTuple):
+    """
+    Outcome and throughput of a run.
+    """
+    # Matches processed, and written unless it was a dry run
+    n_matches: int
+    # Deliveries in those matches, if they were counted
+    n_deliveries: Optional[int]
+    # Matches left alone because an earlier run loaded them
+    n_skipped: int
+    # Error message of each match that could not be processed
+    errors: Dict[str, str]
+    seconds: float
+
+
+def format_run_stats(run_stats: RunStats) -> str:
+    """
+    Report of a run, e.g. "1,204 matches, 310,552 deliveries in 12.5 s
+    (96.3 matches/s, 24,844 deliveries/s); 10 skipped, 0 errors".
+    """
+    seconds: float = max(run_stats.seconds, 1e-9)
+    processed: str = f"{run_stats.n_matches:,} matches"
+    rates: str = f"{run_stats.n_matches / seconds:,.1f} matches/s"
+    if run_stats.n_deliveries is not None:
+        processed += f", {run_stats.n_deliveries:,} deliveries"
+        rates += f", {run_stats.n_deliveries / seconds:,.0f} deliveries/s"
+    return (f"{processed} in {run_stats.seconds:.1f} s ({rates}); "
+            f"{run_stats.n_skipped:,} skipped, {len(run_stats.errors):,} errors")
+
+
+def _get_database_manager(args: argparse.Namespace) -> DatabaseManager:
+    return DatabaseManager(
+        args.db_host,
+        args.db_port,
+        args.db_username,
+        os.environ.get("CRICSHEET_DB_PASSWORD", "root"),
+        args.db_name,
+        table_schemas=get_table_schemas(player_keys=args.player_keys)
+    )
+
+
+def _get_player_registry(args: argparse.Namespace, database_manager: DatabaseManager) -> Optional[PlayerRegistry]:
+    return database_manager.load_player_registry() if args.player_keys else None
+
+
+def _get_country_resolver(args: argparse.Namespace) -> CountryResolver:
+    return CountryResolver(
+        [GazetteerBackend()] if args.offline else None,
+        args.geocode_cache or get_default_cache_fp()
+    )
+
+
+def _get_match_source(args: argparse.Namespace) -> _MatchSource:
+    if args.source is None:
+        return DataIngestionManager(data_dir=args.data_dir, data_url=args.url)
+    if Path(args.source).is_dir():
+        return args.source
+    return DataIngestionManager(zip_fp=args.source)
+
+
+def _iter_match_batches(
+        match_source: _MatchSource,
+        batch_size: int,
+        n_workers: Optional[int],
+        chunk_size: int,
+        country_resolver: Optional[CountryResolver],
+        stream: bool,
+        match_ids: Optional[List[str]] = None
+) -> Iterator[MatchBatch]:
+    # With `match_ids`, only those matches of the source are processed.
+    from cricsheet.match_data_processor import MatchDataProcessor, list_match_files
+
+    if isinstance(match_source, DataIngestionManager):
+        return match_source.iter_match_batches(
+            match_ids,
+            batch_size=batch_size,
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            country_resolver=country_resolver,
+            stream=stream
+        )
+    match_files: List[str] = list_match_files(match_source)
+    if match_ids is not None:
+        match_id_set: Set[str] = set(match_ids)
+        match_files = [fp for fp in match_files if Path(fp).stem in match_id_set]
+    return MatchDataProcessor.iter_match_batches(
+        match_files,
+        batch_size=batch_size,
+        n_workers=n_workers,
+        chunk_size=chunk_size,
+        country_resolver=country_resolver,
+        stream=stream
+    )
+
+
+def _process_match_batches(match_batches: Iterator[MatchBatch]) -> RunStats:
+    # Every match of the source, without writing anything.
+    start: float = time.perf_counter()
+    n_matches: int = 0
+    n_deliveries: int = 0
+    errors: Dict[str, str] = {}
+    match_batch: MatchBatch
+    for match_batch in match_batches:
+        n_matches += len(match_batch.match_info)
+        n_deliveries += len(match_batch.ball_by_ball)
+        errors.update(match_batch.errors)
+    return RunStats(n_matches, n_deliveries, 0, errors, time.perf_counter() - start)
+
+
+def _write_parquet(
+        match_source: _MatchSource,
+        parquet_manager: ParquetManager,
+        batch_size: int,
+        n_workers: Optional[int],
+        chunk_size: int,
+        country_resolver: Optional[CountryResolver],
+        stream: bool
+) -> RunStats:
+    # Matches in the manifest of the datasets are skipped, unless they come
+    # from an archive and their file changed since, in which case their rows
+    # are replaced.
+    from cricsheet.match_data_processor import list_match_files
+
+    start: float = time.perf_counter()
+    file_hashes: Dict[str, Optional[str]] = (
+        match_source.file_hashes() if isinstance(match_source, DataIngestionManager)
+        else {Path(fp).stem: None for fp in list_match_files(match_source)}
+    )
+    match_manifest: Dict[str, Optional[str]] = parquet_manager.get_match_manifest()
+    changed_match_ids: List[str] = [
+        match_id for match_id, file_hash in file_hashes.items()
+        if match_id not in match_manifest or (file_hash is not None and match_manifest[match_id] != file_hash)
+    ]
+
+    n_matches: int = 0
+    n_deliveries: int = 0
+    errors: Dict[str, str] = {}
+    match_batch: MatchBatch
+    for match_batch in _iter_match_batches(
+            match_source, batch_size, n_workers, chunk_size, country_resolver, stream, changed_match_ids
+    ):
+        batch_match_ids: List[str] = list(match_batch.match_info.get("match_id", []))
+        parquet_manager.delete_matches(match_id for match_id in batch_match_ids if match_id in match_manifest)
+        parquet_manager.update_tables(match_batch)
+        parquet_manager.update_match_manifest({match_id: file_hashes[match_id] for match_id in batch_match_ids})
+        n_matches += len(batch_match_ids)
+        n_deliveries += len(match_batch.ball_by_ball)
+        errors.update(match_batch.errors)
+    return RunStats(
+        n_matches,
+        n_deliveries,
+        len(file_hashes) - len(changed_match_ids),
+        errors,
+        time.perf_counter() - start
+    )
+
+
+def _load_directory(
+        database_manager: DatabaseManager,
+        match_dir: str,
+        batch_size: int,
+        n_workers: Optional[int],
+        chunk_size: int,
+        country_resolver: Optional[CountryResolver],
+        stream: bool,
+        player_registry: Optional[PlayerRegistry]
+) -> RunStats:
+    # Matches whose file is named after a match in the match registry were
+    # loaded by an earlier run and are not read again.
+    from cricsheet.match_data_processor import MatchDataProcessor, list_match_files
+
+    start: float = time.perf_counter()
+    match_files: List[str] = list_match_files(match_dir)
+    new_match_ids: Set[str] = set(database_manager.get_new_match_ids(Path(fp).stem for fp in match_files))
+    new_match_files: List[str] = [fp for fp in match_files if Path(fp).stem in new_match_ids]
+
+    n_deliveries: int = 0
+    loaded_match_ids: List[str] = []
+    errors: Dict[str, str] = {}
+    match_batch: MatchBatch
+    for match_batch in MatchDataProcessor.iter_match_batches(
+            new_match_files,
+            batch_size=batch_size,
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            country_resolver=country_resolver,
+            player_registry=player_registry,
+            stream=stream
+    ):
+        batch_match_ids: List[str] = list(match_batch.match_info.get("match_id", []))
+        if batch_match_ids:
+            with database_manager.transaction():
+                database_manager.update_match_tables(match_batch, mode="upsert", player_registry=player_registry)
+                database_manager.register_match_ids(batch_match_ids)
+        n_deliveries += len(match_batch.ball_by_ball)
+        loaded_match_ids.extend(batch_match_ids)
+        errors.update(match_batch.errors)
+    return RunStats(
+        len(loaded_match_ids),
+        n_deliveries,
+        len(match_files) - len(new_match_files),
+        errors,
+        time.perf_counter() - start
+    )
+
+
+def ingest(args: argparse.Namespace) -> RunStats:
+    """
+    Load the matches of an archive or directory into the sink. Archives are
+    loaded into Postgres incrementally, see `DataIngestionManager.ingest_data`,
+    and directories skip the matches already in the match registry. Parquet
+    datasets skip the matches in their manifest, see `ParquetManager`, and
+    replace the rows of archived matches whose file changed. With
+    --profile-dir, archives are loaded serially, whatever --workers says, so
+    that a sample of matches can be profiled, see `MatchProfiler`.
+    """
+    match_source: _MatchSource = _get_match_source(args)
+    country_resolver: CountryResolver = _get_country_resolver(args)
+    if args.dry_run:
+        return _process_match_batches(
+            _iter_match_batches(
+                match_source, args.batch_size, args.workers, args.chunk_size, country_resolver, args.stream
+            )
+        )
+    if args.sink == "parquet":
+        return _write_parquet(
+            match_source,
+            ParquetManager(args.output_dir, compression=args.compression),
+            args.batch_size,
+            args.workers,
+            args.chunk_size,
+            country_resolver,
+            args.stream
+        )
+
+    database_manager: DatabaseManager = _get_database_manager(args)
+    player_registry: Optional[PlayerRegistry] = _get_player_registry(args, database_manager)
+    if not isinstance(match_source, DataIngestionManager):
+        return _load_directory(
+            database_manager,
+            match_source,
+            args.batch_size,
+            args.workers,
+            args.chunk_size,
+            country_resolver,
+            args.stream,
+            player_registry
+        )
+
+    start: float = time.perf_counter()
+    profiler: Optional[MatchProfiler] = (
+        MatchProfiler(args.profile_dir, args.profile_every, args.profile_min_bytes)
+        if args.profile_dir is not None else None
+    )
+    if args.workers == 1 or profiler is not None:
+        report = match_source.ingest_data(
+            database_manager,
+            args.batch_size,
+            country_resolver,
+            profiler=profiler,
+            stream=args.stream,
+            player_registry=player_registry
+        )
+        if profiler is not None:
+            print(f"Profiled {len(profiler.profiles):,} matches into {args.profile_dir}", file=sys.stderr)
+    else:
+        report = asyncio.run(match_source.ingest_data_concurrently(
+            database_manager,
+            args.batch_size,
+            n_workers=args.workers,
+            chunk_size=args.chunk_size,
+            country_resolver=country_resolver,
+            stream=args.stream,
+            player_registry=player_registry
+        ))
+    return RunStats(
+        len(report.new) + len(report.updated),
+        None,
+        len(report.skipped),
+        report.errors,
+        time.perf_counter() - start
+    )
+
+
+def backfill(args: argparse.Namespace) -> RunStats:
+    """
+    Load a directory of match files with `BackfillManager`.
+    """
+    database_manager: DatabaseManager = _get_database_manager(args)
+    backfill_manager = BackfillManager(database_manager, args.checkpoint_name)
+    if args.reset:
+        backfill_manager.reset()
+
+    start: float = time.perf_counter()
+    report = backfill_manager.backfill(
+        args.directory,
+        batch_size=args.batch_size,
+        n_workers=args.workers,
+        chunk_size=args.chunk_size,
+        country_resolver=_get_country_resolver(args),
+        stream=args.stream,
+        player_registry=_get_player_registry(args, database_manager)
+    )
+    return RunStats(len(report.loaded), None, len(report.skipped), report.errors, time.perf_counter() - start)
+
+
+def export(args: argparse.Namespace) -> RunStats:
+    """
+    Write the match info and ball-by-ball tables of the database as Parquet
+    datasets, `batch_size` matches at a time.
+    """
+    database_manager: DatabaseManager = _get_database_manager(args)
+    parquet_manager = ParquetManager(
+        args.output_dir,
+        compression=args.compression,
+        table_schemas=get_table_schemas(player_keys=args.player_keys)
+    )
+
+    start: float = time.perf_counter()
+    match_info: pd.DataFrame = database_manager.read_table(MATCH_INFO_TABLE_NAME)
+    match_ids: List[str] = list(match_info["match_id"])
+    n_deliveries: int = 0
+    batch_start: int
+    for batch_start in range(0, len(match_ids), args.batch_size):
+        batch_match_ids: List[str] = match_ids[batch_start:batch_start + args.batch_size]
+        batch_match_info: pd.DataFrame = match_info[match_info["match_id"].isin(batch_match_ids)]
+        ball_by_ball_table: pd.DataFrame = database_manager.read_table(BALL_BY_BALL_TABLE_NAME, batch_match_ids)
+        parquet_manager.update_table(MATCH_INFO_TABLE_NAME, batch_match_info, batch_match_info)
+        parquet_manager.update_table(BALL_BY_BALL_TABLE_NAME, ball_by_ball_table, batch_match_info)
+        n_deliveries += len(ball_by_ball_table)
+    return RunStats(len(match_ids), n_deliveries, 0, {}, time.perf_counter() - start)
+
+
+def bench(args: argparse.Namespace) -> List[RunStats]:
+    """
+    Process the source without writing anything, once per combination of
+    `workers` and `batch_size`, and print a line of throughput for each. An
+    archive is downloaded, if needed, before the first run.
+    """
+    match_source: _MatchSource = _get_match_source(args)
+    if isinstance(match_source, DataIngestionManager) and match_source.zip_source is None:
+        match_source.download_data()
+    country_resolver: CountryResolver = _get_country_resolver(args)
+
+    print(f"{'workers':>8}{'batch size':>12}{'matches':>10}{'deliveries':>12}"
+          f"{'seconds':>10}{'matches/s':>12}{'deliveries/s':>14}")
+    all_run_stats: List[RunStats] = []
+    n_workers: int
+    batch_size: int
+    for n_workers in args.workers:
+        for batch_size in args.batch_size:
+            run_stats: RunStats = _process_match_batches(
+                _iter_match_batches(match_source, batch_size, n_workers, args.chunk_size, country_resolver, args.stream)
+            )
+            seconds: float = max(run_stats.seconds, 1e-9)
+            print(f"{n_workers:>8}{batch_size:>12,}{run_stats.n_matches:>10,}{run_stats.n_deliveries:>12,}"
+                  f"{run_stats.seconds:>10.2f}{run_stats.n_matches / seconds:>12,.1f}"
+                  f"{run_stats.n_deliveries / seconds:>14,.0f}")
+            all_run_stats.append(run_stats)
+    return all_run_stats
+
+
+def _add_db_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--db-host", default=os.environ.get("CRICSHEET_DB_HOST", "localhost"))
+    parser.add_argument("--db-port", default=os.environ.get("CRICSHEET_DB_PORT", "5432"))
+    parser.add_argument("--db-username", default=os.environ.get("CRICSHEET_DB_USERNAME", "root"))
+    parser.add_argument("--db-name", default=os.environ.get("CRICSHEET_DB_NAME", "test"))
+    parser.add_argument(
+        "--player-keys",
+        action="store_true",
+        help="Store players in the ball-by-ball table as keys of the player dimension rather than as names. "
+             "A database must always be loaded with or always without it."
+    )
+
+
+def _add_processing_arguments(parser: argparse.ArgumentParser, batch_size: int, sweep: bool = False):
+    # With `sweep`, --workers and --batch-size take several values each.
+    cpu_count: int = os.cpu_count() or 1
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+" if sweep else None,
+        default=sorted({1, cpu_count}) if sweep else None,
+        help="Number of worker processes parsing matches; 1 parses them in this process. "
+             + ("Defaults to 1 and the number of CPUs." if sweep else "Defaults to the number of CPUs.")
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        nargs="+" if sweep else None,
+        default=[batch_size] if sweep else batch_size,
+        help=f"Number of matches written per transaction or Parquet file. Defaults to {batch_size}."
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Number of matches sent to a worker at a time. Defaults to {DEFAULT_CHUNK_SIZE}."
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Decode JSON match files innings by innings rather than whole, which keeps the memory of each "
+             "worker down for long matches. Requires the ijson package."
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Resolve countries with the offline gazetteer only, without remote geocoding."
+    )
+    parser.add_argument(
+        "--geocode-cache",
+        help="JSON file caching resolved countries across runs. Defaults to $CRICSHEET_GEOCODE_CACHE, else "
+             "country_cache.json in the user's cache directory."
+    )
+
+
+def _add_source_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "source",
+        nargs="?",
+        help="Zip archive or directory of match files. Defaults to downloading --url."
+    )
+    parser.add_argument("--url", default=LAST_MONTH_JSON_DATA_URL, help="URL of the archive to download.")
+    parser.add_argument(
+        "--data-dir",
+        help="Directory in which the downloaded archive is kept, so that an unchanged archive is not "
+             "downloaded again. It is only kept in memory otherwise."
+    )
+
+
+def _add_parquet_arguments(parser: argparse.ArgumentParser, required: bool):
+    parser.add_argument("--output-dir", required=required, help="Directory of the Parquet datasets.")
+    parser.add_argument("--compression", default="zstd", help="Parquet compression codec.")
+
+
+def get_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cricsheet",
+        description="Ingest Cricsheet match data into Postgres or Parquet."
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Print the timers and counters of the run's stages when it is done."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Load new and changed matches.")
+    _add_source_arguments(ingest_parser)
+    ingest_parser.add_argument("--sink", choices=SINKS, default="postgres", help="Where tables are written.")
+    ingest_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Process every match of the source without writing anything."
+    )
+    _add_processing_arguments(ingest_parser, DEFAULT_INGEST_BATCH_SIZE)
+    ingest_parser.add_argument(
+        "--profile-dir",
+        help="Directory to write cProfile statistics and tracemalloc snapshots of a sample of matches to. "
+             "Archives are then loaded in this process, one match at a time."
+    )
+    ingest_parser.add_argument(
+        "--profile-every",
+        type=int,
+        help="Profile one of every N matches. Every match is profiled if neither this nor "
+             "--profile-min-bytes is given."
+    )
+    ingest_parser.add_argument(
+        "--profile-min-bytes",
+        type=int,
+        help="Profile matches whose file has at least this many bytes, e.g. long Tests."
+    )
+    _add_parquet_arguments(ingest_parser, required=False)
+    _add_db_arguments(ingest_parser)
+    ingest_parser.set_defaults(run=ingest)
+
+    backfill_parser = subparsers.add_parser("backfill", help="Load a directory of match files, resumably.")
+    backfill_parser.add_argument("directory", help="Directory of match files.")
+    backfill_parser.add_argument(
+        "--checkpoint-name",
+        default=DEFAULT_CHECKPOINT_NAME,
+        help="Name under which progress is saved; one per set of files."
+    )
+    backfill_parser.add_argument("--reset", action="store_true", help="Start over rather than resume.")
+    _add_processing_arguments(backfill_parser, DEFAULT_BACKFILL_BATCH_SIZE)
+    _add_db_arguments(backfill_parser)
+    backfill_parser.set_defaults(run=backfill)
+
+    export_parser = subparsers.add_parser("export", help="Copy the match tables of Postgres to Parquet.")
+    export_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_INGEST_BATCH_SIZE,
+        help=f"Number of matches read and written at a time. Defaults to {DEFAULT_INGEST_BATCH_SIZE}."
+    )
+    _add_parquet_arguments(export_parser, required=True)
+    _add_db_arguments(export_parser)
+    export_parser.set_defaults(run=export)
+
+    bench_parser = subparsers.add_parser("bench", help="Compare worker counts and batch sizes.")
+    _add_source_arguments(bench_parser)
+    _add_processing_arguments(bench_parser, DEFAULT_INGEST_BATCH_SIZE, sweep=True)
+    bench_parser.set_defaults(run=bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run a command.
+
+    :param argv: Command-line arguments. Defaults to `sys.argv[1:]`.
+    :return: Exit status: 0, or `EXIT_STATUS_ERRORS` if any match could not
+    be processed.
+    """
+    parser = get_argument_parser()
+    args: argparse.Namespace = parser.parse_args(argv)
+    if getattr(args, "source", None) is not None and not Path(args.source).exists():
+        parser.error(f"{args.source} does not exist.")
+    if args.command == "ingest" and args.sink == "parquet" and not args.dry_run and args.output_dir is None:
+        parser.error("--output-dir is required with --sink parquet.")
+    if args.command == "ingest" and args.sink == "parquet" and args.player_keys:
+        parser.error("--player-keys only applies to --sink postgres.")
+    if args.command == "ingest" and args.profile_dir is not None and (
+            args.dry_run or args.sink == "parquet" or (args.source is not None and Path(args.source).is_dir())
+    ):
+        parser.error("--profile-dir only applies to archives loaded into Postgres.")
+    if args.command == "ingest" and args.profile_dir is None and (
+            args.profile_every is not None or args.profile_min_bytes is not None
+    ):
+        parser.error("--profile-every and --profile-min-bytes need --profile-dir.")
+    if args.metrics:
+        instrumentation.enable()
+
+    result: Union[RunStats, List[RunStats]] = args.run(args)
+    if isinstance(result, RunStats):
+        print(format_run_stats(result))
+        error_key: str
+        for error_key in list(result.errors)[:MAX_PRINTED_ERRORS]:
+            print(f"{error_key}: {result.errors[error_key]}", file=sys.stderr)
+        if len(result.errors) > MAX_PRINTED_ERRORS:
+            print(f"... and {len(result.errors) - MAX_PRINTED_ERRORS:,} more errors", file=sys.stderr)
+    if args.metrics:
+        print(instrumentation.summary())
+    all_run_stats: List[RunStats] = result if isinstance(result, list) else [result]
+    return EXIT_STATUS_ERRORS if any(run_stats.errors for run_stats in all_run_stats) else 0
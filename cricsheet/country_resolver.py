@@ -0,0 +1,222 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from cricsheet.gazetteer import CITY_TO_COUNTRY, VENUE_TO_COUNTRY
+from cricsheet.instrumentation import instrumentation
+
+# Environment variable overriding the path of the default cache file.
+CACHE_FP_ENV_VAR: str = "CRICSHEET_GEOCODE_CACHE"
+
+
+def get_default_cache_fp() -> str:
+    """
+    Path of the cache file shared by runs that are not given one:
+    `$CRICSHEET_GEOCODE_CACHE` if set, else `country_cache.json` in the
+    user's cache directory, e.g. `~/.cache/cricsheet/`.
+    """
+    if os.environ.get(CACHE_FP_ENV_VAR):
+        return os.environ[CACHE_FP_ENV_VAR]
+    cache_dir: Path = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    return str(cache_dir / "cricsheet" / "country_cache.json")
+
+
+class CountryLookupBackend:
+    """
+    Base class for anything that can map a place name to a country.
+    """
+    # Remote backends are slow and rate limited, so their answers are
+    # written to the on-disk cache as soon as they arrive.
+    is_remote: bool = False
+
+    def lookup(self, place: str) -> Optional[str]:
+        raise NotImplementedError()
+
+
+class GazetteerBackend(CountryLookupBackend):
+    def __init__(self, place_to_country: Optional[Dict[str, str]] = None):
+        """
+        Look places up in an offline gazetteer.
+
+        :param place_to_country: Mapping of city/venue names to countries.
+        Defaults to the gazetteer bundled with the package.
+        """
+        if place_to_country is None:
+            place_to_country = {**CITY_TO_COUNTRY, **VENUE_TO_COUNTRY}
+        self.place_to_country = place_to_country
+
+    def lookup(self, place: str) -> Optional[str]:
+        return self.place_to_country.get(place)
+
+
+class NominatimBackend(CountryLookupBackend):
+    is_remote = True
+
+    def __init__(self, user_agent: str = "de_cricsheet"):
+        """
+        Look places up using OpenStreetMap's Nominatim service.
+
+        :param user_agent: User agent sent to Nominatim.
+        """
+        self.user_agent = user_agent
+        self._geolocator = None
+
+    @property
+    def geolocator(self):
+        # geopy is only needed if a place is missing from every offline
+        # source, so it is not imported until then.
+        if self._geolocator is None:
+            from geopy import Nominatim
+            self._geolocator = Nominatim(user_agent=self.user_agent)
+        return self._geolocator
+
+    def lookup(self, place: str) -> Optional[str]:
+        from geopy.exc import GeopyError
+        try:
+            location = self.geolocator.geocode(
+                place,
+                language="en",
+                addressdetails=True
+            )
+        except GeopyError:
+            # E.g. a timeout or a rate limit rejection. The place is left
+            # unresolved for this run and retried by the next one.
+            instrumentation.count("geocode_errors", backend=type(self).__name__)
+            return None
+        if location is None:
+            return None
+        return location.raw["address"].get("country")
+
+
+class CountryResolver:
+    def __init__(
+            self,
+            backends: Optional[List[CountryLookupBackend]] = None,
+            cache_fp: Optional[str] = None
+    ):
+        """
+        Resolve cities and venues to countries. Every place is looked up at
+        most once per run: answers are kept in a cache that is consulted
+        before any backend and, if `cache_fp` is given, persisted as JSON
+        across runs. Only places that were resolved are persisted; those no
+        backend could resolve, e.g. because Nominatim timed out, are looked
+        up again by later runs.
+
+        :param backends: Backends to query, in order, for places that are not
+        in the cache. Defaults to the offline gazetteer with Nominatim as a
+        fallback.
+        :param cache_fp: Path to a JSON file used as a persistent cache.
+        """
+        if backends is None:
+            backends = [GazetteerBackend(), NominatimBackend()]
+        self.backends = backends
+        self.cache_fp = cache_fp
+        self.cache: Dict[str, Optional[str]] = self._load_cache()
+
+    def _load_cache(self) -> Dict[str, Optional[str]]:
+        if self.cache_fp and Path(self.cache_fp).exists():
+            with open(self.cache_fp, "r") as f:
+                # Caches written by earlier versions also hold misses.
+                return {place: country for place, country in json.load(f).items() if country is not None}
+        return {}
+
+    def save_cache(self):
+        if not self.cache_fp:
+            return
+        cache_fp = Path(self.cache_fp)
+        cache_fp.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file that then replaces the cache, so that
+        # an interrupted write never leaves a truncated cache behind.
+        temp_fp: Path = cache_fp.with_name(f".{cache_fp.name}.tmp")
+        with open(temp_fp, "w") as f:
+            json.dump({place: country for place, country in self.cache.items() if country is not None},
+                      f, indent=2, sort_keys=True)
+        temp_fp.replace(cache_fp)
+
+    def get_offline_copy(self) -> "CountryResolver":
+        """
+        Copy of this resolver for worker processes: it starts from the
+        current in-memory cache, but only queries offline backends and never
+        writes the cache file. Places it cannot resolve are left for this
+        resolver, in the calling process, so that remote backends are never
+        queried from several processes at once and only one process writes
+        the cache file.
+
+        :return: Resolver without remote backends or cache file.
+        """
+        offline_copy = CountryResolver([backend for backend in self.backends if not backend.is_remote])
+        offline_copy.cache = dict(self.cache)
+        return offline_copy
+
+    def _lookup(self, place: str) -> Optional[str]:
+        if place in self.cache:
+            instrumentation.count("geocode_cache_hits")
+            return self.cache[place]
+        instrumentation.count("geocode_cache_misses")
+
+        country: Optional[str] = None
+        queried_remote_backend: bool = False
+        backend: CountryLookupBackend
+        for backend in self.backends:
+            queried_remote_backend = queried_remote_backend or backend.is_remote
+            with instrumentation.timer("geocode_lookup", backend=type(backend).__name__):
+                country = backend.lookup(place)
+            if country is not None:
+                break
+
+        self.cache[place] = country
+        if queried_remote_backend and country is not None:
+            self.save_cache()
+        return country
+
+    def _count_resolved_places(self) -> int:
+        return sum(country is not None for country in self.cache.values())
+
+    def resolve(self, city: Optional[str], venue: Optional[str] = None) -> Optional[str]:
+        """
+        Country a match was played in. The venue is only looked up if the
+        city is missing or cannot be resolved.
+
+        :param city: City in which the match was played.
+        :param venue: Venue at which the match was played.
+        :return: Country name, or None if no backend knows the place.
+        """
+        country: Optional[str] = None
+        if city:
+            country = self._lookup(city)
+        if country is None and venue:
+            country = self._lookup(venue)
+        return country
+
+    def resolve_many(self, places: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve every distinct place in `places`, e.g. all cities in an
+        ingest run, so that later calls to `resolve` are cache hits.
+
+        :param places: City or venue names. Duplicates and empty values are
+        ignored.
+        :return: Mapping of each distinct place to its country.
+        """
+        n_resolved_places: int = self._count_resolved_places()
+        resolved: Dict[str, Optional[str]] = {
+            place: self._lookup(place) for place in set(places) if place
+        }
+        if self._count_resolved_places() > n_resolved_places:
+            self.save_cache()
+        return resolved
+
+
+_default_country_resolver: Optional[CountryResolver] = None
+
+
+def get_default_country_resolver() -> CountryResolver:
+    """
+    Process-wide resolver shared by parsers that are not given one, so that
+    the in-memory cache is reused across matches. It persists its cache to
+    `get_default_cache_fp()`.
+    """
+    global _default_country_resolver
+    if _default_country_resolver is None:
+        _default_country_resolver = CountryResolver(cache_fp=get_default_cache_fp())
+    return _default_country_resolver
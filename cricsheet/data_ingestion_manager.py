@@ -1,25 +1,599 @@
-from typing import Optional
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import urllib.error
+import urllib.request
+import zipfile
+from contextlib import contextmanager
+from http import HTTPStatus
+from pathlib import Path, PurePosixPath
+from typing import IO, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+from urllib.parse import urlparse
+
+from cricsheet.country_resolver import CountryResolver
+from cricsheet.database_manager import MATCH_MANIFEST_COLUMNS, DatabaseManager
+from cricsheet.instrumentation import instrumentation
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_data_processor import (
+    MatchBatch,
+    MatchDataProcessor,
+    MatchFile,
+    get_match_batch,
+    get_process_pool,
+    process_match_files
+)
+from cricsheet.match_profiler import MatchProfiler
+from cricsheet.player_registry import PlayerRegistry
+
+pd = lazy_import("pandas")
+asyncio = lazy_import("asyncio")
 
 LAST_MONTH_DATA_URL: str = "https://cricsheet.org/downloads/recently_played_30_csv2.zip"
+LAST_MONTH_JSON_DATA_URL: str = "https://cricsheet.org/downloads/recently_played_30_json.zip"
+
+# Files kept next to a downloaded archive: the part downloaded so far, and
+# the validators (ETag and Last-Modified) of the last response.
+PARTIAL_DOWNLOAD_SUFFIX: str = ".part"
+DOWNLOAD_VALIDATORS_SUFFIX: str = ".validators.json"
+
+# Bytes written to disk at a time while downloading.
+DOWNLOAD_CHUNK_SIZE: int = 1 << 20
+
+# Number of changed matches loaded per transaction by `ingest_data`.
+DEFAULT_INGEST_BATCH_SIZE: int = 500
+
+# Number of matches each stage of `ingest_data_concurrently` can get ahead
+# of the next one.
+DEFAULT_QUEUE_SIZE: int = 64
+
+
+def _get_info_member(member: str) -> str:
+    member_path = PurePosixPath(member)
+    return str(member_path.with_name(f"{member_path.stem}_info.csv"))
+
+
+class IngestReport(NamedTuple):
+    """
+    Outcome of an ingest run, by match ID.
+    """
+    # Matches that were not in the manifest and have been loaded
+    new: List[str]
+    # Matches whose file changed since they were last loaded, e.g. because
+    # Cricsheet revised them, and whose rows have been replaced
+    updated: List[str]
+    # Matches whose file is unchanged, which were not read at all
+    skipped: List[str]
+    # Error message for each match that could not be processed. These are
+    # not recorded in the manifest, so they are retried on the next run.
+    errors: Dict[str, str]
+
+
+class _IngestPlan(NamedTuple):
+    # Archive member of each match, and the hash of its file(s)
+    match_members: Dict[str, str]
+    file_hashes: Dict[str, str]
+    # Matches to load, in archive order, and which of them are new
+    changed_match_ids: List[str]
+    new_match_ids: Set[str]
+    # Matches whose file is unchanged since they were last loaded
+    skipped_match_ids: List[str]
 
 
 class DataIngestionManager:
-    def __init__(self, data_dir: Optional[str] = None):
-        if data_dir:
-            self.data_dir = data_dir
+    def __init__(
+            self,
+            data_dir: Optional[str] = None,
+            data_url: str = LAST_MONTH_JSON_DATA_URL,
+            zip_fp: Optional[str] = None
+    ):
+        """
+        Read Cricsheet match data straight out of a zip archive, without
+        extracting it to disk.
+
+        :param data_dir: Directory in which downloaded archives are saved. If
+        not given, they are only kept in memory.
+        :param data_url: URL of the zip archive to download.
+        :param zip_fp: Path to an already downloaded zip archive. If given,
+        nothing is downloaded.
+        """
+        self.data_dir = data_dir
+        self.data_url = data_url
+        # The zip archive, either as a path or as the bytes of a download.
+        self.zip_source: Optional[Union[str, bytes]] = zip_fp
+
+    def download_data(self) -> Union[str, bytes]:
+        """
+        Download the zip archive at `data_url`.
+
+        If `data_dir` is set, the archive is saved there along with the
+        `ETag` and `Last-Modified` headers it was served with. Later
+        downloads send them back as `If-None-Match` and `If-Modified-Since`,
+        so an unchanged archive is not transferred again, and a download
+        that was interrupted is resumed from where it stopped, provided the
+        archive has not changed since.
+
+        :return: Path of the saved archive if `data_dir` is set, else the
+        bytes of the archive.
+        """
+        if not self.data_dir:
+            with instrumentation.timer("download"), urllib.request.urlopen(self.data_url) as response:
+                self.zip_source = response.read()
+            instrumentation.count("bytes_downloaded", len(self.zip_source))
+            return self.zip_source
+
+        zip_fp: Path = Path(self.data_dir) / PurePosixPath(urlparse(self.data_url).path).name
+        zip_fp.parent.mkdir(parents=True, exist_ok=True)
+        with instrumentation.timer("download"):
+            self._download_to_file(zip_fp)
+        self.zip_source = str(zip_fp)
+        return self.zip_source
+
+    def _download_to_file(self, zip_fp: Path):
+        partial_fp: Path = zip_fp.with_name(f"{zip_fp.name}{PARTIAL_DOWNLOAD_SUFFIX}")
+        validators_fp: Path = zip_fp.with_name(f"{zip_fp.name}{DOWNLOAD_VALIDATORS_SUFFIX}")
+        # Validators of the last response, which is either the archive or
+        # the partial download if there is one.
+        validators: Dict[str, str] = (json.loads(validators_fp.read_text())
+                                      if validators_fp.exists() else {})
+        validator: Optional[str] = validators.get("ETag") or validators.get("Last-Modified")
+
+        request = urllib.request.Request(self.data_url)
+        if partial_fp.exists() and validator:
+            # The rest of the archive if it is unchanged, else all of it.
+            request.add_header("Range", f"bytes={partial_fp.stat().st_size}-")
+            request.add_header("If-Range", validator)
+        elif zip_fp.exists():
+            if "ETag" in validators:
+                request.add_header("If-None-Match", validators["ETag"])
+            if "Last-Modified" in validators:
+                request.add_header("If-Modified-Since", validators["Last-Modified"])
+
+        try:
+            response = urllib.request.urlopen(request)
+        except urllib.error.HTTPError as e:
+            if e.code == HTTPStatus.NOT_MODIFIED:
+                return
+            if e.code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE:
+                partial_fp.unlink()
+                return self._download_to_file(zip_fp)
+            raise
+
+        with response:
+            validators = {header: response.headers[header]
+                          for header in ["ETag", "Last-Modified"] if response.headers.get(header)}
+            # Saved before the body, so that an interrupted download can be
+            # resumed.
+            validators_fp.write_text(json.dumps(validators))
+            # The status of local files is None; they are always sent whole.
+            is_partial_content: bool = response.status == HTTPStatus.PARTIAL_CONTENT
+            with open(partial_fp, "ab" if is_partial_content else "wb") as f:
+                n_bytes_before: int = f.tell()
+                shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_SIZE)
+                instrumentation.count("bytes_downloaded", f.tell() - n_bytes_before)
+        partial_fp.replace(zip_fp)
+
+    def _open_zip(self) -> zipfile.ZipFile:
+        if self.zip_source is None:
+            self.download_data()
+        if isinstance(self.zip_source, bytes):
+            return zipfile.ZipFile(io.BytesIO(self.zip_source))
+        return zipfile.ZipFile(self.zip_source)
+
+    @staticmethod
+    def _get_match_members(zip_file: zipfile.ZipFile) -> Dict[str, str]:
+        # Only the archive's central directory is read; no member is
+        # decompressed. Matches are JSON files, or ball-by-ball CSV files
+        # that have an info file alongside them; Cricsheet archives also
+        # contain a README.
+        members: List[str] = zip_file.namelist()
+        info_members: set = {member for member in members if member.endswith("_info.csv")}
+        return {
+            PurePosixPath(member).stem: member
+            for member in members
+            if member.endswith(".json") or _get_info_member(member) in info_members
+        }
+
+    @staticmethod
+    def _get_file_hash(zip_file: zipfile.ZipFile, match_member: str) -> str:
+        # The CRC-32 and size of the uncompressed file are stored in the
+        # archive's central directory, so files need not be decompressed to
+        # tell whether they changed. A match in the CSV format changes if
+        # either of its files does.
+        members: List[str] = [match_member]
+        if match_member.endswith(".csv"):
+            members.append(_get_info_member(match_member))
+        return ":".join(
+            f"{zip_info.CRC:08x}-{zip_info.file_size}"
+            for zip_info in map(zip_file.getinfo, members)
+        )
+
+    def file_hashes(self) -> Dict[str, str]:
+        """
+        Hash of the file(s) of each match in the archive, which changes
+        whenever the contents of the files do. Only the archive's central
+        directory is read.
+
+        :return: File hash of each match, by match ID.
+        """
+        with self._open_zip() as zip_file:
+            return {
+                match_id: self._get_file_hash(zip_file, match_member)
+                for match_id, match_member in self._get_match_members(zip_file).items()
+            }
+
+    def match_ids(self) -> List[str]:
+        """
+        IDs of the matches in the archive.
+
+        :return: List of match IDs.
+        """
+        with self._open_zip() as zip_file:
+            return list(self._get_match_members(zip_file))
 
-    def download_data(self):
-        raise NotImplementedError()
+    def iter_match_files(self, match_ids: Optional[List[str]] = None) -> Iterator[IO[bytes]]:
+        """
+        Open the match files in the archive one at a time. Each file is
+        decompressed as it is read and closed before the next one is opened.
+        For matches in the CSV format, this is the ball-by-ball file.
+
+        :param match_ids: IDs of the matches to open. Defaults to all matches
+        in the archive.
+        :return: Iterator of file-like objects named after their match.
+        """
+        with self._open_zip() as zip_file:
+            match_members: Dict[str, str] = self._get_match_members(zip_file)
+            if match_ids is None:
+                match_ids = list(match_members)
+
+            match_id: str
+            for match_id in match_ids:
+                with zip_file.open(match_members[match_id]) as match_file:
+                    yield match_file
+
+    def iter_match_data_processors(
+            self,
+            match_ids: Optional[List[str]] = None,
+            country_resolver: Optional[CountryResolver] = None
+    ) -> Iterator[MatchDataProcessor]:
+        """
+        Processors for the matches in the archive, built one at a time.
+
+        :param match_ids: IDs of the matches to process. Defaults to all
+        matches in the archive.
+        :param country_resolver: Resolver used to find the country each match
+        was played in.
+        :return: Iterator of match data processors.
+        """
+        with self._open_zip() as zip_file:
+            match_members: Dict[str, str] = self._get_match_members(zip_file)
+            if match_ids is None:
+                match_ids = list(match_members)
 
-    def match_ids(self):
-        raise NotImplementedError()
+            match_id: str
+            for match_id in match_ids:
+                with self._open_match_data_processor(
+                        zip_file, match_members[match_id], country_resolver
+                ) as match_data_processor:
+                    yield match_data_processor
+
+    def iter_match_batches(
+            self,
+            match_ids: Optional[List[str]] = None,
+            batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+            n_workers: Optional[int] = None,
+            chunk_size: int = 16,
+            country_resolver: Optional[CountryResolver] = None,
+            stream: bool = False
+    ) -> Iterator[MatchBatch]:
+        """
+        Process the matches in the archive in parallel and yield their tables
+        in batches, without a database, e.g. to write them as Parquet
+        datasets. Unlike `ingest_data`, every match is processed, whether it
+        changed since an earlier run or not.
 
-    def ingest_data(self):
+        :param match_ids: IDs of the matches to process. Defaults to all
+        matches in the archive.
+        :param batch_size: Number of matches per yielded batch.
+        :param n_workers: Number of worker processes. Defaults to the number
+        of CPUs. Matches are processed in this process if it is 1.
+        :param chunk_size: Number of matches sent to a worker at a time. Up to
+        two chunks per worker are decompressed ahead of the ones being
+        batched, which bounds the number of matches held in memory.
+        :param country_resolver: Resolver used to find the country each match
+        was played in. Every worker gets an offline copy, see
+        `get_process_pool`.
+        :param stream: Decode JSON files innings by innings, see
+        `MatchDataProcessor.iter_match_batches`.
+        :return: Iterator of batches, in the order of `match_ids`. Errors are
+        keyed by match ID.
         """
-        1. List match IDs in the new data.
-        2. Fetch existing match IDs in the database.
-        3. Get tables for each match from `MatchDataProcessor`.
-        4. Update tables in the database.
-        :return:
+        with self._open_zip() as zip_file:
+            match_members: Dict[str, str] = self._get_match_members(zip_file)
+            if match_ids is None:
+                match_ids = list(match_members)
+
+            match_batch: MatchBatch
+            for match_batch in MatchDataProcessor.iter_match_batches(
+                    (self._read_match_member(zip_file, match_members[match_id]) for match_id in match_ids),
+                    batch_size=batch_size,
+                    n_workers=n_workers,
+                    chunk_size=chunk_size,
+                    country_resolver=country_resolver,
+                    stream=stream
+            ):
+                yield match_batch._replace(errors=_get_errors_by_match_id(match_batch))
+
+    @staticmethod
+    @contextmanager
+    def _open_match_data_processor(
+            zip_file: zipfile.ZipFile,
+            match_member: str,
+            country_resolver: Optional[CountryResolver]
+    ) -> Iterator[MatchDataProcessor]:
+        with zip_file.open(match_member) as match_file:
+            if match_member.endswith(".csv"):
+                with zip_file.open(_get_info_member(match_member)) as info_file:
+                    yield MatchDataProcessor(match_file, country_resolver, info_file)
+            else:
+                yield MatchDataProcessor(match_file, country_resolver)
+
+    @staticmethod
+    def _read_match_member(zip_file: zipfile.ZipFile, match_member: str) -> MatchFile:
+        # Decompressed contents of the file(s) of a match.
+        with instrumentation.timer("decompress_match_file"):
+            info_bytes: Optional[bytes] = (zip_file.read(_get_info_member(match_member))
+                                           if match_member.endswith(".csv") else None)
+            return MatchFile(match_member, zip_file.read(match_member), info_bytes)
+
+    def _plan_ingest(self, zip_file: zipfile.ZipFile, match_manifest: Dict[str, str]) -> _IngestPlan:
+        match_members: Dict[str, str] = self._get_match_members(zip_file)
+        file_hashes: Dict[str, str] = {
+            match_id: self._get_file_hash(zip_file, match_member)
+            for match_id, match_member in match_members.items()
+        }
+        plan = _IngestPlan(match_members, file_hashes, [], set(), [])
+        match_id: str
+        file_hash: str
+        for match_id, file_hash in file_hashes.items():
+            if match_id not in match_manifest:
+                plan.new_match_ids.add(match_id)
+                plan.changed_match_ids.append(match_id)
+            elif match_manifest[match_id] == file_hash:
+                plan.skipped_match_ids.append(match_id)
+            else:
+                plan.changed_match_ids.append(match_id)
+        instrumentation.count("matches_ingested", len(plan.skipped_match_ids), outcome="skipped")
+        return plan
+
+    def ingest_data(
+            self,
+            database_manager: DatabaseManager,
+            batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+            country_resolver: Optional[CountryResolver] = None,
+            profiler: Optional[MatchProfiler] = None,
+            stream: bool = False,
+            player_registry: Optional[PlayerRegistry] = None
+    ) -> IngestReport:
+        """
+        Load the matches in the archive that are new or changed since they
+        were last loaded into the database:
+
+        1. Hash the file(s) of each match from the archive's central
+           directory, see `file_hashes`.
+        2. Compare them with the match manifest in the database, and skip
+           the matches whose hash is unchanged without reading their files.
+        3. Get tables for the remaining matches from `MatchDataProcessor`.
+        4. Replace the rows of those matches in the database and record
+           their revision and file hash in the manifest, in one transaction
+           per batch, so that an interrupted run only loses its current
+           batch.
+
+        Each step runs after the previous one; `ingest_data_concurrently`
+        overlaps them.
+
+        :param database_manager: Manager of the database to load into.
+        :param batch_size: Number of changed matches loaded per transaction.
+        :param country_resolver: Resolver used to find the country each match
+        was played in.
+        :param profiler: Profiler of a sample of the changed matches. Each
+        sampled match is processed and loaded in a transaction of its own,
+        so that its profile covers everything from parsing its file to
+        writing its rows.
+        :param stream: Decode JSON files innings by innings, see
+        `MatchDataProcessor.iter_match_batches`.
+        :param player_registry: Player dimension, e.g. from
+        `DatabaseManager.load_player_registry`. If given, players are loaded
+        as player keys, see `DatabaseManager.update_match_tables`.
+        :return: Which matches were loaded, skipped or failed.
         """
-        raise NotImplementedError()
\ No newline at end of file
+        with self._open_zip() as zip_file:
+            plan: _IngestPlan = self._plan_ingest(zip_file, database_manager.get_match_manifest())
+            report = IngestReport(new=[], updated=[], skipped=plan.skipped_match_ids, errors={})
+
+            start: int
+            for start in range(0, len(plan.changed_match_ids), batch_size):
+                match_files: List[MatchFile] = []
+                match_id: str
+                for match_id in plan.changed_match_ids[start:start + batch_size]:
+                    match_file: MatchFile = self._read_match_member(zip_file, plan.match_members[match_id])
+                    if profiler is not None and profiler.should_profile(len(match_file.contents)):
+                        with profiler.profile(match_id, len(match_file.contents)):
+                            _load_match_batch(
+                                database_manager,
+                                MatchDataProcessor.process_matches(
+                                    [match_file],
+                                    n_workers=1,
+                                    country_resolver=country_resolver,
+                                    player_registry=player_registry,
+                                    stream=stream
+                                ),
+                                plan,
+                                report,
+                                player_registry
+                            )
+                        continue
+                    match_files.append(match_file)
+                _load_match_batch(
+                    database_manager,
+                    MatchDataProcessor.process_matches(
+                        match_files,
+                        n_workers=1,
+                        country_resolver=country_resolver,
+                        player_registry=player_registry,
+                        stream=stream
+                    ),
+                    plan,
+                    report,
+                    player_registry
+                )
+
+        return report
+
+    async def ingest_data_concurrently(
+            self,
+            database_manager: DatabaseManager,
+            batch_size: int = DEFAULT_INGEST_BATCH_SIZE,
+            n_workers: Optional[int] = None,
+            chunk_size: int = 16,
+            queue_size: int = DEFAULT_QUEUE_SIZE,
+            country_resolver: Optional[CountryResolver] = None,
+            stream: bool = False,
+            player_registry: Optional[PlayerRegistry] = None
+    ) -> IngestReport:
+        """
+        Same as `ingest_data`, but with its stages running at the same time,
+        connected by bounded queues: the archive is downloaded if needed,
+        then match files are decompressed in a thread, parsed in a pool of
+        worker processes, and loaded into the database in a thread, one
+        batch per transaction. While a batch is being loaded, the next ones
+        are already being decompressed and parsed, so a run takes about as
+        long as its slowest stage rather than the sum of all stages. A stage
+        that gets `queue_size` matches ahead of the next one waits for it,
+        which bounds the number of matches held in memory.
+
+        :param database_manager: Manager of the database to load into. It is
+        only used by one thread at a time.
+        :param batch_size: Number of changed matches loaded per transaction.
+        :param n_workers: Number of worker processes parsing matches.
+        Defaults to the number of CPUs.
+        :param chunk_size: Number of matches sent to a worker at a time.
+        :param queue_size: Number of matches each stage can get ahead of the
+        next one.
+        :param country_resolver: Resolver used to find the country each match
+        was played in. Every worker gets an offline copy, see
+        `get_process_pool`.
+        :param stream: Decode JSON files innings by innings, see
+        `MatchDataProcessor.iter_match_batches`.
+        :param player_registry: Player dimension, as for `ingest_data`. It is
+        only used by the thread loading batches.
+        :return: Which matches were loaded, skipped or failed, as for
+        `ingest_data`.
+        """
+        if self.zip_source is None:
+            await asyncio.to_thread(self.download_data)
+        match_manifest: Dict[str, str] = await asyncio.to_thread(database_manager.get_match_manifest)
+        loop = asyncio.get_running_loop()
+
+        with self._open_zip() as zip_file, get_process_pool(n_workers, country_resolver, stream) as executor:
+            plan: _IngestPlan = self._plan_ingest(zip_file, match_manifest)
+            report = IngestReport(new=[], updated=[], skipped=plan.skipped_match_ids, errors={})
+            # Both queues hold chunks of matches in archive order and end
+            # with None. The second one holds the futures of chunks being
+            # parsed, so its size also bounds the number of matches parsed
+            # ahead.
+            read_queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size // chunk_size, 1))
+            parse_queue: asyncio.Queue = asyncio.Queue(maxsize=max(queue_size // chunk_size, 1))
+
+            async def read_matches():
+                start: int
+                for start in range(0, len(plan.changed_match_ids), chunk_size):
+                    match_members: List[str] = [plan.match_members[match_id]
+                                                for match_id in plan.changed_match_ids[start:start + chunk_size]]
+                    await read_queue.put(await asyncio.to_thread(lambda: [
+                        self._read_match_member(zip_file, match_member) for match_member in match_members
+                    ]))
+                await read_queue.put(None)
+
+            async def parse_matches():
+                while (match_files := await read_queue.get()) is not None:
+                    await parse_queue.put(
+                        loop.run_in_executor(executor, process_match_files, match_files)
+                    )
+                await parse_queue.put(None)
+
+            def load_results(results: list):
+                # Countries the workers could not resolve offline are
+                # resolved here too, off the event loop.
+                _load_match_batch(
+                    database_manager,
+                    get_match_batch(results, player_registry=player_registry, country_resolver=country_resolver),
+                    plan,
+                    report,
+                    player_registry
+                )
+
+            async def load_matches():
+                results: list = []
+                while (results_future := await parse_queue.get()) is not None:
+                    results.extend(await results_future)
+                    if len(results) >= batch_size:
+                        await asyncio.to_thread(load_results, results[:batch_size])
+                        results = results[batch_size:]
+                if results:
+                    await asyncio.to_thread(load_results, results)
+
+            tasks: List[asyncio.Task] = [
+                asyncio.create_task(stage()) for stage in [read_matches, parse_matches, load_matches]
+            ]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # If a stage fails, the others would wait on it forever.
+                task: asyncio.Task
+                for task in tasks:
+                    task.cancel()
+
+        return report
+
+
+def _get_errors_by_match_id(match_batch: MatchBatch) -> Dict[str, str]:
+    # Errors of a batch of archive members, which are keyed by member name.
+    return {PurePosixPath(match_member).stem: error for match_member, error in match_batch.errors.items()}
+
+
+def _load_match_batch(
+        database_manager: DatabaseManager,
+        match_batch: MatchBatch,
+        plan: _IngestPlan,
+        report: IngestReport,
+        player_registry: Optional[PlayerRegistry] = None
+):
+    """
+    Load a batch of processed matches in one transaction, and add them, or
+    their errors, to `report`.
+    """
+    if match_batch.errors:
+        report.errors.update(_get_errors_by_match_id(match_batch))
+        instrumentation.count("matches_ingested", len(match_batch.errors), outcome="error")
+    manifest_rows: List[dict] = [
+        {"match_id": match_id, "revision": revision, "file_hash": plan.file_hashes[match_id]}
+        for match_id, revision in match_batch.revisions.items()
+    ]
+    if not manifest_rows:
+        return
+
+    loaded_match_ids: List[str] = [row["match_id"] for row in manifest_rows]
+    with instrumentation.timer("load_batch"), database_manager.transaction():
+        # Rows of revised matches are replaced by match ID.
+        database_manager.update_match_tables(match_batch, mode="upsert", player_registry=player_registry)
+        database_manager.update_match_manifest(
+            pd.DataFrame(manifest_rows, columns=MATCH_MANIFEST_COLUMNS)
+        )
+        database_manager.register_match_ids(loaded_match_ids)
+    match_id: str
+    for match_id in loaded_match_ids:
+        is_new: bool = match_id in plan.new_match_ids
+        (report.new if is_new else report.updated).append(match_id)
+        instrumentation.count("matches_ingested", outcome="new" if is_new else "updated")
@@ -1,6 +1,151 @@
-import pandas as pd
-import sqlalchemy
-from sqlalchemy import create_engine, Engine
+from __future__ import annotations
+
+import csv
+import datetime
+import io
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from cricsheet.instrumentation import instrumentation
+from cricsheet.lazy_import import lazy_import
+from cricsheet.player_registry import PLAYER_TABLE_COLUMNS, PlayerRegistry
+from cricsheet.table_schemas import (
+    BALL_BY_BALL_TABLE_NAME,
+    INGEST_CHECKPOINT_TABLE_NAME,
+    MATCH_INFO_TABLE_NAME,
+    MATCH_MANIFEST_TABLE_NAME,
+    MATCH_REGISTRY_TABLE_NAME,
+    PLAYER_MATCH_TABLE_NAME,
+    PLAYER_TABLE_NAME,
+    SEASON_COLUMN,
+    TableSchema,
+    get_table_schemas
+)
+
+if TYPE_CHECKING:
+    from cricsheet.match_data_processor import MatchBatch
+
+pd = lazy_import("pandas")
+sqlalchemy = lazy_import("sqlalchemy")
+pandas_sql = lazy_import("pandas.io.sql")
+
+# Number of rows sent to the database per COPY/INSERT statement.
+DEFAULT_CHUNK_SIZE: int = 50_000
+
+# Connection pool settings of the engine, see `DatabaseManager`.
+DEFAULT_POOL_SIZE: int = 5
+DEFAULT_MAX_OVERFLOW: int = 5
+# Seconds after which a pooled connection is replaced rather than reused.
+DEFAULT_POOL_RECYCLE: int = 3600
+# Number of compiled SQL statements the engine keeps, so that statements
+# repeated for every batch are only compiled once.
+DEFAULT_QUERY_CACHE_SIZE: int = 500
+
+# Marker for NULL in the CSV streamed to COPY. COPY's default marker, an
+# unquoted empty field, is also how the csv module writes empty strings.
+COPY_NULL: str = "\\N"
+
+
+def _format_postgres_array(values: list) -> str:
+    elements: List[str] = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        else:
+            escaped_value: str = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            elements.append(f'"{escaped_value}"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _write_copy_csv(rows: Iterable[tuple], buffer: io.StringIO):
+    """
+    Write rows in the CSV dialect expected by `COPY ... FROM STDIN WITH CSV`.
+    Missing values are written as `COPY_NULL` and lists as Postgres array
+    literals.
+    """
+    writer = csv.writer(buffer, lineterminator="\n")
+    row: tuple
+    for row in rows:
+        writer.writerow([
+            COPY_NULL if value is None
+            else _format_postgres_array(value) if isinstance(value, (list, tuple))
+            else value
+            for value in row
+        ])
+
+
+def _insert_with_copy(
+        pd_table: Any,
+        conn: sqlalchemy.Connection,
+        keys: List[str],
+        data_iter: Iterable[tuple]
+):
+    """
+    `DataFrame.to_sql` insertion method that streams a chunk of rows into
+    Postgres with `COPY FROM STDIN` instead of issuing INSERT statements.
+    """
+    buffer = io.StringIO()
+    _write_copy_csv(data_iter, buffer)
+    buffer.seek(0)
+
+    columns: str = ", ".join(f'"{key}"' for key in keys)
+    table_name: str = (f'"{pd_table.schema}"."{pd_table.name}"'
+                       if pd_table.schema else f'"{pd_table.name}"')
+    copy_sql: str = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+
+    dbapi_conn = conn.connection
+    with dbapi_conn.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(sql=copy_sql, file=buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _insert_rows(
+        conn: sqlalchemy.Connection,
+        db_table_name: str,
+        table: pd.DataFrame,
+        method: str,
+        chunk_size: Optional[int]
+):
+    """
+    Insert rows into an existing table, as `DataFrame.to_sql` with
+    `if_exists="append"` would, but without first asking the database
+    whether the table exists, which costs a round trip per call.
+    """
+    sql_table = pandas_sql.SQLTable(
+        db_table_name,
+        pandas_sql.SQLDatabase(conn),
+        frame=table,
+        index=False,
+        if_exists="append"
+    )
+    sql_table.insert(chunksize=chunk_size, method=UPDATE_TABLE_METHODS[method])
+
+
+UPDATE_TABLE_METHODS: dict = {
+    # Postgres COPY; by far the fastest way to load a large table.
+    "copy": _insert_with_copy,
+    # One multi-row INSERT statement per chunk.
+    "multi": "multi",
+    # One INSERT per row, sent with `executemany`.
+    "insert": None
+}
+
+# How rows are combined with those already in the database table:
+# - "append" adds them as they are.
+# - "upsert" replaces every existing row of the matches being loaded, so
+#   re-loading a match never duplicates its rows.
+UPDATE_TABLE_MODES: List[str] = ["append", "upsert"]
+
+# Column identifying the match a row belongs to in every table.
+MATCH_ID_COLUMN: str = "match_id"
+
+# Columns of the tables passed to `DatabaseManager.update_match_manifest`.
+MATCH_MANIFEST_COLUMNS: List[str] = [MATCH_ID_COLUMN, "revision", "file_hash"]
 
 
 class DatabaseManager:
@@ -10,54 +155,611 @@ class DatabaseManager:
             db_port: str,
             db_username: str,
             db_password: str,
-            db_name: str
+            db_name: str,
+            pool_size: int = DEFAULT_POOL_SIZE,
+            max_overflow: int = DEFAULT_MAX_OVERFLOW,
+            pool_pre_ping: bool = True,
+            pool_recycle: int = DEFAULT_POOL_RECYCLE,
+            query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+            table_schemas: Optional[Dict[str, TableSchema]] = None,
+            **engine_kwargs
     ):
-        self.db_engine: Engine = create_engine(
-            f"postgresql://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}"
+        """
+        Read and write tables in a Postgres database. One manager, and so one
+        engine and connection pool, should be shared by everything loading
+        into the database from a process. A manager is not thread-safe.
+
+        :param db_host: Database host.
+        :param db_port: Database port.
+        :param db_username: Database user.
+        :param db_password: Password of the database user.
+        :param db_name: Name of the database.
+        :param pool_size: Number of connections kept open in the pool.
+        :param max_overflow: Number of connections opened beyond `pool_size`
+        when all pooled connections are in use.
+        :param pool_pre_ping: Check that a pooled connection is alive before
+        handing it out, so that connections dropped by the server, e.g.
+        while a large batch was being parsed, are replaced transparently.
+        :param pool_recycle: Seconds after which a pooled connection is
+        replaced.
+        :param query_cache_size: Number of compiled SQL statements cached by
+        the engine.
+        :param table_schemas: Declared schemas of tables, by table name, in
+        addition to or instead of those of `get_table_schemas()`. Tables
+        without a declared schema get one inferred from the first rows
+        loaded into them.
+        :param engine_kwargs: Other arguments of `sqlalchemy.create_engine`.
+        """
+        self.db_engine: sqlalchemy.Engine = sqlalchemy.create_engine(
+            f"postgresql://{db_username}:{db_password}@{db_host}:{db_port}/{db_name}",
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=pool_pre_ping,
+            pool_recycle=pool_recycle,
+            query_cache_size=query_cache_size,
+            **engine_kwargs
         )
+        self.table_schemas: Dict[str, TableSchema] = {**get_table_schemas(), **(table_schemas or {})}
+        # IDs in the match registry, fetched on first use and then kept up to
+        # date by `register_match_ids`.
+        self._existing_match_ids: Optional[Set[str]] = None
+        # File hash of each match in the match manifest, fetched on first use
+        # and then kept up to date by `update_match_manifest`.
+        self._match_manifest: Optional[Dict[str, str]] = None
+        # Names of the tables in the database, fetched on first use and then
+        # kept up to date by `create_table` and `delete_table`.
+        self._table_names: Optional[Set[str]] = None
+        # Connection of the transaction opened by `transaction`, if any.
+        self._connection: Optional[sqlalchemy.Connection] = None
+        # Functions to call once that transaction is committed, see
+        # `_after_commit`.
+        self._after_commit_callbacks: List[Callable[[], None]] = []
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlalchemy.Connection]:
+        """
+        Run every statement issued within the block, e.g. the updates of all
+        tables of a batch of matches, on one connection and in one
+        transaction, committed at the end of the block. If the block raises,
+        the transaction is rolled back, and the cached table names, match
+        IDs and match manifest are re-read from the database on next use. Blocks can be
+        nested; inner blocks join the outer transaction. In-memory state that
+        mirrors what the transaction writes, e.g. which players of a
+        `PlayerRegistry` are persisted, is only updated once the outermost
+        block commits.
+
+        :return: The connection of the transaction.
+        """
+        if self._connection is not None:
+            yield self._connection
+            return
+
+        try:
+            with self.db_engine.begin() as conn:
+                self._connection = conn
+                yield conn
+        except BaseException:
+            self._table_names = None
+            self._existing_match_ids = None
+            self._match_manifest = None
+            raise
+        else:
+            self._connection = None
+            callback: Callable[[], None]
+            for callback in self._after_commit_callbacks:
+                callback()
+        finally:
+            self._connection = None
+            self._after_commit_callbacks = []
+
+    def _after_commit(self, callback: Callable[[], None]):
+        # Call `callback` once what was written so far is committed: at the
+        # end of the current `transaction`, or straight away outside of one,
+        # where every `_begin` block commits on its own.
+        if self._connection is not None:
+            self._after_commit_callbacks.append(callback)
+        else:
+            callback()
+
+    @contextmanager
+    def _begin(self) -> Iterator[sqlalchemy.Connection]:
+        # The connection of the current `transaction`, or else a connection
+        # of its own in a transaction committed at the end of the block.
+        if self._connection is not None:
+            yield self._connection
+        else:
+            with self.db_engine.begin() as conn:
+                yield conn
 
     def update_table(
             self,
             db_table_name: str,
-            table: pd.DataFrame
+            table: pd.DataFrame,
+            method: str = "copy",
+            chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+            mode: str = "append",
+            primary_key: Optional[List[str]] = None
     ):
-        if not self.table_exists(db_table_name):
-            self.create_table(db_table_name, table)
+        """
+        Add a table to a database table, creating the latter if needed.
 
-        table.to_sql(
-            db_table_name,
-            con=self.db_engine,
-            if_exists="append"
-        )
+        :param db_table_name: Name of the table in the database.
+        :param table: Rows to add.
+        :param method: How rows are sent to the database; one of the keys of
+        `UPDATE_TABLE_METHODS`.
+        :param chunk_size: Number of rows sent per statement. All rows are
+        sent at once if None.
+        :param mode: One of `UPDATE_TABLE_MODES`.
+        :param primary_key: Columns making up the primary key of the database
+        table. Only used if the table has to be created and has no declared
+        schema.
+        """
+        if method not in UPDATE_TABLE_METHODS:
+            raise ValueError(
+                f"Unknown method '{method}'. Expected one of {list(UPDATE_TABLE_METHODS)}."
+            )
+        if mode not in UPDATE_TABLE_MODES:
+            raise ValueError(
+                f"Unknown mode '{mode}'. Expected one of {UPDATE_TABLE_MODES}."
+            )
+
+        with instrumentation.timer("update_table", table=db_table_name):
+            if not self.table_exists(db_table_name):
+                self.create_table(db_table_name, table, primary_key)
+
+            table_schema: Optional[TableSchema] = self.table_schemas.get(db_table_name)
+            if table_schema is not None:
+                table = self._prepare_table(table_schema, table)
+
+            if mode == "upsert":
+                self._upsert_table(db_table_name, table, method, chunk_size)
+            else:
+                with self._begin() as conn:
+                    _insert_rows(conn, db_table_name, table, method, chunk_size)
+        instrumentation.count("rows_written", len(table), table=db_table_name)
+
+    def _prepare_table(self, table_schema: TableSchema, table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Make the rows of a table with a declared schema loadable: integer
+        columns read as floats because of missing values, e.g. `won_by_runs`,
+        become nullable integers, lists of ISO dates become lists of dates,
+        and the partitions the rows belong to are created.
+        """
+        float_integer_columns: List[str] = [
+            column for column in table_schema.integer_columns
+            if column in table.columns and pd.api.types.is_float_dtype(table[column])
+        ]
+        if float_integer_columns:
+            table = table.astype({column: "Int64" for column in float_integer_columns})
+
+        # Dates are sent as dates rather than strings, which Postgres will not
+        # cast to dates inside an array in an INSERT.
+        date_array_columns: List[str] = [column for column in table_schema.date_array_columns
+                                         if column in table.columns]
+        if date_array_columns:
+            table = table.assign(**{
+                column: table[column].map(
+                    lambda dates: [datetime.date.fromisoformat(date) if isinstance(date, str) else date
+                                   for date in dates] if isinstance(dates, list) else dates
+                )
+                for column in date_array_columns
+            })
+
+        if table_schema.partition_column is not None:
+            partition_column: str = table_schema.partition_column
+            if partition_column not in table.columns:
+                raise ValueError(
+                    f"Table '{table_schema.name}' is partitioned by '{partition_column}', "
+                    f"which is missing from the rows to load."
+                )
+            self._create_partitions(table_schema, table[partition_column].dropna().unique())
+        return table
+
+    def _create_partitions(self, table_schema: TableSchema, partition_values: Iterable[str]):
+        if self._table_names is None:
+            self.refresh_table_names()
+        new_partition_values: List[str] = [
+            str(value) for value in partition_values
+            if table_schema.get_partition_name(str(value)) not in self._table_names
+        ]
+        if not new_partition_values:
+            return
+        with self._begin() as conn:
+            for partition_value in new_partition_values:
+                # Partition bounds cannot be bound parameters, so the value is
+                # inlined as a quoted literal.
+                conn.exec_driver_sql(sqlalchemy.text(
+                    table_schema.get_create_partition_statement(partition_value)
+                ).bindparams(partition_value=partition_value).compile(
+                    dialect=conn.dialect, compile_kwargs={"literal_binds": True}
+                ).string)
+        self._table_names.update(table_schema.get_partition_name(value) for value in new_partition_values)
+
+    def update_match_tables(
+            self,
+            match_batch: MatchBatch,
+            mode: str = "upsert",
+            player_registry: Optional[PlayerRegistry] = None
+    ):
+        """
+        Load the match info and ball-by-ball tables of a batch of matches in
+        one transaction. If the ball-by-ball table is partitioned by season,
+        each delivery's season is taken from the match info.
 
-    def update_player_id_table(self):
-        raise NotImplementedError()
+        :param match_batch: Tables of the matches, e.g. from
+        `MatchDataProcessor.iter_match_batches`.
+        :param mode: One of `UPDATE_TABLE_MODES`.
+        :param player_registry: Player dimension the ball-by-ball table was
+        encoded with, see `MatchDataProcessor.iter_match_batches`. If given,
+        its new players and the people of each match are loaded in the same
+        transaction. The manager's ball-by-ball schema must then be that of
+        `get_table_schemas(player_keys=True)`.
+        """
+        ball_by_ball_table: pd.DataFrame = match_batch.ball_by_ball
+        if self.table_schemas[BALL_BY_BALL_TABLE_NAME].partition_column == SEASON_COLUMN:
+            seasons: pd.Series = match_batch.match_info.set_index(MATCH_ID_COLUMN)[SEASON_COLUMN]
+            ball_by_ball_table = ball_by_ball_table.assign(**{
+                SEASON_COLUMN: seasons.reindex(ball_by_ball_table[MATCH_ID_COLUMN].astype("object")).to_numpy()
+            })
 
-    def update_player_match_table(self):
-        raise NotImplementedError()
+        with self.transaction():
+            self.update_table(MATCH_INFO_TABLE_NAME, match_batch.match_info, mode=mode)
+            self.update_table(BALL_BY_BALL_TABLE_NAME, ball_by_ball_table, mode=mode)
+            if player_registry is not None:
+                self.update_player_match_table(player_registry.get_player_match_table(match_batch.people))
+                self.update_player_id_table(player_registry)
+
+    def _upsert_table(
+            self,
+            db_table_name: str,
+            table: pd.DataFrame,
+            method: str,
+            chunk_size: Optional[int]
+    ):
+        """
+        Replace the rows of every match in `table` in one transaction. The
+        rows are bulk loaded into an unindexed temporary table first, then
+        the matches' existing rows are deleted and the staged rows inserted.
+        """
+        staging_table_name: str = f"{db_table_name}_staging"
+        with self._begin() as conn:
+            conn.execute(sqlalchemy.text(
+                f'CREATE TEMPORARY TABLE "{staging_table_name}" '
+                f'(LIKE "{db_table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+            ))
+            _insert_rows(conn, staging_table_name, table, method, chunk_size)
+            conn.execute(sqlalchemy.text(
+                f'DELETE FROM "{db_table_name}" WHERE "{MATCH_ID_COLUMN}" IN '
+                f'(SELECT DISTINCT "{MATCH_ID_COLUMN}" FROM "{staging_table_name}")'
+            ))
+            conn.execute(sqlalchemy.text(
+                f'INSERT INTO "{db_table_name}" SELECT * FROM "{staging_table_name}"'
+            ))
+            # Dropped now rather than at commit, in case the same table is
+            # upserted again in the same transaction.
+            conn.execute(sqlalchemy.text(f'DROP TABLE "{staging_table_name}"'))
+
+    def load_player_registry(self) -> PlayerRegistry:
+        """
+        Player dimension as stored in the database, so that players keep
+        their keys across runs.
+
+        :return: Player registry holding every player in the database.
+        """
+        self._create_declared_table(PLAYER_TABLE_NAME)
+        with self._begin() as conn:
+            player_table: pd.DataFrame = pd.read_sql(
+                sqlalchemy.text(f'SELECT {", ".join(PLAYER_TABLE_COLUMNS)} FROM "{PLAYER_TABLE_NAME}" ORDER BY player_key'),
+                conn
+            )
+        return PlayerRegistry(player_table)
+
+    def update_player_id_table(self, player_registry: PlayerRegistry):
+        """
+        Add the players that are new to the player dimension. Only one run
+        should add players at a time: keys are handed out in memory, and the
+        unique index on `player_id` rejects a player added twice under
+        different keys.
+
+        :param player_registry: Registry loaded with `load_player_registry`.
+        """
+        new_players: pd.DataFrame = player_registry.get_new_players()
+        if new_players.empty:
+            return
+        self._create_declared_table(PLAYER_TABLE_NAME)
+        with self._begin() as conn:
+            new_players.to_sql(
+                PLAYER_TABLE_NAME,
+                con=conn,
+                if_exists="append",
+                index=False,
+                method=_insert_with_copy
+            )
+        # Players added to the registry after this point are not written yet.
+        n_players: int = len(player_registry)
+        self._after_commit(lambda: player_registry.mark_persisted(n_players))
+
+    def update_player_match_table(self, player_match_table: pd.DataFrame):
+        """
+        Replace the people recorded for each match in `player_match_table`.
+
+        :param player_match_table: Table with the columns `match_id` and
+        `player_key`, see `PlayerRegistry.get_player_match_table`.
+        """
+        self.update_table(
+            PLAYER_MATCH_TABLE_NAME,
+            player_match_table.drop_duplicates(),
+            mode="upsert",
+            primary_key=[MATCH_ID_COLUMN, "player_key"]
+        )
 
     def table_exists(
             self,
             db_table_name: str
     ):
-        return sqlalchemy.inspect(self.db_engine).has_table(db_table_name)
+        if self._table_names is None:
+            self.refresh_table_names()
+        return db_table_name in self._table_names
+
+    def refresh_table_names(self):
+        """
+        Re-read the names of the tables in the database, e.g. if tables may
+        have been created or dropped by another process.
+        """
+        with self._begin() as conn:
+            self._table_names = set(sqlalchemy.inspect(conn).get_table_names())
 
     def create_table(
             self,
             db_table_name: str,
-            table: pd.DataFrame
+            table: pd.DataFrame,
+            primary_key: Optional[List[str]] = None
     ):
-        table.head(n=0).to_sql(
-            name=db_table_name,
-            con=self.db_engine,
-            if_exists="replace"
-        )
+        """
+        Create a database table. Tables with a declared schema, see
+        `table_schemas`, are created from it, with their indexes, and
+        are left as they are if they already exist. Other tables get column
+        types inferred from `table` and replace any existing table.
+
+        :param db_table_name: Name of the table in the database.
+        :param table: Rows the table is for.
+        :param primary_key: Columns making up the primary key of a table
+        without a declared schema.
+        """
+        if db_table_name in self.table_schemas:
+            self._create_declared_table(db_table_name)
+            return
+
+        with self._begin() as conn:
+            table.head(n=0).to_sql(
+                name=db_table_name,
+                con=conn,
+                if_exists="replace",
+                index=False
+            )
+            if primary_key:
+                # Also indexes the leading column, e.g. match_id, which keeps
+                # the deletes of an upsert from scanning the whole table.
+                primary_key_columns: str = ", ".join(f'"{column}"' for column in primary_key)
+                conn.execute(sqlalchemy.text(
+                    f'ALTER TABLE "{db_table_name}" ADD PRIMARY KEY ({primary_key_columns})'
+                ))
+        if self._table_names is not None:
+            self._table_names.add(db_table_name)
+
+    def _create_declared_table(self, db_table_name: str):
+        # Skips the round trips of the CREATE ... IF NOT EXISTS statements
+        # for tables already known to exist.
+        if self.table_exists(db_table_name):
+            return
+        with self._begin() as conn:
+            statement: str
+            for statement in self.table_schemas[db_table_name].get_create_statements():
+                conn.execute(sqlalchemy.text(statement))
+        if self._table_names is not None:
+            self._table_names.add(db_table_name)
 
     def delete_table(
             self,
             db_table_name: str
     ):
-        raise NotImplementedError()
+        with self._begin() as conn:
+            conn.execute(sqlalchemy.text(f'DROP TABLE IF EXISTS "{db_table_name}"'))
+        if self._table_names is not None:
+            self._table_names.discard(db_table_name)
+
+    def read_table(
+            self,
+            db_table_name: str,
+            match_ids: Optional[Iterable[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Read a table, or only the rows of some matches.
+
+        :param db_table_name: Name of the table in the database.
+        :param match_ids: IDs of the matches whose rows are read, for tables
+        with a `match_id` column. Defaults to all rows.
+        :return: Pandas dataframe with the requested rows.
+        """
+        query: str = f'SELECT * FROM "{db_table_name}"'
+        params: Dict[str, Any] = {}
+        if match_ids is not None:
+            query += f' WHERE "{MATCH_ID_COLUMN}" = ANY(:match_ids)'
+            params["match_ids"] = list(match_ids)
+        with self._begin() as conn:
+            return pd.read_sql(sqlalchemy.text(query), conn, params=params)
+
+    def get_existing_match_ids(self, refresh: bool = False) -> Set[str]:
+        """
+        IDs of all matches already in the database. They are read from the
+        match registry with a single query the first time, and served from
+        memory afterwards.
+
+        :param refresh: Re-read the IDs from the database even if they are
+        already in memory, e.g. if another process may have loaded matches.
+        :return: Set of match IDs.
+        """
+        if self._existing_match_ids is None or refresh:
+            self._create_declared_table(MATCH_REGISTRY_TABLE_NAME)
+            with self._begin() as conn:
+                self._existing_match_ids = set(conn.execute(sqlalchemy.text(
+                    f'SELECT "{MATCH_ID_COLUMN}" FROM "{MATCH_REGISTRY_TABLE_NAME}"'
+                )).scalars())
+        return self._existing_match_ids
+
+    def get_new_match_ids(self, match_ids: Iterable[str]) -> List[str]:
+        """
+        Match IDs that are not in the database yet, in their original order.
+
+        :param match_ids: Candidate match IDs, e.g. those in a Cricsheet dump.
+        :return: List of match IDs.
+        """
+        existing_match_ids: Set[str] = self.get_existing_match_ids()
+        return [match_id for match_id in match_ids
+                if match_id not in existing_match_ids]
+
+    def register_match_ids(self, match_ids: Iterable[str]):
+        """
+        Record matches as loaded. This should be called once all tables of
+        the matches have been updated.
+
+        :param match_ids: IDs of the loaded matches.
+        """
+        match_ids = list(match_ids)
+        if not match_ids:
+            return
+
+        existing_match_ids: Set[str] = self.get_existing_match_ids()
+        with self._begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    f'INSERT INTO "{MATCH_REGISTRY_TABLE_NAME}" ("{MATCH_ID_COLUMN}") '
+                    f'VALUES (:match_id) ON CONFLICT DO NOTHING'
+                ),
+                [{"match_id": match_id} for match_id in match_ids]
+            )
+        existing_match_ids.update(match_ids)
+
+    def get_match_manifest(self, refresh: bool = False) -> Dict[str, str]:
+        """
+        Hash of the file each ingested match was last loaded from. Like the
+        match registry, it is read with a single query the first time and
+        served from memory afterwards.
+
+        :param refresh: Re-read the manifest from the database even if it is
+        already in memory.
+        :return: File hash of each match, by match ID.
+        """
+        if self._match_manifest is None or refresh:
+            self._create_declared_table(MATCH_MANIFEST_TABLE_NAME)
+            with self._begin() as conn:
+                self._match_manifest = dict(conn.execute(sqlalchemy.text(
+                    f'SELECT "{MATCH_ID_COLUMN}", "file_hash" FROM "{MATCH_MANIFEST_TABLE_NAME}"'
+                )).all())
+        return self._match_manifest
+
+    def update_match_manifest(self, manifest_table: pd.DataFrame):
+        """
+        Record the files matches were loaded from, replacing the entries of
+        matches loaded before. This should be called in the same
+        transaction as the updates of the matches' tables.
+
+        :param manifest_table: One row per match, with the columns in
+        `MATCH_MANIFEST_COLUMNS`. Revisions may be missing.
+        """
+        if manifest_table.empty:
+            return
+
+        rows: List[Dict[str, Any]] = [
+            {
+                "match_id": str(match_id),
+                "revision": None if pd.isna(revision) else int(revision),
+                "file_hash": file_hash
+            }
+            for match_id, revision, file_hash in manifest_table[MATCH_MANIFEST_COLUMNS].itertuples(index=False)
+        ]
+        match_manifest: Dict[str, str] = self.get_match_manifest()
+        with self._begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    f'INSERT INTO "{MATCH_MANIFEST_TABLE_NAME}" ("{MATCH_ID_COLUMN}", "revision", "file_hash") '
+                    f'VALUES (:match_id, :revision, :file_hash) '
+                    f'ON CONFLICT ("{MATCH_ID_COLUMN}") DO UPDATE SET '
+                    f'"revision" = EXCLUDED."revision", "file_hash" = EXCLUDED."file_hash", '
+                    f'"ingested_at" = now()'
+                ),
+                rows
+            )
+        match_manifest.update((row["match_id"], row["file_hash"]) for row in rows)
+
+    def get_ingest_checkpoint(self, checkpoint_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Progress recorded by `save_ingest_checkpoint`.
+
+        :param checkpoint_name: Name of the checkpoint, e.g. of a backfill.
+        :return: Dict with the number of committed batches (`n_batches`) and
+        of match files in them (`n_match_files`), the ID of the last of those
+        matches (`last_match_id`) and when it was saved (`updated_at`), or
+        None if there is no such checkpoint.
+        """
+        self._create_declared_table(INGEST_CHECKPOINT_TABLE_NAME)
+        with self._begin() as conn:
+            checkpoint: Optional[sqlalchemy.Row] = conn.execute(
+                sqlalchemy.text(
+                    f'SELECT "n_batches", "n_match_files", "last_match_id", "updated_at" '
+                    f'FROM "{INGEST_CHECKPOINT_TABLE_NAME}" WHERE "checkpoint_name" = :checkpoint_name'
+                ),
+                {"checkpoint_name": checkpoint_name}
+            ).one_or_none()
+        return dict(checkpoint._mapping) if checkpoint is not None else None
+
+    def save_ingest_checkpoint(
+            self,
+            checkpoint_name: str,
+            n_batches: int,
+            n_match_files: int,
+            last_match_id: Optional[str]
+    ):
+        """
+        Record how far an ingest has got, replacing any earlier checkpoint of
+        the same name. This should be called in the same transaction as the
+        updates of the tables of the batch it records, so that the checkpoint
+        never gets ahead of, or falls behind, the data.
+
+        :param checkpoint_name: Name of the checkpoint.
+        :param n_batches: Number of batches committed so far.
+        :param n_match_files: Number of match files in those batches,
+        including any that could not be processed.
+        :param last_match_id: ID of the last of those matches.
+        """
+        self._create_declared_table(INGEST_CHECKPOINT_TABLE_NAME)
+        with self._begin() as conn:
+            conn.execute(
+                sqlalchemy.text(
+                    f'INSERT INTO "{INGEST_CHECKPOINT_TABLE_NAME}" '
+                    f'("checkpoint_name", "n_batches", "n_match_files", "last_match_id") '
+                    f'VALUES (:checkpoint_name, :n_batches, :n_match_files, :last_match_id) '
+                    f'ON CONFLICT ("checkpoint_name") DO UPDATE SET '
+                    f'"n_batches" = EXCLUDED."n_batches", "n_match_files" = EXCLUDED."n_match_files", '
+                    f'"last_match_id" = EXCLUDED."last_match_id", "updated_at" = now()'
+                ),
+                {
+                    "checkpoint_name": checkpoint_name,
+                    "n_batches": n_batches,
+                    "n_match_files": n_match_files,
+                    "last_match_id": last_match_id
+                }
+            )
+
+    def delete_ingest_checkpoint(self, checkpoint_name: str):
+        """
+        Forget the progress of an ingest, so that it starts over next time.
 
-    def get_existing_match_ids(self):
-        raise NotImplementedError()
+        :param checkpoint_name: Name of the checkpoint.
+        """
+        self._create_declared_table(INGEST_CHECKPOINT_TABLE_NAME)
+        with self._begin() as conn:
+            conn.execute(
+                sqlalchemy.text(f'DELETE FROM "{INGEST_CHECKPOINT_TABLE_NAME}" WHERE "checkpoint_name" = :checkpoint_name'),
+                {"checkpoint_name": checkpoint_name}
+            )
@@ -0,0 +1,211 @@
+"""
+Offline gazetteer mapping the cities and venues that appear in Cricsheet
+data to the country they are in.
+
+Country names follow the names Cricsheet uses for national teams wherever
+such a team exists (e.g. "England" rather than "United Kingdom") so that
+they can be compared directly against team names.
+"""
+from typing import Dict
+
+CITY_TO_COUNTRY: Dict[str, str] = {
+    # Afghanistan
+    "Kabul": "Afghanistan",
+    # Australia
+    "Adelaide": "Australia",
+    "Brisbane": "Australia",
+    "Cairns": "Australia",
+    "Canberra": "Australia",
+    "Darwin": "Australia",
+    "Geelong": "Australia",
+    "Hobart": "Australia",
+    "Launceston": "Australia",
+    "Mackay": "Australia",
+    "Melbourne": "Australia",
+    "Perth": "Australia",
+    "Sydney": "Australia",
+    "Townsville": "Australia",
+    # Bangladesh
+    "Bogra": "Bangladesh",
+    "Chattogram": "Bangladesh",
+    "Chittagong": "Bangladesh",
+    "Dhaka": "Bangladesh",
+    "Fatullah": "Bangladesh",
+    "Khulna": "Bangladesh",
+    "Mirpur": "Bangladesh",
+    "Sylhet": "Bangladesh",
+    # Canada
+    "King City": "Canada",
+    "Toronto": "Canada",
+    # England and Wales
+    "Birmingham": "England",
+    "Bristol": "England",
+    "Canterbury": "England",
+    "Chelmsford": "England",
+    "Chester-le-Street": "England",
+    "Derby": "England",
+    "Hove": "England",
+    "Leeds": "England",
+    "Leicester": "England",
+    "London": "England",
+    "Manchester": "England",
+    "Northampton": "England",
+    "Nottingham": "England",
+    "Southampton": "England",
+    "Taunton": "England",
+    "Worcester": "England",
+    "Cardiff": "Wales",
+    "Swansea": "Wales",
+    # Hong Kong
+    "Hong Kong": "Hong Kong",
+    "Mong Kok": "Hong Kong",
+    # India
+    "Ahmedabad": "India",
+    "Bangalore": "India",
+    "Bengaluru": "India",
+    "Chandigarh": "India",
+    "Chennai": "India",
+    "Cuttack": "India",
+    "Delhi": "India",
+    "Dharamsala": "India",
+    "Guwahati": "India",
+    "Hyderabad": "India",
+    "Indore": "India",
+    "Jaipur": "India",
+    "Kanpur": "India",
+    "Kolkata": "India",
+    "Lucknow": "India",
+    "Mohali": "India",
+    "Mumbai": "India",
+    "Nagpur": "India",
+    "Navi Mumbai": "India",
+    "Pune": "India",
+    "Raipur": "India",
+    "Rajkot": "India",
+    "Ranchi": "India",
+    "Thiruvananthapuram": "India",
+    "Visakhapatnam": "India",
+    # Ireland (including Northern Ireland)
+    "Belfast": "Ireland",
+    "Bready": "Ireland",
+    "Dublin": "Ireland",
+    "Malahide": "Ireland",
+    # Kenya
+    "Mombasa": "Kenya",
+    "Nairobi": "Kenya",
+    # Namibia
+    "Windhoek": "Namibia",
+    # Nepal
+    "Kathmandu": "Nepal",
+    "Kirtipur": "Nepal",
+    # Netherlands
+    "Amstelveen": "Netherlands",
+    "Rotterdam": "Netherlands",
+    "Schiedam": "Netherlands",
+    "The Hague": "Netherlands",
+    "Utrecht": "Netherlands",
+    # New Zealand
+    "Auckland": "New Zealand",
+    "Christchurch": "New Zealand",
+    "Dunedin": "New Zealand",
+    "Hamilton": "New Zealand",
+    "Mount Maunganui": "New Zealand",
+    "Napier": "New Zealand",
+    "Nelson": "New Zealand",
+    "Queenstown": "New Zealand",
+    "Wellington": "New Zealand",
+    # Oman
+    "Al Amarat": "Oman",
+    "Muscat": "Oman",
+    # Pakistan
+    "Faisalabad": "Pakistan",
+    "Karachi": "Pakistan",
+    "Lahore": "Pakistan",
+    "Multan": "Pakistan",
+    "Rawalpindi": "Pakistan",
+    # Papua New Guinea
+    "Port Moresby": "Papua New Guinea",
+    # Scotland
+    "Aberdeen": "Scotland",
+    "Edinburgh": "Scotland",
+    "Glasgow": "Scotland",
+    # South Africa
+    "Benoni": "South Africa",
+    "Bloemfontein": "South Africa",
+    "Cape Town": "South Africa",
+    "Centurion": "South Africa",
+    "Durban": "South Africa",
+    "East London": "South Africa",
+    "Johannesburg": "South Africa",
+    "Kimberley": "South Africa",
+    "Paarl": "South Africa",
+    "Port Elizabeth": "South Africa",
+    "Gqeberha": "South Africa",
+    "Potchefstroom": "South Africa",
+    # Sri Lanka
+    "Colombo": "Sri Lanka",
+    "Dambulla": "Sri Lanka",
+    "Galle": "Sri Lanka",
+    "Hambantota": "Sri Lanka",
+    "Kandy": "Sri Lanka",
+    "Pallekele": "Sri Lanka",
+    # United Arab Emirates
+    "Abu Dhabi": "United Arab Emirates",
+    "Dubai": "United Arab Emirates",
+    "Sharjah": "United Arab Emirates",
+    # United States of America
+    "Lauderhill": "United States of America",
+    "Dallas": "United States of America",
+    "Grand Prairie": "United States of America",
+    "Morrisville": "United States of America",
+    "New York": "United States of America",
+    # West Indies
+    "Antigua": "Antigua and Barbuda",
+    "North Sound": "Antigua and Barbuda",
+    "St John's": "Antigua and Barbuda",
+    "Barbados": "Barbados",
+    "Bridgetown": "Barbados",
+    "Dominica": "Dominica",
+    "Roseau": "Dominica",
+    "Grenada": "Grenada",
+    "St George's": "Grenada",
+    "Guyana": "Guyana",
+    "Providence": "Guyana",
+    "Georgetown": "Guyana",
+    "Jamaica": "Jamaica",
+    "Kingston": "Jamaica",
+    "St Kitts": "Saint Kitts and Nevis",
+    "Basseterre": "Saint Kitts and Nevis",
+    "St Lucia": "Saint Lucia",
+    "Gros Islet": "Saint Lucia",
+    "St Vincent": "Saint Vincent and the Grenadines",
+    "Kingstown": "Saint Vincent and the Grenadines",
+    "Trinidad": "Trinidad and Tobago",
+    "Port of Spain": "Trinidad and Tobago",
+    "Tarouba": "Trinidad and Tobago",
+    # Zimbabwe
+    "Bulawayo": "Zimbabwe",
+    "Harare": "Zimbabwe",
+    "Kwekwe": "Zimbabwe",
+}
+
+# Cricsheet omits the city for a handful of venues, so the venue itself is
+# looked up when there is no city to go on.
+VENUE_TO_COUNTRY: Dict[str, str] = {
+    "Dubai International Cricket Stadium": "United Arab Emirates",
+    "Sharjah Cricket Stadium": "United Arab Emirates",
+    "Sheikh Zayed Stadium": "United Arab Emirates",
+    "Zayed Cricket Stadium, Abu Dhabi": "United Arab Emirates",
+    "ICC Academy": "United Arab Emirates",
+    "Sydney Cricket Ground": "Australia",
+    "Melbourne Cricket Ground": "Australia",
+    "Adelaide Oval": "Australia",
+    "Lord's": "England",
+    "Kennington Oval": "England",
+    "Eden Gardens": "India",
+    "Wankhede Stadium": "India",
+    "Gaddafi Stadium": "Pakistan",
+    "Harare Sports Club": "Zimbabwe",
+    "Queens Sports Club": "Zimbabwe",
+    "Gymkhana Club Ground": "Kenya",
+}
@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from functools import wraps
+from typing import Callable, ContextManager, Dict, List, NamedTuple, Tuple
+
+# Instrumentation is enabled at import if this environment variable is set
+# to "1", e.g. for a nightly ingest run, without changing any code.
+INSTRUMENTATION_ENV_VAR: str = "CRICSHEET_INSTRUMENTATION"
+
+# Prefix of the names of metrics exported in the Prometheus text format.
+PROMETHEUS_PREFIX: str = "cricsheet"
+
+# A metric name and its labels, sorted by label name, e.g.
+# ("rows_written", (("table", "ball_by_ball"),)).
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class TimerStats(NamedTuple):
+    # Number of timed calls
+    count: int
+    # Seconds spent in all of them
+    total_seconds: float
+    # Seconds spent in the slowest one
+    max_seconds: float
+
+
+class Metrics(NamedTuple):
+    """
+    Snapshot of the timers and counters recorded so far.
+    """
+    timers: Dict[MetricKey, TimerStats]
+    counters: Dict[MetricKey, float]
+
+
+def _get_metric_key(name: str, labels: Dict[str, str]) -> MetricKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _format_metric_key(metric_key: MetricKey, name_format: str = "{}") -> str:
+    name, labels = metric_key
+    formatted_labels: str = ",".join(f'{label}="{value}"' for label, value in labels)
+    return name_format.format(name) + (f"{{{formatted_labels}}}" if labels else "")
+
+
+class _Timer:
+    __slots__ = ("instrumentation", "metric_key", "start")
+
+    def __init__(self, instrumentation: "Instrumentation", metric_key: MetricKey):
+        self.instrumentation = instrumentation
+        self.metric_key = metric_key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.record_time(self.metric_key, time.perf_counter() - self.start)
+
+
+class Instrumentation:
+    def __init__(self, enabled: bool = False):
+        """
+        Timers and counters of the stages of an ingest run, which tell where
+        its time goes: decoding JSON, resolving countries, building tables,
+        or writing to the database. Parsers, `MatchDataProcessor`,
+        `DatabaseManager` and `DataIngestionManager` record into the shared
+        `instrumentation` instance.
+
+        While disabled, timers are a shared no-op context manager and
+        counters return straight away, so instrumented code runs at
+        practically full speed. Metrics recorded in worker processes of
+        `MatchDataProcessor.iter_match_batches` and
+        `DataIngestionManager.ingest_data_concurrently` are sent back and
+        merged into those of the calling process.
+
+        :param enabled: Whether to record metrics.
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timers: Dict[MetricKey, TimerStats] = {}
+        self._counters: Dict[MetricKey, float] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget all metrics recorded so far, e.g. at the start of a run.
+        """
+        with self._lock:
+            self._timers = {}
+            self._counters = {}
+
+    def timer(self, name: str, **labels: str) -> ContextManager:
+        """
+        Time the block of a `with` statement.
+
+        :param name: Name of the timer, e.g. "decode_json".
+        :param labels: Labels telling apart timers of the same name, e.g.
+        `table="ball_by_ball"`.
+        :return: Context manager timing its block.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, _get_metric_key(name, labels))
+
+    def timed(self, name: str, **labels: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator timing every call of a function, see `timer`.
+        """
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: float = 1, **labels: str):
+        """
+        Add to a counter.
+
+        :param name: Name of the counter, e.g. "rows_written".
+        :param value: Amount added.
+        :param labels: Labels telling apart counters of the same name.
+        """
+        if not self.enabled:
+            return
+        metric_key: MetricKey = _get_metric_key(name, labels)
+        with self._lock:
+            self._counters[metric_key] = self._counters.get(metric_key, 0) + value
+
+    def record_time(self, metric_key: MetricKey, seconds: float):
+        with self._lock:
+            count, total_seconds, max_seconds = self._timers.get(metric_key, (0, 0.0, 0.0))
+            self._timers[metric_key] = TimerStats(count + 1, total_seconds + seconds, max(max_seconds, seconds))
+
+    def get_metrics(self) -> Metrics:
+        """
+        Snapshot of the metrics recorded so far.
+        """
+        with self._lock:
+            return Metrics(dict(self._timers), dict(self._counters))
+
+    def collect(self) -> Metrics:
+        """
+        Snapshot of the metrics recorded so far, which are then forgotten.
+        Used by worker processes to send their metrics back, see `merge`.
+        """
+        with self._lock:
+            metrics = Metrics(self._timers, self._counters)
+            self._timers = {}
+            self._counters = {}
+        return metrics
+
+    def merge(self, metrics: Metrics):
+        """
+        Add metrics recorded elsewhere, e.g. in a worker process.
+        """
+        with self._lock:
+            metric_key: MetricKey
+            timer_stats: TimerStats
+            for metric_key, timer_stats in metrics.timers.items():
+                count, total_seconds, max_seconds = self._timers.get(metric_key, (0, 0.0, 0.0))
+                self._timers[metric_key] = TimerStats(
+                    count + timer_stats.count,
+                    total_seconds + timer_stats.total_seconds,
+                    max(max_seconds, timer_stats.max_seconds)
+                )
+            value: float
+            for metric_key, value in metrics.counters.items():
+                self._counters[metric_key] = self._counters.get(metric_key, 0) + value
+
+    def init_worker(self, enabled: bool):
+        """
+        Set up the instrumentation of a worker process. Forked workers
+        would otherwise start with a copy of the parent's metrics.
+        """
+        self.enabled = enabled
+        self.reset()
+
+    def summary(self) -> str:
+        """
+        Report of the metrics recorded so far, with the timers that took
+        longest first.
+
+        :return: Text table with one line per timer and counter.
+        """
+        metrics: Metrics = self.get_metrics()
+        lines: List[str] = [f"{'timer':<50}{'calls':>10}{'total s':>12}{'mean ms':>12}{'max ms':>12}"]
+        metric_key: MetricKey
+        timer_stats: TimerStats
+        for metric_key, timer_stats in sorted(metrics.timers.items(), key=lambda item: -item[1].total_seconds):
+            lines.append(
+                f"{_format_metric_key(metric_key):<50}{timer_stats.count:>10,}"
+                f"{timer_stats.total_seconds:>12.3f}"
+                f"{1000 * timer_stats.total_seconds / timer_stats.count:>12.3f}"
+                f"{1000 * timer_stats.max_seconds:>12.3f}"
+            )
+        lines.append(f"{'counter':<50}{'value':>10}")
+        value: float
+        for metric_key, value in sorted(metrics.counters.items()):
+            formatted_value: str = f"{value:,.0f}" if float(value).is_integer() else f"{value:,.3f}"
+            lines.append(f"{_format_metric_key(metric_key):<50}{formatted_value:>10}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """
+        Metrics recorded so far as a JSON document, with a list of timers
+        and a list of counters, each entry holding its name and labels.
+        """
+        metrics: Metrics = self.get_metrics()
+        return json.dumps({
+            "timers": [
+                {"name": name, "labels": dict(labels), **timer_stats._asdict()}
+                for (name, labels), timer_stats in metrics.timers.items()
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in metrics.counters.items()
+            ]
+        }, indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Metrics recorded so far in the Prometheus text exposition format,
+        e.g. for the node exporter's textfile collector. Timers are exported
+        as summaries without quantiles, `<name>_seconds_sum` and
+        `<name>_seconds_count`, and counters as `<name>_total`.
+        """
+        metrics: Metrics = self.get_metrics()
+        lines: List[str] = []
+        declared_names: set = set()
+        metric_key: MetricKey
+        for metric_key, timer_stats in sorted(metrics.timers.items()):
+            metric_name: str = f"{PROMETHEUS_PREFIX}_{metric_key[0]}_seconds"
+            if metric_name not in declared_names:
+                declared_names.add(metric_name)
+                lines.append(f"# TYPE {metric_name} summary")
+            lines.append(f"{_format_metric_key(metric_key, metric_name + '_sum')} {timer_stats.total_seconds!r}")
+            lines.append(f"{_format_metric_key(metric_key, metric_name + '_count')} {timer_stats.count}")
+        for metric_key, value in sorted(metrics.counters.items()):
+            metric_name = f"{PROMETHEUS_PREFIX}_{metric_key[0]}_total"
+            if metric_name not in declared_names:
+                declared_names.add(metric_name)
+                lines.append(f"# TYPE {metric_name} counter")
+            lines.append(f"{_format_metric_key(metric_key, metric_name)} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every use of a disabled timer; `nullcontext` can be entered any
+# number of times.
+_NULL_TIMER: ContextManager = nullcontext()
+
+# Instrumentation shared by the whole package.
+instrumentation = Instrumentation(enabled=os.environ.get(INSTRUMENTATION_ENV_VAR) == "1")
+
@@ -0,0 +1,96 @@
+import importlib
+import json
+import mmap
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, List, Optional, Union
+
+from cricsheet.lazy_import import lazy_import
+
+# Only imported once `get_json_decoder` selects them.
+orjson = lazy_import("orjson")
+simdjson = lazy_import("simdjson")
+
+# A decoder turns the raw bytes of a JSON document into Python objects.
+JSONDecoder = Callable[[Union[bytes, bytearray, memoryview]], Any]
+
+# Anything a match can be read from: a path, an open file-like object (e.g.
+# a zip archive member), or the document itself already in memory (e.g. an
+# mmapped file).
+JSONSource = Union[str, Path, IO, bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _decode_with_stdlib(buffer: Union[bytes, bytearray, memoryview]) -> Any:
+    # `json.loads` takes bytes but not memoryviews.
+    return json.loads(bytes(buffer) if isinstance(buffer, memoryview) else buffer)
+
+
+def _decode_with_orjson(buffer: Union[bytes, bytearray, memoryview]) -> Any:
+    return orjson.loads(buffer)
+
+
+def _decode_with_simdjson(buffer: Union[bytes, bytearray, memoryview]) -> Any:
+    return simdjson.loads(bytes(buffer) if isinstance(buffer, memoryview) else buffer)
+
+
+# Decoders by name, fastest first. `get_json_decoder` picks the first one
+# whose library is installed; the stdlib decoder is always available.
+JSON_DECODERS: Dict[str, JSONDecoder] = {
+    "orjson": _decode_with_orjson,
+    "simdjson": _decode_with_simdjson,
+    "json": _decode_with_stdlib
+}
+
+_JSON_DECODER_MODULES: Dict[str, Any] = {
+    "orjson": orjson,
+    "simdjson": simdjson,
+    "json": json
+}
+
+
+def available_json_decoders() -> List[str]:
+    """
+    Names of the decoders whose library is installed, fastest first.
+
+    :return: List of keys of `JSON_DECODERS`.
+    """
+    return [name for name in JSON_DECODERS
+            if _JSON_DECODER_MODULES[name] is not None]
+
+
+def get_json_decoder(name: Optional[str] = None) -> JSONDecoder:
+    """
+    Look up a JSON decoder.
+
+    :param name: One of the keys of `JSON_DECODERS`. Defaults to the fastest
+    installed decoder.
+    :return: Function decoding the bytes of a JSON document.
+    """
+    if name is None:
+        name = available_json_decoders()[0]
+    if name not in JSON_DECODERS:
+        raise ValueError(
+            f"Unknown JSON decoder '{name}'. Expected one of {list(JSON_DECODERS)}."
+        )
+    if _JSON_DECODER_MODULES[name] is None:
+        raise ImportError(f"JSON decoder '{name}' requires the '{name}' package.")
+    importlib.import_module(name)
+    return JSON_DECODERS[name]
+
+
+def read_json_bytes(source: JSONSource) -> Union[bytes, bytearray, memoryview]:
+    """
+    Read a whole JSON document in one call, without decoding it to text.
+
+    :param source: Path to a JSON file, an open file-like object, or the
+    document itself.
+    :return: Bytes of the document. In-memory documents are returned without
+    being copied.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, mmap.mmap):
+        return memoryview(source)
+    if hasattr(source, "read"):
+        content: Union[str, bytes] = source.read()
+        return content.encode() if isinstance(content, str) else content
+    return Path(source).read_bytes()
@@ -0,0 +1,33 @@
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Any, Optional
+
+
+class _LazyModule(ModuleType):
+    def __getattr__(self, attribute: str) -> Any:
+        # Only called for attributes the proxy does not have yet. Importing
+        # is thread-safe, and the module's attributes are copied onto the
+        # proxy, so that later lookups are as fast as on the module itself.
+        module: ModuleType = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(module_name: str) -> Optional[ModuleType]:
+    """
+    Module that is only imported when one of its attributes is first used,
+    e.g. `pd = lazy_import("pandas")`. Keeps heavy dependencies out of the
+    import of modules that only need them for some of their functions, so
+    that e.g. listing the match IDs in an archive does not import pandas.
+
+    Modules using it should start with `from __future__ import annotations`,
+    since evaluating an annotation such as `pd.DataFrame` imports the module.
+
+    :param module_name: Name of the module, e.g. "pyarrow.csv".
+    :return: Proxy of the module, or None if its package is not installed,
+    as for optional dependencies imported with `try`/`except ImportError`.
+    """
+    if importlib.util.find_spec(module_name.partition(".")[0]) is None:
+        return None
+    return _LazyModule(module_name)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import csv
+import io
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+
+from cricsheet.ball_by_ball_table_builder import BALL_BY_BALL_COLUMN_DTYPES
+from cricsheet.country_resolver import CountryResolver, get_default_country_resolver
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_parser import MatchParser
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+pyarrow = lazy_import("pyarrow")
+pyarrow_csv = lazy_import("pyarrow.csv")
+
+# Columns read from a ball-by-ball CSV file, with their dtypes.
+BALL_CSV_COLUMN_DTYPES: Dict[str, str] = {
+    "innings": "int64",
+    # "<over>.<delivery>", where overs are 0-indexed. Only the over is read
+    # from it since e.g. the 10th delivery of the first over, "0.10", reads
+    # as the float 0.1.
+    "ball": "float64",
+    "batting_team": "object",
+    "striker": "object",
+    "non_striker": "object",
+    "bowler": "object",
+    "runs_off_bat": "int64",
+    "extras": "int64",
+    "wides": "float64",
+    "noballs": "float64",
+    "byes": "float64",
+    "legbyes": "float64",
+    "penalty": "float64",
+    "wicket_type": "object",
+    "player_dismissed": "object"
+}
+
+# Extras columns, in the order in which the kind of extra is picked if a
+# delivery has several, which is also the order of the keys in the JSON format.
+EXTRAS_COLUMNS: List[str] = ["byes", "legbyes", "noballs", "penalty", "wides"]
+
+# Info keys that can appear on several lines of an info CSV file.
+MULTI_VALUED_INFO_KEYS: List[str] = ["team", "date", "umpire", "reserve_umpire", "tv_umpire"]
+
+
+class MatchCSVParser(MatchParser):
+    def __init__(
+            self,
+            match_fp: Union[str, IO],
+            info_fp: Optional[Union[str, IO]] = None,
+            country_resolver: Optional[CountryResolver] = None
+    ):
+        """
+        Class to parse and return specific data from a match in Cricsheet's
+        CSV ("csv2") format, which is spread over a ball-by-ball file,
+        `<match ID>.csv`, and an info file, `<match ID>_info.csv`.
+
+        :param match_fp: Path to the ball-by-ball CSV file of a match, or an
+        open file-like object such as a zip archive member. The match ID is
+        taken from the name of the file.
+        :param info_fp: Path to the info CSV file of the match, or an open
+        file-like object. Defaults to the info file next to `match_fp`.
+        :param country_resolver: Resolver used to find the country a match
+        was played in. Defaults to a resolver shared by all parsers.
+        """
+        if hasattr(match_fp, "read"):
+            self.match_file = getattr(match_fp, "name", None)
+        else:
+            self.match_file = match_fp
+
+        if info_fp is None:
+            if self.match_file is None:
+                raise ValueError("`info_fp` is required if `match_fp` has no name.")
+            match_file_path = Path(self.match_file)
+            info_fp = str(match_file_path.with_name(f"{match_file_path.stem}_info.csv"))
+
+        # Columns of the ball-by-ball file, with missing strings as None
+        self.ball_data: Dict[str, np.ndarray] = self._read_ball_data(match_fp)
+        self.info: Dict[str, Union[str, list, dict]] = self._read_info(info_fp)
+        self.country_resolver = country_resolver or get_default_country_resolver()
+
+        self.match_id = None
+
+    @staticmethod
+    def _read_ball_data(match_fp: Union[str, IO]) -> Dict[str, np.ndarray]:
+        if pyarrow is None:
+            ball_data: pd.DataFrame = pd.read_csv(
+                match_fp,
+                usecols=list(BALL_CSV_COLUMN_DTYPES),
+                dtype=BALL_CSV_COLUMN_DTYPES
+            )
+            columns: Dict[str, np.ndarray] = {}
+            for name, dtype in BALL_CSV_COLUMN_DTYPES.items():
+                values: np.ndarray = ball_data[name].to_numpy()
+                if dtype == "object":
+                    values[ball_data[name].isna().to_numpy()] = None
+                columns[name] = values
+            return columns
+
+        # pyarrow's CSV reader is several times faster than pandas' and,
+        # unlike it, returns missing strings as None rather than NaN.
+        if hasattr(match_fp, "read"):
+            content: Union[str, bytes] = match_fp.read()
+            match_fp = io.BytesIO(content.encode() if isinstance(content, str) else content)
+        table = pyarrow_csv.read_csv(
+            match_fp,
+            read_options=pyarrow_csv.ReadOptions(use_threads=False),
+            convert_options=pyarrow_csv.ConvertOptions(
+                include_columns=list(BALL_CSV_COLUMN_DTYPES),
+                column_types={
+                    name: pyarrow.string() if dtype == "object" else pyarrow.from_numpy_dtype(np.dtype(dtype))
+                    for name, dtype in BALL_CSV_COLUMN_DTYPES.items()
+                },
+                strings_can_be_null=True
+            )
+        )
+        return {
+            name: table.column(name).to_numpy()
+            for name in BALL_CSV_COLUMN_DTYPES
+        }
+
+    @staticmethod
+    def _read_info(info_fp: Union[str, IO]) -> Dict[str, Union[str, list, dict]]:
+        if hasattr(info_fp, "read"):
+            content: Union[str, bytes] = info_fp.read()
+            lines = io.StringIO(content.decode() if isinstance(content, bytes) else content)
+            return MatchCSVParser._parse_info_lines(lines)
+        with open(info_fp, "r", newline="") as f:
+            return MatchCSVParser._parse_info_lines(f)
+
+    @staticmethod
+    def _parse_info_lines(lines: IO[str]) -> Dict[str, Union[str, list, dict]]:
+        info: Dict[str, Union[str, list, dict]] = {
+            key: [] for key in MULTI_VALUED_INFO_KEYS
+        }
+        info["players"] = {}
+        info["registry"] = {}
+
+        row: List[str]
+        for row in csv.reader(lines):
+            if len(row) < 3 or row[0] != "info":
+                continue
+            key: str = row[1]
+            if key == "player":
+                info["players"].setdefault(row[2], []).append(row[3])
+            elif key == "registry":
+                # info,registry,people,<name>,<registry ID>
+                info["registry"][row[3]] = row[4]
+            elif key in MULTI_VALUED_INFO_KEYS:
+                info[key].append(row[2])
+            else:
+                info[key] = row[2]
+        return info
+
+    @property
+    def balls_per_over(self) -> int:
+        return int(self.info["balls_per_over"])
+
+    @property
+    def dates(self) -> list:
+        return [date.replace("/", "-") for date in self.info["date"]]
+
+    @property
+    def venue(self) -> str:
+        return self.info["venue"]
+
+    @property
+    def city(self) -> Optional[str]:
+        return self.info.get("city")
+
+    @property
+    def teams(self) -> List[str]:
+        return self.info["team"]
+
+    @property
+    def players(self) -> Dict[str, List[str]]:
+        return self.info["players"]
+
+    @property
+    def people_registry(self) -> Dict[str, str]:
+        return self.info["registry"]
+
+    @property
+    def gender(self) -> str:
+        return self.info["gender"]
+
+    @property
+    def season(self) -> str:
+        return self.info["season"]
+
+    @property
+    def match_type(self) -> Optional[str]:
+        return self.info.get("match_type")
+
+    @property
+    def team_type(self) -> Optional[str]:
+        return self.info.get("team_type")
+
+    @property
+    def toss_winner(self) -> str:
+        return self.info["toss_winner"]
+
+    @property
+    def toss_winner_decision(self) -> str:
+        return self.info["toss_decision"]
+
+    @property
+    def winner(self) -> Optional[str]:
+        return self.info.get("winner")
+
+    @property
+    def won_by_runs(self) -> Optional[int]:
+        return int(self.info["winner_runs"]) if "winner_runs" in self.info else None
+
+    @property
+    def won_by_wickets(self) -> Optional[int]:
+        return int(self.info["winner_wickets"]) if "winner_wickets" in self.info else None
+
+    @property
+    def umpire_1(self) -> str:
+        return self.info["umpire"][0]
+
+    @property
+    def umpire_2(self) -> str:
+        return self.info["umpire"][1]
+
+    @property
+    def third_umpire(self) -> str:
+        return self.info["reserve_umpire"][0]
+
+    @property
+    def match_referee(self) -> str:
+        return self.info["match_referee"]
+
+    @property
+    def n_innings(self) -> int:
+        if len(self.ball_data["innings"]) == 0:
+            return 0
+        return int(self.ball_data["innings"].max())
+
+    def _get_parsed_match_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of every innings of a match, with the same columns
+        and dtypes as that of `MatchJSONParser`. The CSV format does not
+        name the fielders involved in a dismissal, so `fielders_in_dismissal`
+        is always empty.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the match
+        """
+        ball_data: Dict[str, np.ndarray] = self.ball_data
+        n_deliveries: int = len(ball_data["innings"])
+
+        innings: np.ndarray = ball_data["innings"]
+        over: np.ndarray = ball_data["ball"].astype("int64") + 1
+        # Deliveries are numbered from 1 within each over, in file order,
+        # which is how they are numbered for the JSON format too.
+        positions: np.ndarray = np.arange(n_deliveries)
+        over_starts: np.ndarray = np.ones(n_deliveries, dtype=bool)
+        over_starts[1:] = (innings[1:] != innings[:-1]) | (over[1:] != over[:-1])
+        ball: np.ndarray = positions - np.maximum.accumulate(np.where(over_starts, positions, 0)) + 1
+
+        extras_type: np.ndarray = np.full(n_deliveries, None, dtype="object")
+        # Filled in reverse so that the first kind of extra in
+        # `EXTRAS_COLUMNS` wins.
+        extras_column: str
+        for extras_column in reversed(EXTRAS_COLUMNS):
+            extras_type[~np.isnan(ball_data[extras_column])] = extras_column
+
+        return pd.DataFrame({
+            "match_id": np.full(n_deliveries, self.match_id, dtype="object"),
+            "innings": innings,
+            "over": over,
+            "ball": ball,
+            "batting_team": ball_data["batting_team"],
+            "batsman": ball_data["striker"],
+            "bowler": ball_data["bowler"],
+            "non_striker": ball_data["non_striker"],
+            "runs_by_batsman": ball_data["runs_off_bat"],
+            "extras_type": extras_type,
+            "runs_from_extras": ball_data["extras"],
+            "dismissed_batsman": ball_data["player_dismissed"],
+            "dismissal_type": ball_data["wicket_type"],
+            "fielders_in_dismissal": np.full(n_deliveries, None, dtype="object")
+        }, columns=list(BALL_BY_BALL_COLUMN_DTYPES))
@@ -1,18 +1,249 @@
-from typing import Dict, Union, List
+from __future__ import annotations
 
-import pandas as pd
+import io
+import os
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, NamedTuple, Union, List, Optional, Tuple
 
+from cricsheet.ball_by_ball_table_builder import (
+    BallByBallTableBuilder,
+    compact_ball_by_ball_table,
+    concat_ball_by_ball_tables
+)
+from cricsheet.country_resolver import CountryResolver, get_default_country_resolver
+from cricsheet.instrumentation import Metrics, instrumentation
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_csv_parser import MatchCSVParser
 from cricsheet.match_json_parser import MatchJSONParser
+from cricsheet.match_json_stream_parser import MatchJSONStreamParser
+from cricsheet.match_parser import MatchParser
+from cricsheet.player_registry import PlayerRegistry
+
+futures = lazy_import("concurrent.futures")
+pd = lazy_import("pandas")
+
+
+class MatchBatch(NamedTuple):
+    """
+    Tables of several matches, in the order their files were given.
+    """
+    match_info: pd.DataFrame
+    ball_by_ball: pd.DataFrame
+    # Registry of each match, see `MatchParser.people_table`
+    people: pd.DataFrame
+    # Error message for each file that could not be processed, keyed by path,
+    # or by name for a `MatchFile`
+    errors: Dict[str, str]
+    # Revision of each processed match, by match ID, see
+    # `MatchParser.revision`
+    revisions: Dict[str, Optional[int]]
+
+
+class MatchFile(NamedTuple):
+    """
+    Contents of a match file that was read from somewhere other than a
+    directory, e.g. a zip archive.
+    """
+    # File name, e.g. "1001.json", whose extension tells the format
+    name: str
+    contents: bytes
+    # Contents of the info file of a match in the CSV format
+    info_contents: Optional[bytes] = None
+
+
+# A match to process: the path to its file, or its file's contents.
+MatchSource = Union[str, MatchFile]
+
+
+# Settings of `process_match_files` in a worker process of
+# `get_process_pool`. They are set once per worker process rather than being
+# sent along with every chunk, and are never set in the calling process,
+# which passes its settings to `_process_match_file` instead.
+# Resolver used to find the country of each match.
+_worker_country_resolver: Optional[CountryResolver] = None
+
+# Whether the metrics recorded while processing a file are sent back along
+# with its result, which they are if instrumentation is enabled.
+_worker_sends_metrics: bool = False
+
+# Whether JSON files are decoded innings by innings, see `MatchDataProcessor`.
+_worker_stream: bool = False
+
+
+def _init_worker(country_resolver: Optional[CountryResolver], instrumentation_enabled: bool, stream: bool):
+    global _worker_country_resolver, _worker_sends_metrics, _worker_stream
+    _worker_country_resolver = country_resolver
+    _worker_stream = stream
+    instrumentation.init_worker(instrumentation_enabled)
+    _worker_sends_metrics = instrumentation_enabled
+
+
+# File path or name, match info, ball-by-ball table, people table, revision,
+# error message and metrics recorded by a worker process of a processed
+# match file.
+_MatchResult = Tuple[
+    str,
+    Optional[dict],
+    Optional["pd.DataFrame"],
+    Optional["pd.DataFrame"],
+    Optional[int],
+    Optional[str],
+    Optional[Metrics]
+]
+
+
+def _open_match_source(
+        match_source: MatchSource,
+        country_resolver: Optional[CountryResolver],
+        stream: bool
+) -> MatchDataProcessor:
+    if isinstance(match_source, MatchFile):
+        match_file = io.BytesIO(match_source.contents)
+        # The format and match ID are told by the file name.
+        match_file.name = match_source.name
+        info_file: Optional[io.BytesIO] = (io.BytesIO(match_source.info_contents)
+                                           if match_source.info_contents is not None else None)
+        return MatchDataProcessor(match_file, country_resolver, info_file, stream=stream)
+    return MatchDataProcessor(match_source, country_resolver, stream=stream)
+
+
+def _process_match_file(
+        match_source: MatchSource,
+        country_resolver: Optional[CountryResolver] = None,
+        stream: bool = False,
+        sends_metrics: bool = False
+) -> _MatchResult:
+    match_key: str = match_source.name if isinstance(match_source, MatchFile) else match_source
+    try:
+        with instrumentation.timer("process_match"):
+            match_data_processor: MatchDataProcessor = _open_match_source(match_source, country_resolver, stream)
+            result: _MatchResult = (
+                match_key,
+                match_data_processor.get_match_info(),
+                match_data_processor.get_ball_by_ball_table(),
+                match_data_processor.get_people_table(),
+                match_data_processor.match_parser.revision,
+                None,
+                None
+            )
+    except Exception as e:
+        result = match_key, None, None, None, None, f"{type(e).__name__}: {e}", None
+    if sends_metrics:
+        result = result[:-1] + (instrumentation.collect(),)
+    return result
+
+
+def process_match_files(match_sources: List[MatchSource]) -> List[_MatchResult]:
+    """
+    Process a chunk of match files in a worker process of
+    `get_process_pool`, with the settings the pool was created with. See
+    `get_match_batch` to combine the results.
+    """
+    return [
+        _process_match_file(match_source, _worker_country_resolver, _worker_stream, _worker_sends_metrics)
+        for match_source in match_sources
+    ]
+
+
+def _map_in_workers(
+        executor: futures.ProcessPoolExecutor,
+        match_sources: Iterable[MatchSource],
+        chunk_size: int,
+        max_pending_chunks: int
+) -> Iterator[_MatchResult]:
+    # Results of processing chunks of matches in worker processes, in order.
+    # Unlike `executor.map`, which submits every chunk straight away, this
+    # only takes `max_pending_chunks` chunks ahead from `match_sources`, so
+    # that e.g. the matches of an archive are not all decompressed at once.
+    match_sources = iter(match_sources)
+    pending: deque = deque()
+    while match_files := list(islice(match_sources, chunk_size)):
+        pending.append(executor.submit(process_match_files, match_files))
+        if len(pending) > max_pending_chunks:
+            yield from pending.popleft().result()
+    while pending:
+        future: futures.Future = pending.popleft()
+        yield from future.result()
+
+
+def _is_match_file(fp: Path) -> bool:
+    # Each match in the CSV format also has an `_info.csv` file, which is
+    # read along with its ball-by-ball file.
+    return fp.suffix == ".json" or (fp.suffix == ".csv" and not fp.stem.endswith("_info"))
+
+
+def list_match_files(match_fps: Union[str, Iterable[MatchSource]]) -> List[MatchSource]:
+    """
+    Match files to process.
+
+    :param match_fps: Paths to match files, or a directory of match files.
+    Match files that were already read, see `MatchFile`, are kept as they
+    are.
+    :return: List of paths; those in a directory in name order.
+    """
+    if isinstance(match_fps, (str, Path)):
+        return sorted(str(fp) for fp in Path(match_fps).iterdir() if _is_match_file(fp))
+    return [fp if isinstance(fp, MatchFile) else str(fp) for fp in match_fps]
+
+
+def get_process_pool(
+        n_workers: Optional[int],
+        country_resolver: Optional[CountryResolver],
+        stream: bool = False
+) -> futures.ProcessPoolExecutor:
+    """
+    Pool of worker processes for `process_match_files`, each with the
+    instrumentation settings of this process and an offline copy of
+    `country_resolver`, see `CountryResolver.get_offline_copy`. Pass the
+    same resolver to `get_match_batch` to resolve the places the workers
+    could not. With `stream`, workers decode JSON files innings by innings,
+    see `MatchDataProcessor`.
+    """
+    return futures.ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(
+            (country_resolver or get_default_country_resolver()).get_offline_copy(),
+            instrumentation.enabled,
+            stream
+        )
+    )
 
 
 class MatchDataProcessor:
-    def __init__(self, match_fp: str):
+    def __init__(
+            self,
+            match_fp: Union[str, IO],
+            country_resolver: Optional[CountryResolver] = None,
+            info_fp: Optional[Union[str, IO]] = None,
+            stream: bool = False
+    ):
         """
         Constructor.
 
-        :param match_fp: Path to the JSON file containing match data
+        :param match_fp: Path to the JSON file containing match data, or to
+        the ball-by-ball CSV file of a match in the CSV format, or an open
+        file-like object of either. The format is told by the file extension.
+        :param country_resolver: Resolver used to find the country a match
+        was played in.
+        :param info_fp: Path to, or file-like object of, the info CSV file of
+        a match in the CSV format. Defaults to the info file next to
+        `match_fp`.
+        :param stream: Decode JSON files innings by innings with
+        `MatchJSONStreamParser` instead of all at once, which keeps peak
+        memory down for long matches. Requires the `ijson` package. CSV
+        files are always read whole.
         """
-        self.match_json_parser = MatchJSONParser(match_fp)
+        match_file_name: str = str(getattr(match_fp, "name", match_fp) or "")
+        self.match_parser: MatchParser
+        if match_file_name.endswith(".csv"):
+            self.match_parser = MatchCSVParser(match_fp, info_fp, country_resolver)
+        elif stream:
+            self.match_parser = MatchJSONStreamParser(match_fp, country_resolver)
+        else:
+            self.match_parser = MatchJSONParser(match_fp, country_resolver)
 
     def get_match_info(self) -> Dict[str, Union[str, int, List[str]]]:
         """
@@ -20,44 +251,264 @@ class MatchDataProcessor:
 
         :return:
         """
+        instrumentation.count("matches_parsed")
+        with instrumentation.timer("build_match_info"):
+            return self._get_match_info()
+
+    def _get_match_info(self) -> Dict[str, Union[str, int, List[str]]]:
         return {
-            "match_id": self.match_json_parser.match_id,
-            "balls_per_over": self.match_json_parser.balls_per_over,
-            "dates": self.match_json_parser.dates,
-            "venue": self.match_json_parser.venue,
-            "city": self.match_json_parser.city,
-            "country": self.match_json_parser.country,
-            "team_1": self.match_json_parser.team_1,
-            "team_1_players": self.match_json_parser.team_1_players,
-            "team_2": self.match_json_parser.team_2,
-            "team_2_players": self.match_json_parser.team_2_players,
-            "home_team": self.match_json_parser.home_team,
-            "gender": self.match_json_parser.gender,
-            "season": self.match_json_parser.season,
-            "team_type": self.match_json_parser.team_type,
-            "toss_winner": self.match_json_parser.toss_winner,
-            "toss_winner_decision": self.match_json_parser.toss_winner_decision,
-            "match_type": self.match_json_parser.match_type,
-            "winner": self.match_json_parser.winner,
-            "won_by_runs": self.match_json_parser.won_by_runs,
-            "won_by_wickets": self.match_json_parser.won_by_wickets,
-            "umpire_1": self.match_json_parser.umpire_1,
-            "umpire_2": self.match_json_parser.umpire_2,
-            "third_umpire": self.match_json_parser.third_umpire,
-            "match_referee": self.match_json_parser.match_referee
+            "match_id": self.match_parser.match_id,
+            "balls_per_over": self.match_parser.balls_per_over,
+            "dates": self.match_parser.dates,
+            "venue": self.match_parser.venue,
+            "city": self.match_parser.city,
+            "country": self.match_parser.country,
+            "team_1": self.match_parser.team_1,
+            "team_1_players": self.match_parser.team_1_players,
+            "team_2": self.match_parser.team_2,
+            "team_2_players": self.match_parser.team_2_players,
+            "home_team": self.match_parser.home_team,
+            "gender": self.match_parser.gender,
+            "season": self.match_parser.season,
+            "team_type": self.match_parser.team_type,
+            "toss_winner": self.match_parser.toss_winner,
+            "toss_winner_decision": self.match_parser.toss_winner_decision,
+            "match_type": self.match_parser.match_type,
+            "winner": self.match_parser.winner,
+            "won_by_runs": self.match_parser.won_by_runs,
+            "won_by_wickets": self.match_parser.won_by_wickets,
+            "umpire_1": self.match_parser.umpire_1,
+            "umpire_2": self.match_parser.umpire_2,
+            "third_umpire": self.match_parser.third_umpire,
+            "match_referee": self.match_parser.match_referee
         }
 
-    def get_ball_by_ball_table(self) -> pd.DataFrame:
+    def get_ball_by_ball_table(self, compact: bool = False) -> pd.DataFrame:
         """
-        Construct ball-by-ball data of all innings in a match.
-        
+        Construct ball-by-ball data of all innings in a match. The match is
+        parsed once, on the first call, and the same table is returned by
+        every later call.
+
+        :param compact: Return the table with
+        `COMPACT_BALL_BY_BALL_COLUMN_DTYPES` instead of the default dtypes.
+        This copies the parsed table on every call.
+        :return:
+        """
+        if compact:
+            return compact_ball_by_ball_table(self.match_parser.ball_by_ball_data)
+        return self.match_parser.ball_by_ball_data
+
+    def get_people_table(self) -> pd.DataFrame:
+        """
+        Construct a table of everyone in the match's registry, which maps
+        the names in the other tables to Cricsheet registry IDs.
+
         :return:
         """
-        return pd.concat([
-            self.match_json_parser.first_innings_data,
-            self.match_json_parser.second_innings_data,
-            self.match_json_parser.third_innings_data,
-            self.match_json_parser.fourth_innings_data
-        ]).reset_index(drop=True)
+        return self.match_parser.people_table
+
+    def iter_ball_by_ball_tables(self, compact: bool = False) -> Iterator[pd.DataFrame]:
+        """
+        Construct ball-by-ball data of a match one innings at a time, so that
+        each innings can be written out and released before the next one is
+        built. With `stream=True`, the whole match is never in memory at once.
+
+        :param compact: Yield tables with `COMPACT_BALL_BY_BALL_COLUMN_DTYPES`.
+        :return: Iterator of ball-by-ball tables, one per innings.
+        """
+        innings_table: pd.DataFrame
+        for innings_table in self.match_parser.iter_innings_data():
+            yield compact_ball_by_ball_table(innings_table) if compact else innings_table
+
+    @staticmethod
+    def iter_match_batches(
+            match_fps: Union[str, Iterable[MatchSource]],
+            batch_size: int = 500,
+            n_workers: Optional[int] = None,
+            chunk_size: int = 16,
+            country_resolver: Optional[CountryResolver] = None,
+            compact: bool = False,
+            player_registry: Optional[PlayerRegistry] = None,
+            stream: bool = False
+    ) -> Iterator[MatchBatch]:
+        """
+        Process many matches in parallel and yield their tables in batches,
+        so that a batch can be written out before the next one is built.
+
+        :param match_fps: Paths to match files, or a directory of such files,
+        which are then processed in name order. Files may also be given by
+        their contents, see `MatchFile`, e.g. as they are read from an
+        archive; they are then only taken from the iterable a few chunks
+        ahead of the workers.
+        :param batch_size: Number of files per yielded batch.
+        :param n_workers: Number of worker processes. Defaults to the number
+        of CPUs. Files are processed in this process if it is 1.
+        :param chunk_size: Number of files sent to a worker at a time. Up to
+        two chunks per worker are read ahead.
+        :param country_resolver: Resolver used to find the country each match
+        was played in. Every worker gets an offline copy, and places that
+        need a remote lookup are resolved in this process, one batch at a
+        time.
+        :param compact: Build the ball-by-ball table of each batch with
+        `COMPACT_BALL_BY_BALL_COLUMN_DTYPES`.
+        :param player_registry: Player dimension. If given, players in the
+        ball-by-ball tables are replaced by their player keys, and players
+        seen for the first time are added to it. This happens in this
+        process, in the order of `match_fps`, so keys do not depend on how
+        files were spread over workers.
+        :param stream: Decode JSON files innings by innings, which keeps the
+        peak memory of each worker down when files hold long matches; see
+        `MatchDataProcessor`. Requires the `ijson` package.
+        :return: Iterator of batches, in the order of `match_fps`.
+        """
+        match_sources: Iterable[MatchSource] = (
+            list_match_files(match_fps) if isinstance(match_fps, (str, Path))
+            else (fp if isinstance(fp, MatchFile) else str(fp) for fp in match_fps)
+        )
+
+        if n_workers == 1:
+            yield from _batch_results(
+                (_process_match_file(match_source, country_resolver, stream) for match_source in match_sources),
+                batch_size,
+                compact,
+                player_registry,
+                country_resolver
+            )
+            return
+
+        with get_process_pool(n_workers, country_resolver, stream) as executor:
+            yield from _batch_results(
+                _map_in_workers(executor, match_sources, chunk_size, 2 * (n_workers or os.cpu_count() or 1)),
+                batch_size,
+                compact,
+                player_registry,
+                country_resolver
+            )
+
+    @staticmethod
+    def process_matches(
+            match_fps: Union[str, Iterable[MatchSource]],
+            n_workers: Optional[int] = None,
+            chunk_size: int = 16,
+            country_resolver: Optional[CountryResolver] = None,
+            compact: bool = False,
+            player_registry: Optional[PlayerRegistry] = None,
+            stream: bool = False
+    ) -> MatchBatch:
+        """
+        Process many matches in parallel and combine their tables. See
+        `iter_match_batches` for the parameters.
+
+        :return: Tables of all matches, in the order of `match_fps`.
+        """
+        match_files: List[MatchSource] = list_match_files(match_fps)
+        return _combine_batches(list(MatchDataProcessor.iter_match_batches(
+            match_files,
+            batch_size=max(len(match_files), 1),
+            n_workers=n_workers,
+            chunk_size=chunk_size,
+            country_resolver=country_resolver,
+            compact=compact,
+            player_registry=player_registry,
+            stream=stream
+        )), compact)
+
+
+def _get_empty_people_table() -> pd.DataFrame:
+    return pd.DataFrame({
+        column: pd.Series(dtype="object") for column in ["match_id", "player", "player_id"]
+    })
+
+
+def _batch_results(
+        results: Iterable[_MatchResult],
+        batch_size: int,
+        compact: bool = False,
+        player_registry: Optional[PlayerRegistry] = None,
+        country_resolver: Optional[CountryResolver] = None
+) -> Iterator[MatchBatch]:
+    results = iter(results)
+    while batch_results := list(islice(results, batch_size)):
+        yield get_match_batch(batch_results, compact, player_registry, country_resolver)
+
+
+def _resolve_missing_countries(match_info_rows: List[dict], country_resolver: CountryResolver):
+    # Places that workers could not resolve with their offline copy of the
+    # resolver are looked up here, in the calling process, all at once.
+    unresolved_rows: List[dict] = [row for row in match_info_rows
+                                   if row["country"] is None and (row["city"] or row["venue"])]
+    if not unresolved_rows:
+        return
+    country_resolver.resolve_many(row["city"] for row in unresolved_rows)
+    row: dict
+    for row in unresolved_rows:
+        row["country"] = country_resolver.resolve(row["city"], row["venue"])
+        # See `MatchParser.home_team`.
+        row["home_team"] = row["country"] if row["country"] in [row["team_1"], row["team_2"]] else None
+
+
+def get_match_batch(
+        results: Iterable[_MatchResult],
+        compact: bool = False,
+        player_registry: Optional[PlayerRegistry] = None,
+        country_resolver: Optional[CountryResolver] = None
+) -> MatchBatch:
+    """
+    Combine the results of processed match files, e.g. those of
+    `process_match_files`, into a batch of tables. Countries the workers
+    could not resolve offline are resolved with `country_resolver`, which
+    defaults to the default resolver, as for `get_process_pool`.
+    """
+    match_info_rows: List[dict] = []
+    ball_by_ball_tables: List[pd.DataFrame] = []
+    people_tables: List[pd.DataFrame] = []
+    errors: Dict[str, str] = {}
+    revisions: Dict[str, Optional[int]] = {}
+    for match_key, match_info, ball_by_ball_table, people_table, revision, error, metrics in results:
+        if metrics is not None:
+            instrumentation.merge(metrics)
+        if error is not None:
+            errors[match_key] = error
+            continue
+        match_info_rows.append(match_info)
+        ball_by_ball_tables.append(ball_by_ball_table)
+        people_tables.append(people_table)
+        revisions[match_info["match_id"]] = revision
+
+    _resolve_missing_countries(match_info_rows, country_resolver or get_default_country_resolver())
+
+    ball_by_ball_table: pd.DataFrame = concat_ball_by_ball_tables(ball_by_ball_tables)
+    people: pd.DataFrame = (pd.concat(people_tables, ignore_index=True)
+                            if people_tables else _get_empty_people_table())
+    if player_registry is not None:
+        ball_by_ball_table = player_registry.encode_ball_by_ball_table(ball_by_ball_table, people)
+    # Tables are compacted once per batch rather than once per match,
+    # so that each categorical column gets a single set of categories.
+    return MatchBatch(
+        pd.DataFrame(match_info_rows),
+        compact_ball_by_ball_table(ball_by_ball_table) if compact else ball_by_ball_table,
+        people,
+        errors,
+        revisions
+    )
 
 
+def _combine_batches(batches: List[MatchBatch], compact: bool = False) -> MatchBatch:
+    if not batches:
+        ball_by_ball_table: pd.DataFrame = BallByBallTableBuilder("").to_frame()
+        return MatchBatch(
+            pd.DataFrame(),
+            compact_ball_by_ball_table(ball_by_ball_table) if compact else ball_by_ball_table,
+            _get_empty_people_table(),
+            {},
+            {}
+        )
+    if len(batches) == 1:
+        return batches[0]
+    return MatchBatch(
+        pd.concat([batch.match_info for batch in batches], ignore_index=True),
+        concat_ball_by_ball_tables(batch.ball_by_ball for batch in batches),
+        pd.concat([batch.people for batch in batches], ignore_index=True),
+        {fp: error for batch in batches for fp, error in batch.errors.items()},
+        {match_id: revision for batch in batches for match_id, revision in batch.revisions.items()}
+    )
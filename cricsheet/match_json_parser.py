@@ -1,43 +1,52 @@
-from pathlib import Path
-import json
+from __future__ import annotations
 
-import pandas as pd
-from geopy import Nominatim
+from typing import Dict, List, Optional, Union
 
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder
+from cricsheet.country_resolver import CountryResolver, get_default_country_resolver
+from cricsheet.instrumentation import instrumentation
+from cricsheet.json_decoder import JSONDecoder, JSONSource, get_json_decoder, read_json_bytes
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_parser import MatchParser
 
-class MatchJSONParser:
-    def __init__(self, match_fp: str):
+pd = lazy_import("pandas")
+
+
+class MatchJSONParser(MatchParser):
+    def __init__(
+            self,
+            match_fp: JSONSource,
+            country_resolver: Optional[CountryResolver] = None,
+            json_decoder: Optional[Union[str, JSONDecoder]] = None
+    ):
         """
         Class to parse and return specific data from a Cricsheet JSON file.
 
         :param match_fp: Path to JSON file that contains all data about
-        a match.
+        a match, an open file-like object such as a zip archive member, or
+        the contents of the file, e.g. an mmapped file. The match ID is taken
+        from the name of the file, if it has one.
+        :param country_resolver: Resolver used to find the country a match
+        was played in. Defaults to a resolver shared by all parsers.
+        :param json_decoder: Name of one of `JSON_DECODERS`, or a function
+        decoding the bytes of the file. Defaults to the fastest installed
+        decoder.
         """
-        self.match_file = match_fp
-        with open(self.match_file, "r") as f:
-            self.data = json.load(f)
-        self.geolocator = Nominatim(user_agent="de_cricsheet")
-
-        self.match_id = None
-
-    @property
-    def match_id(self) -> str:
-        return self._match_id
+        if isinstance(match_fp, str) or hasattr(match_fp, "__fspath__"):
+            self.match_file = str(match_fp)
+        else:
+            self.match_file = getattr(match_fp, "name", None)
 
-    @match_id.setter
-    def match_id(self, value: str = None):
-        """
-        Set match ID. If a value is provided, which will only be during unit tests,
-        the specified value is set to be the match ID. Else, the name of the JSON
-        file becomes the match ID.
+        decode: JSONDecoder = (json_decoder if callable(json_decoder)
+                               else get_json_decoder(json_decoder))
+        with instrumentation.timer("read_match_file"):
+            match_bytes: Union[bytes, bytearray, memoryview] = read_json_bytes(match_fp)
+        instrumentation.count("bytes_read", len(match_bytes))
+        with instrumentation.timer("decode_json"):
+            self.data = decode(match_bytes)
+        self.country_resolver = country_resolver or get_default_country_resolver()
 
-        :param value: String value specifying match ID.
-        :return: String denoting match ID.
-        """
-        if value:
-            self._match_id = value
-        else:
-            self._match_id = Path(self.match_file).stem
+        self.match_id = None
 
     @property
     def balls_per_over(self):
@@ -52,55 +61,21 @@ class MatchJSONParser:
         return self.data["info"]["venue"]
 
     @property
-    def city(self) -> str:
-        return self.data["info"]["city"]
+    def city(self) -> Optional[str]:
+        # Cricsheet does not record a city for every venue.
+        return self.data["info"].get("city")
 
     @property
-    def country(self) -> str:
-        return self.geolocator.geocode(
-            self.city,
-            language="en",
-            addressdetails=True
-        ).raw["address"]["country"]
+    def teams(self) -> List[str]:
+        return self.data["info"]["teams"]
 
     @property
-    def team_1(self) -> str:
-        return self.data["info"]["teams"][0]
+    def players(self) -> Dict[str, List[str]]:
+        return self.data["info"]["players"]
 
     @property
-    def team_2(self) -> str:
-        return self.data["info"]["teams"][1]
-
-    @property
-    def home_team(self) -> str:
-        if self.country in self.data["info"]["teams"]:
-            return self.country
-
-    @property
-    def team_1_players(self) -> list:
-        team_1_player_names: list = self.data["info"]["players"][self.team_1]
-        s: str
-        return [self.data["info"]["registry"]["people"][s]
-                for s in team_1_player_names]
-
-    @property
-    def team_2_players(self) -> list:
-        team_2_player_names: list = self.data["info"]["players"][self.team_2]
-        s: str
-        return [self.data["info"]["registry"]["people"][s]
-                for s in team_2_player_names]
-
-    @property
-    def player_id_table(self) -> pd.DataFrame:
-        match_players: list = (self.data["info"]["players"][self.team_1] +
-                               self.data["info"]["players"][self.team_2])
-        people_registry: dict = self.data["info"]["registry"]["people"]
-        return pd.DataFrame({
-            "player": match_players,
-            "player_id": [people_registry[player]
-                          for player in match_players],
-            "match_id": self.match_id
-        })
+    def people_registry(self) -> Dict[str, str]:
+        return self.data["info"]["registry"]["people"]
 
     @property
     def gender(self) -> str:
@@ -157,133 +132,41 @@ class MatchJSONParser:
         return self.data["info"]["officials"]["match_referees"][0]
 
     @property
-    def first_innings_data(self) -> pd.DataFrame:
-        """
-        Ball-by-ball data of the first innings of a match. In a test match,
-        it is the first innings of the team batting first.
-
-        :return: Pandas dataframe holding ball-by-ball information about
-        the innings
-        """
-        innings_idx: int = 0
-        innings_raw_data: dict = self.data["innings"][innings_idx]
-        batting_team: str = innings_raw_data["team"]
-
-        return self._get_parsed_innings_data(
-            innings_raw_data["overs"],
-            batting_team,
-            innings_idx
-        )
+    def revision(self) -> Optional[int]:
+        return self.data.get("meta", {}).get("revision")
 
     @property
-    def second_innings_data(self) -> pd.DataFrame:
-        """
-        Ball-by-ball data of the second innings of a match. In a test match,
-        it is the first innings of the team batting second.
-
-        :return: Pandas dataframe holding ball-by-ball information about
-        the innings
-        """
-        innings_idx: int = 1
-        innings_raw_data: dict = self.data["innings"][innings_idx]
-        batting_team: str = innings_raw_data["team"]
+    def n_innings(self) -> int:
+        return len(self.data.get("innings", []))
 
-        return self._get_parsed_innings_data(
-            innings_raw_data["overs"],
+    def _get_parsed_innings_data(self,
+                                 innings_ball_by_ball_data: list,
+                                 batting_team: str,
+                                 innings_idx: int
+                                 ) -> pd.DataFrame:
+        table_builder = BallByBallTableBuilder(self.match_id)
+        table_builder.add_innings(
+            innings_ball_by_ball_data,
             batting_team,
             innings_idx
         )
+        return table_builder.to_frame()
 
-    @property
-    def third_innings_data(self) -> pd.DataFrame:
-        """
-        Ball-by-ball data of the third innings of a match. In a test match,
-        it is the second innings of the team batting first.
-
-        :return: Pandas dataframe holding ball-by-ball information about
-        the innings
-        """
-        innings_idx: int = 2
-        try:
-            innings_raw_data: dict = self.data["innings"][2]
-            batting_team: str = innings_raw_data["team"]
-
-            return self._get_parsed_innings_data(
-                innings_raw_data["overs"],
-                batting_team,
-                innings_idx
-            )
-        except IndexError:
-            return pd.DataFrame({})
-
-    @property
-    def fourth_innings_data(self) -> pd.DataFrame:
+    def _get_parsed_match_data(self) -> pd.DataFrame:
         """
-        Ball-by-ball data of the fourth innings of a match. In a test match,
-        it is the second innings of the team batting second.
+        Ball-by-ball data of every innings of a match, built in a single pass
+        over the innings.
 
         :return: Pandas dataframe holding ball-by-ball information about
-        the innings
+        the match
         """
-        innings_idx: int = 3
-
-        try:
-            innings_raw_data: dict = self.data["innings"][innings_idx]
-            batting_team: str = innings_raw_data["team"]
-
-            return self._get_parsed_innings_data(
-                innings_raw_data["overs"],
-                batting_team,
+        table_builder = BallByBallTableBuilder(self.match_id)
+        innings_idx: int
+        innings_raw_data: dict
+        for innings_idx, innings_raw_data in enumerate(self.data.get("innings", [])):
+            table_builder.add_innings(
+                innings_raw_data.get("overs", []),
+                innings_raw_data["team"],
                 innings_idx
             )
-        except IndexError:
-            return pd.DataFrame({})
-
-    def _get_parsed_innings_data(self,
-                                 innings_ball_by_ball_data: list,
-                                 batting_team: str,
-                                 innings_idx: int
-                                 ) -> pd.DataFrame:
-        innings_data: list = []
-        overs_data: dict
-        for overs_data in innings_ball_by_ball_data:
-            dd: dict
-            for dd in overs_data["deliveries"]:
-                delivery_data: dict = {
-                    "match_id": self.match_id,
-                    # In cricket parlance, innings and overs are 1-indexed
-                    "innings": innings_idx + 1,
-                    "over": overs_data["over"] + 1,
-                    "batting_team": batting_team
-                }
-                delivery_data.update(
-                    self._get_parsed_delivery_data(dd)
-                )
-                innings_data.append(delivery_data.copy())
-
-        return pd.DataFrame(innings_data)
-
-    @staticmethod
-    def _get_parsed_delivery_data(delivery_data: dict) -> dict:
-        parsed_delivery_data: dict = {
-            "batsman": delivery_data["batter"],
-            "bowler": delivery_data["bowler"],
-            "non_striker": delivery_data["non_striker"],
-            "runs_by_batsman": delivery_data["runs"]["batter"],
-            "extras_type": None,
-            "runs_from_extras": delivery_data["runs"]["extras"],
-            "dismissed_batsman": None,
-            "dismissal_type": None,
-            "fielders_in_dismissal": None
-        }
-
-        if "extras" in delivery_data:
-            parsed_delivery_data["extras_type"] = list(delivery_data["extras"].keys())[0]
-
-        if "wickets" in delivery_data:
-            parsed_delivery_data["dismissed_batsman"] = delivery_data["wickets"][0]["player_out"]
-            parsed_delivery_data["dismissal_type"] = delivery_data["wickets"][0]["kind"]
-            parsed_delivery_data["fielders_in_dismissal"] = [fl["name"]
-                                                             for fl in delivery_data["wickets"][0]["fielders"]]
-
-        return parsed_delivery_data
+        return table_builder.to_frame()
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import io
+import mmap
+from contextlib import contextmanager
+from functools import cached_property
+from typing import IO, Iterator, Optional
+
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder
+from cricsheet.country_resolver import CountryResolver, get_default_country_resolver
+from cricsheet.json_decoder import JSONSource
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_json_parser import MatchJSONParser
+
+ijson = lazy_import("ijson")
+pd = lazy_import("pandas")
+
+
+class MatchJSONStreamParser(MatchJSONParser):
+    def __init__(
+            self,
+            match_fp: JSONSource,
+            country_resolver: Optional[CountryResolver] = None
+    ):
+        """
+        Parser of a Cricsheet JSON file that never holds the whole document
+        in memory. Only the match info is decoded up front; innings are
+        decoded from the file one at a time, each time they are iterated
+        over, and their dicts are released as soon as their table is built.
+        This keeps the peak memory of long test matches down at the cost of
+        reading the file again on every pass over the innings.
+
+        Requires the `ijson` package.
+
+        :param match_fp: Path to JSON file that contains all data about
+        a match, a seekable file-like object such as a zip archive member, or
+        the contents of the file. The match ID is taken from the name of the
+        file, if it has one.
+        :param country_resolver: Resolver used to find the country a match
+        was played in. Defaults to a resolver shared by all parsers.
+        """
+        if ijson is None:
+            raise ImportError("Streaming JSON parsing requires the 'ijson' package.")
+
+        if isinstance(match_fp, str) or hasattr(match_fp, "__fspath__"):
+            self.match_file = str(match_fp)
+        else:
+            self.match_file = getattr(match_fp, "name", None)
+
+        self._match_source: JSONSource = (bytes(match_fp) if isinstance(match_fp, memoryview)
+                                          else match_fp)
+        # File-like objects are rewound to where they were first read from.
+        self._match_source_start: int = (match_fp.tell()
+                                         if hasattr(match_fp, "read") else 0)
+
+        with self._open_match_file() as f:
+            info: Optional[dict] = next(ijson.items(f, "info", use_float=True), None)
+        if info is None:
+            raise ValueError(f"Match file {self.match_file} has no match info.")
+        self.data = {"info": info}
+        self.country_resolver = country_resolver or get_default_country_resolver()
+
+        # Only known once the innings have been read through.
+        self._n_innings: Optional[int] = None
+
+        self.match_id = None
+
+    @contextmanager
+    def _open_match_file(self) -> Iterator[IO[bytes]]:
+        match_source: JSONSource = self._match_source
+        if isinstance(match_source, (bytes, bytearray)):
+            yield io.BytesIO(match_source)
+        elif isinstance(match_source, mmap.mmap) or hasattr(match_source, "read"):
+            match_source.seek(self._match_source_start)
+            yield match_source
+        else:
+            with open(match_source, "rb") as f:
+                yield f
+
+    def _iter_innings_raw_data(self) -> Iterator[dict]:
+        n_innings: int = 0
+        with self._open_match_file() as f:
+            innings_raw_data: dict
+            for innings_raw_data in ijson.items(f, "innings.item", use_float=True):
+                n_innings += 1
+                yield innings_raw_data
+        self._n_innings = n_innings
+
+    @cached_property
+    def revision(self) -> Optional[int]:
+        # Cricsheet files start with their metadata, so this stops reading
+        # long before the innings.
+        with self._open_match_file() as f:
+            meta: dict = next(ijson.items(f, "meta"), None) or {}
+        return meta.get("revision")
+
+    @property
+    def n_innings(self) -> int:
+        if self._n_innings is None:
+            # Reading the innings through is what counts them.
+            _ = self.ball_by_ball_data
+        return self._n_innings
+
+    def iter_innings_data(self) -> Iterator[pd.DataFrame]:
+        """
+        Ball-by-ball data of each innings of a match, decoded from the file
+        and built one innings at a time.
+
+        :return: Iterator of pandas dataframes, one per innings
+        """
+        innings_idx: int
+        innings_raw_data: dict
+        for innings_idx, innings_raw_data in enumerate(self._iter_innings_raw_data()):
+            yield self._get_parsed_innings_data(
+                innings_raw_data.get("overs", []),
+                innings_raw_data["team"],
+                innings_idx
+            )
+
+    def _get_parsed_match_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of every innings of a match, built in a single pass
+        over the file.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the match
+        """
+        table_builder = BallByBallTableBuilder(self.match_id)
+        innings_idx: int
+        innings_raw_data: dict
+        for innings_idx, innings_raw_data in enumerate(self._iter_innings_raw_data()):
+            table_builder.add_innings(
+                innings_raw_data.get("overs", []),
+                innings_raw_data["team"],
+                innings_idx
+            )
+        return table_builder.to_frame()
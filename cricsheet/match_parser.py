@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from cricsheet.country_resolver import CountryResolver
+from cricsheet.instrumentation import instrumentation
+from cricsheet.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+class MatchParser:
+    """
+    Properties shared by the parsers of every Cricsheet data format.
+    Subclasses read the match file and provide the format-specific
+    properties: `teams`, `players`, `people_registry`, `city`, `venue`,
+    `n_innings` and `_get_parsed_match_data`.
+    """
+    match_file: Optional[str]
+    country_resolver: CountryResolver
+
+    @property
+    def match_id(self) -> str:
+        return self._match_id
+
+    @match_id.setter
+    def match_id(self, value: str = None):
+        """
+        Set match ID. If a value is provided, which will only be during unit tests,
+        the specified value is set to be the match ID. Else, the name of the match
+        file becomes the match ID.
+
+        :param value: String value specifying match ID.
+        :return: String denoting match ID.
+        """
+        if value:
+            self._match_id = value
+        elif self.match_file is not None:
+            self._match_id = Path(self.match_file).stem
+        else:
+            self._match_id = None
+
+    @property
+    def teams(self) -> List[str]:
+        raise NotImplementedError()
+
+    @property
+    def players(self) -> Dict[str, List[str]]:
+        """
+        Names of the players of each team.
+        """
+        raise NotImplementedError()
+
+    @property
+    def people_registry(self) -> Dict[str, str]:
+        """
+        Cricsheet registry ID of everyone named in the match.
+        """
+        raise NotImplementedError()
+
+    @property
+    def city(self) -> Optional[str]:
+        raise NotImplementedError()
+
+    @property
+    def venue(self) -> str:
+        raise NotImplementedError()
+
+    @property
+    def n_innings(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    def revision(self) -> Optional[int]:
+        """
+        Revision of the match data, which Cricsheet increments whenever it
+        corrects a match. None if the format does not record it.
+        """
+        return None
+
+    def _get_parsed_match_data(self) -> pd.DataFrame:
+        raise NotImplementedError()
+
+    @cached_property
+    def country(self) -> Optional[str]:
+        # Cricsheet does not record a city for every venue.
+        with instrumentation.timer("resolve_country"):
+            return self.country_resolver.resolve(self.city, self.venue)
+
+    @property
+    def team_1(self) -> str:
+        return self.teams[0]
+
+    @property
+    def team_2(self) -> str:
+        return self.teams[1]
+
+    @property
+    def home_team(self) -> str:
+        if self.country in self.teams:
+            return self.country
+
+    @property
+    def team_1_players(self) -> list:
+        team_1_player_names: list = self.players[self.team_1]
+        s: str
+        return [self.people_registry[s]
+                for s in team_1_player_names]
+
+    @property
+    def team_2_players(self) -> list:
+        team_2_player_names: list = self.players[self.team_2]
+        s: str
+        return [self.people_registry[s]
+                for s in team_2_player_names]
+
+    @property
+    def player_id_table(self) -> pd.DataFrame:
+        match_players: list = (self.players[self.team_1] +
+                               self.players[self.team_2])
+        people_registry: dict = self.people_registry
+        return pd.DataFrame({
+            "player": match_players,
+            "player_id": [people_registry[player]
+                          for player in match_players],
+            "match_id": self.match_id
+        })
+
+    @property
+    def people_table(self) -> pd.DataFrame:
+        """
+        Everyone in the match's registry, i.e. the players of both teams as
+        well as substitutes and officials, with their Cricsheet registry IDs.
+
+        :return: Pandas dataframe with the columns `match_id`, `player` and
+        `player_id`.
+        """
+        people_registry: Dict[str, str] = self.people_registry
+        return pd.DataFrame({
+            "match_id": pd.Series([self.match_id] * len(people_registry), dtype="object"),
+            "player": pd.Series(list(people_registry), dtype="object"),
+            "player_id": pd.Series(list(people_registry.values()), dtype="object")
+        })
+
+    @cached_property
+    def ball_by_ball_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of every innings of a match, including super overs.
+        It is parsed on first access and shared by all later accesses, so it
+        should not be modified in place.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the match
+        """
+        with instrumentation.timer("build_ball_by_ball_table"):
+            ball_by_ball_data: pd.DataFrame = self._get_parsed_match_data()
+        instrumentation.count("deliveries_parsed", len(ball_by_ball_data))
+        return ball_by_ball_data
+
+    @cached_property
+    def innings(self) -> List[pd.DataFrame]:
+        """
+        Ball-by-ball data of each innings of a match, in the order they were
+        played. There are as many entries as innings in the file, so super
+        overs follow the regular innings and abandoned matches may have
+        fewer than two, or none at all.
+
+        :return: List of pandas dataframes, one per innings
+        """
+        innings_numbers: np.ndarray = self.ball_by_ball_data["innings"].to_numpy()
+        # Innings are numbered from 1 and rows are ordered by innings, so the
+        # boundaries between innings can be found by binary search.
+        innings_boundaries: np.ndarray = np.searchsorted(
+            innings_numbers,
+            np.arange(1, self.n_innings + 2)
+        )
+        return [
+            self.ball_by_ball_data.iloc[start:end].reset_index(drop=True)
+            for start, end in zip(innings_boundaries[:-1], innings_boundaries[1:])
+        ]
+
+    def iter_innings_data(self) -> Iterator[pd.DataFrame]:
+        """
+        Ball-by-ball data of each innings of a match, one innings at a time,
+        so that each can be written out before the next is needed. Parsers
+        that stream their file build each innings only when it is reached.
+
+        :return: Iterator of pandas dataframes, one per innings
+        """
+        yield from self.innings
+
+    def _get_innings_data(self, innings_idx: int) -> pd.DataFrame:
+        if innings_idx < len(self.innings):
+            return self.innings[innings_idx]
+        return self.ball_by_ball_data.iloc[:0]
+
+    @property
+    def first_innings_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of the first innings of a match. In a test match,
+        it is the first innings of the team batting first.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the innings
+        """
+        return self._get_innings_data(0)
+
+    @property
+    def second_innings_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of the second innings of a match. In a test match,
+        it is the first innings of the team batting second.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the innings
+        """
+        return self._get_innings_data(1)
+
+    @property
+    def third_innings_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of the third innings of a match. In a test match,
+        it is the second innings of the team batting first.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the innings. It is empty if there was no third innings.
+        """
+        return self._get_innings_data(2)
+
+    @property
+    def fourth_innings_data(self) -> pd.DataFrame:
+        """
+        Ball-by-ball data of the fourth innings of a match. In a test match,
+        it is the second innings of the team batting second.
+
+        :return: Pandas dataframe holding ball-by-ball information about
+        the innings. It is empty if there was no fourth innings.
+        """
+        return self._get_innings_data(3)
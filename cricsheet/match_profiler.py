@@ -0,0 +1,133 @@
+import cProfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional
+
+# Number of frames of the traceback stored with each traced allocation.
+DEFAULT_TRACEMALLOC_FRAMES: int = 10
+
+# Extensions of the files written for each profiled match.
+PROFILE_STATS_SUFFIX: str = ".pstats"
+MEMORY_SNAPSHOT_SUFFIX: str = ".tracemalloc"
+
+
+class MatchProfile(NamedTuple):
+    match_id: str
+    # Size of the match file
+    n_bytes: int
+    # Wall time of the profiled block, including the profilers' overhead
+    seconds: float
+    # Peak memory allocated during the block beyond what was allocated
+    # before it, if memory was traced
+    peak_memory_bytes: Optional[int]
+    # cProfile statistics, readable with `pstats.Stats`
+    stats_fp: str
+    # Allocations still alive at the end of the block, readable with
+    # `tracemalloc.Snapshot.load`, if memory was traced
+    snapshot_fp: Optional[str]
+
+
+class MatchProfiler:
+    def __init__(
+            self,
+            output_dir: str,
+            every_nth: Optional[int] = None,
+            min_bytes: Optional[int] = None,
+            trace_memory: bool = True,
+            n_frames: int = DEFAULT_TRACEMALLOC_FRAMES
+    ):
+        """
+        Profile the processing of a sample of matches, e.g. of an ingest run
+        with `DataIngestionManager.ingest_data`, rather than the whole run.
+        Each profiled match gets a cProfile statistics file and, if memory is
+        traced, a tracemalloc snapshot, named after its match ID.
+
+        A match is profiled if it is one of every `every_nth` matches seen,
+        or if its file has at least `min_bytes` bytes, e.g. to catch long
+        Tests. Every match is profiled if neither is given.
+
+        :param output_dir: Directory the files of profiled matches are
+        written to.
+        :param every_nth: Profile the Nth, 2Nth, ... match seen.
+        :param min_bytes: Profile matches whose file has at least this many
+        bytes.
+        :param trace_memory: Also trace memory allocations with tracemalloc,
+        which slows profiled matches down several times over.
+        :param n_frames: Number of frames stored per traced allocation.
+        """
+        if every_nth is not None and every_nth < 1:
+            raise ValueError(f"every_nth must be at least 1, got {every_nth}.")
+        self.output_dir = Path(output_dir)
+        self.every_nth = every_nth
+        self.min_bytes = min_bytes
+        self.trace_memory = trace_memory
+        self.n_frames = n_frames
+        # Number of matches `should_profile` has been asked about.
+        self.n_matches_seen: int = 0
+        # Profiled matches, in the order they were profiled.
+        self.profiles: List[MatchProfile] = []
+
+    def should_profile(self, n_bytes: int) -> bool:
+        """
+        Whether to profile the next match. To be called once per match, in
+        processing order.
+
+        :param n_bytes: Size of the match's file.
+        """
+        self.n_matches_seen += 1
+        if self.every_nth is None and self.min_bytes is None:
+            return True
+        return ((self.every_nth is not None and self.n_matches_seen % self.every_nth == 0)
+                or (self.min_bytes is not None and n_bytes >= self.min_bytes))
+
+    @contextmanager
+    def profile(self, match_id: str, n_bytes: int = 0) -> Iterator[None]:
+        """
+        Profile the block of a `with` statement as the processing of a
+        match, and write its files when the block is left, even if it
+        raised.
+
+        :param match_id: ID of the match, which names its files.
+        :param n_bytes: Size of the match's file, kept in its `MatchProfile`.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Memory may already be traced, e.g. by `python -X tracemalloc`;
+        # tracing is then left on afterwards.
+        started_tracing: bool = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.n_frames)
+        traced_bytes_before: int = 0
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_bytes_before = tracemalloc.get_traced_memory()[0]
+
+        profiler = cProfile.Profile()
+        start: float = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            seconds: float = time.perf_counter() - start
+
+            stats_fp: Path = self.output_dir / f"{match_id}{PROFILE_STATS_SUFFIX}"
+            profiler.dump_stats(stats_fp)
+            peak_memory_bytes: Optional[int] = None
+            snapshot_fp: Optional[Path] = None
+            if self.trace_memory:
+                peak_memory_bytes = tracemalloc.get_traced_memory()[1] - traced_bytes_before
+                snapshot_fp = self.output_dir / f"{match_id}{MEMORY_SNAPSHOT_SUFFIX}"
+                tracemalloc.take_snapshot().dump(str(snapshot_fp))
+                if started_tracing:
+                    tracemalloc.stop()
+
+            self.profiles.append(MatchProfile(
+                match_id,
+                n_bytes,
+                seconds,
+                peak_memory_bytes,
+                str(stats_fp),
+                str(snapshot_fp) if snapshot_fp is not None else None
+            ))
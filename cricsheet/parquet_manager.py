@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import json
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from cricsheet.lazy_import import lazy_import
+from cricsheet.match_data_processor import MatchBatch
+from cricsheet.table_schemas import BALL_BY_BALL_TABLE_NAME, MATCH_INFO_TABLE_NAME, TableSchema, get_table_schemas
+
+pd = lazy_import("pandas")
+pyarrow = lazy_import("pyarrow")
+pyarrow_compute = lazy_import("pyarrow.compute")
+pyarrow_dataset = lazy_import("pyarrow.dataset")
+pyarrow_parquet = lazy_import("pyarrow.parquet")
+
+# Columns of the match info table that Parquet datasets are partitioned by,
+# outermost first. Reading one season, or one season's T20Is, only touches
+# the files under its directories.
+PARTITION_COLUMNS: List[str] = ["season", "match_type", "gender"]
+
+# File in the data directory recording the matches written to its datasets,
+# and the hash of the file(s) they were read from. Its name starts with an
+# underscore so that dataset discovery ignores it.
+MATCH_MANIFEST_FILE_NAME: str = "_match_manifest.json"
+
+
+def _get_arrow_type(column_type: str) -> pyarrow.DataType:
+    # Arrow type of a column declared with a Postgres type in `TableSchema`.
+    # Dates are kept as the ISO strings they are parsed as.
+    base_type: str = column_type.split()[0]
+    if base_type.endswith("[]"):
+        return pyarrow.list_(_get_arrow_type(base_type[:-2]))
+    return {
+        "SMALLINT": pyarrow.int16(),
+        "INTEGER": pyarrow.int32(),
+        "BIGINT": pyarrow.int64(),
+        "TEXT": pyarrow.string(),
+        "DATE": pyarrow.string(),
+        "TIMESTAMPTZ": pyarrow.timestamp("us", tz="UTC")
+    }[base_type]
+
+
+class ParquetManager:
+    def __init__(
+            self,
+            data_dir: str,
+            compression: str = "zstd",
+            compression_level: Optional[int] = None,
+            table_schemas: Optional[Dict[str, TableSchema]] = None
+    ):
+        """
+        Write tables as Parquet datasets, an alternative to `DatabaseManager`
+        for analytics. Each table is a directory of Hive-style partitions,
+        e.g. `ball_by_ball/season=2023/match_type=T20/gender=male/`, and every
+        write adds new files, so datasets can be appended to one ingest run
+        at a time. Which matches have been written is recorded in a manifest
+        next to the datasets, see `get_match_manifest`, so that later runs
+        can skip them. Requires the `pyarrow` package.
+
+        Columns declared in `table_schemas` are written with the Arrow type
+        of their declared type, whatever their dtype in a given batch, so
+        that every file of a table has the same schema. Otherwise a column
+        that happens to be all null in one batch, e.g. `won_by_runs`, would
+        be written with the null type and the dataset could not be read
+        once another batch filled it in.
+
+        :param data_dir: Directory holding one dataset per table.
+        :param compression: Parquet compression codec.
+        :param compression_level: Level of the compression codec. Defaults to
+        the codec's default level.
+        :param table_schemas: Declared schemas of tables, by table name, in
+        addition to or instead of those of `get_table_schemas()`, e.g.
+        `get_table_schemas(player_keys=True)` for ball-by-ball tables with
+        player keys.
+        """
+        if pyarrow is None:
+            raise ImportError("Writing Parquet datasets requires the 'pyarrow' package.")
+
+        self.data_dir = Path(data_dir)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.table_schemas: Dict[str, TableSchema] = {**get_table_schemas(), **(table_schemas or {})}
+        # Partition values are kept as strings; otherwise a season such as
+        # "2023" would be read back as an integer.
+        self.partitioning = pyarrow_dataset.partitioning(
+            pyarrow.schema([(column, pyarrow.string()) for column in PARTITION_COLUMNS]),
+            flavor="hive"
+        )
+
+    def _get_table_dir(self, table_name: str) -> Path:
+        return self.data_dir / table_name
+
+    def get_arrow_schema(self, table_name: str, table: pd.DataFrame) -> pyarrow.Schema:
+        """
+        Arrow schema a table is written with: the declared type of each
+        column of its table schema, strings for partition columns, and the
+        inferred type of any other column.
+
+        :param table_name: Name of the dataset.
+        :param table: Rows to write, with the partition columns.
+        :return: Schema with a field per column of `table`, in order.
+        """
+        declared_columns: Dict[str, str] = (self.table_schemas[table_name].columns
+                                            if table_name in self.table_schemas else {})
+        undeclared_columns: List[str] = [column for column in table.columns
+                                         if column not in declared_columns and column not in PARTITION_COLUMNS]
+        inferred_schema: pyarrow.Schema = pyarrow.Schema.from_pandas(
+            table[undeclared_columns], preserve_index=False
+        )
+
+        fields: List[pyarrow.Field] = []
+        column: str
+        for column in table.columns:
+            if column in PARTITION_COLUMNS:
+                fields.append(pyarrow.field(column, pyarrow.string()))
+            elif column in declared_columns:
+                fields.append(pyarrow.field(column, _get_arrow_type(declared_columns[column])))
+            else:
+                # Categorical columns are written as plain columns, which
+                # Parquet dictionary-encodes anyway, as the index width of
+                # a dictionary type depends on the number of categories.
+                field: pyarrow.Field = inferred_schema.field(column)
+                fields.append(field.with_type(field.type.value_type)
+                              if pyarrow.types.is_dictionary(field.type) else field)
+        return pyarrow.schema(fields)
+
+    def table_exists(self, table_name: str) -> bool:
+        return self._get_table_dir(table_name).is_dir()
+
+    def get_match_manifest(self) -> Dict[str, Optional[str]]:
+        """
+        Matches written so far, as recorded by `update_match_manifest`.
+
+        :return: File hash of each match, by match ID. It is None for
+        matches read from a directory, which are never rewritten.
+        """
+        manifest_fp: Path = self.data_dir / MATCH_MANIFEST_FILE_NAME
+        return json.loads(manifest_fp.read_text()) if manifest_fp.exists() else {}
+
+    def update_match_manifest(self, file_hashes: Dict[str, Optional[str]]):
+        """
+        Record matches whose tables have been written. The manifest is
+        replaced atomically, so an interrupted write leaves the previous one.
+
+        :param file_hashes: File hash of each match, by match ID, see
+        `DataIngestionManager.file_hashes`, or None for matches read from a
+        directory.
+        """
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        manifest_fp: Path = self.data_dir / MATCH_MANIFEST_FILE_NAME
+        temp_fp: Path = manifest_fp.with_name(f".{manifest_fp.name}.tmp")
+        temp_fp.write_text(json.dumps({**self.get_match_manifest(), **file_hashes}))
+        temp_fp.replace(manifest_fp)
+
+    def delete_matches(self, match_ids: Iterable[str]):
+        """
+        Remove the rows of matches from every dataset, e.g. before writing a
+        revised version of them. Files that hold none of the matches are
+        left alone, and those that hold nothing else are deleted.
+
+        :param match_ids: IDs of the matches to remove.
+        """
+        match_id_set: Set[str] = set(match_ids)
+        if not match_id_set or not self.data_dir.is_dir():
+            return
+        deleted_match_ids = pyarrow.array(sorted(match_id_set), pyarrow.string())
+
+        table_dir: Path
+        for table_dir in self.data_dir.iterdir():
+            if not table_dir.is_dir():
+                continue
+            file_fp: Path
+            for file_fp in sorted(table_dir.rglob("*.parquet")):
+                parquet_file = pyarrow_parquet.ParquetFile(file_fp)
+                is_deleted = pyarrow_compute.is_in(
+                    parquet_file.read(columns=["match_id"])["match_id"], value_set=deleted_match_ids
+                )
+                if not pyarrow_compute.any(is_deleted).as_py():
+                    continue
+                kept_rows = parquet_file.read().filter(pyarrow_compute.invert(is_deleted))
+                if kept_rows.num_rows == 0:
+                    file_fp.unlink()
+                    continue
+                # Hidden files are ignored by dataset discovery until they
+                # replace the original.
+                temp_fp: Path = file_fp.with_name(f".{file_fp.name}.tmp")
+                pyarrow_parquet.write_table(
+                    kept_rows,
+                    temp_fp,
+                    compression=self.compression,
+                    compression_level=self.compression_level
+                )
+                temp_fp.replace(file_fp)
+
+    def update_table(
+            self,
+            table_name: str,
+            table: pd.DataFrame,
+            match_info: pd.DataFrame
+    ):
+        """
+        Add a table to a Parquet dataset, creating the latter if needed.
+
+        :param table_name: Name of the dataset.
+        :param table: Rows to add. They are matched to their partition by
+        `match_id`.
+        :param match_info: Match info of every match in `table`, from which
+        the partition columns are taken.
+        """
+        if table.empty:
+            return
+
+        partition_values: pd.DataFrame = (
+            match_info.drop_duplicates("match_id")
+            .set_index("match_id")[PARTITION_COLUMNS]
+            .astype("object")
+        )
+        match_ids: pd.Index = pd.Index(table["match_id"].astype("object"))
+        partitioned_table: pd.DataFrame = table.drop(
+            columns=[column for column in PARTITION_COLUMNS if column in table.columns]
+        ).assign(**{
+            column: partition_values[column].reindex(match_ids).to_numpy()
+            for column in PARTITION_COLUMNS
+        })
+
+        # Dates read back from Postgres are dates rather than the ISO strings
+        # they are parsed as.
+        date_array_columns: List[str] = (
+            [column for column in self.table_schemas[table_name].date_array_columns
+             if column in partitioned_table.columns]
+            if table_name in self.table_schemas else []
+        )
+        if date_array_columns:
+            partitioned_table = partitioned_table.assign(**{
+                column: partitioned_table[column].map(
+                    lambda dates: [date if isinstance(date, str) else date.isoformat()
+                                   for date in dates] if isinstance(dates, list) else dates
+                )
+                for column in date_array_columns
+            })
+
+        arrow_table = pyarrow.Table.from_pandas(
+            partitioned_table,
+            schema=self.get_arrow_schema(table_name, partitioned_table),
+            preserve_index=False
+        )
+
+        pyarrow_dataset.write_dataset(
+            arrow_table,
+            self._get_table_dir(table_name),
+            format="parquet",
+            partitioning=self.partitioning,
+            # A new name per write, so that earlier files are never replaced.
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            file_options=pyarrow_dataset.ParquetFileFormat().make_write_options(
+                compression=self.compression,
+                compression_level=self.compression_level,
+                use_dictionary=True
+            )
+        )
+
+    def update_tables(self, match_batch: MatchBatch):
+        """
+        Add the match info and ball-by-ball tables of a batch of matches.
+
+        :param match_batch: Tables of the matches, e.g. from
+        `MatchDataProcessor.iter_match_batches`.
+        """
+        self.update_table(MATCH_INFO_TABLE_NAME, match_batch.match_info, match_batch.match_info)
+        self.update_table(BALL_BY_BALL_TABLE_NAME, match_batch.ball_by_ball, match_batch.match_info)
+
+    def read_table(
+            self,
+            table_name: str,
+            columns: Optional[List[str]] = None,
+            **partition_values: str
+    ) -> pd.DataFrame:
+        """
+        Read a Parquet dataset, or only some of its partitions.
+
+        :param table_name: Name of the dataset.
+        :param columns: Columns to read. Defaults to all columns.
+        :param partition_values: Values of partition columns to keep, e.g.
+        `season="2023"`. Only the files of matching partitions are read.
+        :return: Pandas dataframe with the requested rows and columns.
+        """
+        unknown_columns: List[str] = [column for column in partition_values
+                                      if column not in PARTITION_COLUMNS]
+        if unknown_columns:
+            raise ValueError(
+                f"Unknown partition columns {unknown_columns}. Expected some of {PARTITION_COLUMNS}."
+            )
+
+        dataset = pyarrow_dataset.dataset(
+            self._get_table_dir(table_name),
+            format="parquet",
+            partitioning=self.partitioning
+        )
+        filter_expression = None
+        column: str
+        value: str
+        for column, value in partition_values.items():
+            condition = pyarrow_dataset.field(column) == value
+            filter_expression = condition if filter_expression is None else filter_expression & condition
+        return dataset.to_table(columns=columns, filter=filter_expression).to_pandas()
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from cricsheet.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Dtype of player surrogate keys.
+PLAYER_KEY_DTYPE: str = "int32"
+
+# Ball-by-ball columns holding the name of one player, and the dtype of the
+# player keys that replace them. Nobody is dismissed on most deliveries, so
+# `dismissed_batsman` is nullable.
+PLAYER_KEY_COLUMN_DTYPES: Dict[str, str] = {
+    "batsman": PLAYER_KEY_DTYPE,
+    "bowler": PLAYER_KEY_DTYPE,
+    "non_striker": PLAYER_KEY_DTYPE,
+    "dismissed_batsman": "Int32"
+}
+
+# Columns of the player dimension table.
+PLAYER_TABLE_COLUMNS: List[str] = ["player_key", "player_id", "player_name"]
+
+
+class PlayerRegistry:
+    def __init__(self, player_table: Optional[pd.DataFrame] = None):
+        """
+        Player dimension shared by all matches. Each Cricsheet registry ID is
+        interned to a small integer surrogate key the first time it is seen,
+        so that tables can store players as int32 keys instead of names.
+        Keys are handed out from 1 in the order players are first seen.
+
+        :param player_table: Players already in the dimension, with the
+        columns in `PLAYER_TABLE_COLUMNS`, e.g. as read from the database.
+        Their keys are kept and new keys continue after the largest one.
+        """
+        self._player_keys: Dict[str, int] = {}
+        self._player_ids: List[str] = []
+        self._player_names: List[Optional[str]] = []
+        # Key of each entry of `_player_ids`. Keys are consecutive, except
+        # possibly for those of a given `player_table`.
+        self._keys: List[int] = []
+        self._next_key: int = 1
+        # Number of entries of `_player_ids` that have been persisted.
+        self._n_persisted: int = 0
+
+        if player_table is not None and not player_table.empty:
+            for player_key, player_id, player_name in player_table[PLAYER_TABLE_COLUMNS].itertuples(index=False):
+                self._add(player_id, player_name, int(player_key))
+            self._n_persisted = len(self._player_ids)
+
+    def __len__(self) -> int:
+        return len(self._player_ids)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self._player_keys
+
+    def _add(self, player_id: str, player_name: Optional[str], player_key: Optional[int] = None) -> int:
+        if player_key is None:
+            player_key = self._next_key
+        self._player_keys[player_id] = player_key
+        self._player_ids.append(player_id)
+        self._player_names.append(player_name)
+        self._keys.append(player_key)
+        self._next_key = max(self._next_key, player_key + 1)
+        return player_key
+
+    def intern(
+            self,
+            player_ids: Iterable[str],
+            player_names: Optional[Iterable[str]] = None
+    ) -> np.ndarray:
+        """
+        Look up the keys of players, adding those not seen before.
+
+        :param player_ids: Cricsheet registry IDs of the players.
+        :param player_names: Names of the players, recorded for players seen
+        for the first time.
+        :return: Array of player keys, one per ID.
+        """
+        player_ids = list(player_ids)
+        player_names = list(player_names) if player_names is not None else [None] * len(player_ids)
+
+        player_keys: Dict[str, int] = self._player_keys
+        keys: np.ndarray = np.empty(len(player_ids), dtype=PLAYER_KEY_DTYPE)
+        idx: int
+        player_id: str
+        for idx, (player_id, player_name) in enumerate(zip(player_ids, player_names)):
+            player_key: Optional[int] = player_keys.get(player_id)
+            if player_key is None:
+                player_key = self._add(player_id, player_name)
+            keys[idx] = player_key
+        return keys
+
+    def get_player_key(self, player_id: str) -> int:
+        return self._player_keys[player_id]
+
+    @property
+    def player_table(self) -> pd.DataFrame:
+        """
+        The whole player dimension.
+
+        :return: Pandas dataframe with the columns in `PLAYER_TABLE_COLUMNS`.
+        """
+        return self._get_player_table(0)
+
+    def _get_player_table(self, start: int) -> pd.DataFrame:
+        return pd.DataFrame({
+            "player_key": np.array(self._keys[start:], dtype=PLAYER_KEY_DTYPE),
+            "player_id": pd.Series(self._player_ids[start:], dtype="object"),
+            "player_name": pd.Series(self._player_names[start:], dtype="object")
+        }, columns=PLAYER_TABLE_COLUMNS)
+
+    def get_new_players(self) -> pd.DataFrame:
+        """
+        Players added since the dimension was last marked as persisted, see
+        `mark_persisted`.
+
+        :return: Pandas dataframe with the columns in `PLAYER_TABLE_COLUMNS`.
+        """
+        return self._get_player_table(self._n_persisted)
+
+    def mark_persisted(self, n_players: Optional[int] = None):
+        """
+        Record that players have been written out, e.g. to the database, so
+        that `get_new_players` no longer returns them.
+
+        :param n_players: Number of players, in the order they were added,
+        that have been written out. Defaults to every player added so far.
+        """
+        self._n_persisted = len(self._player_ids) if n_players is None else n_players
+
+    def get_player_match_table(self, people_table: pd.DataFrame) -> pd.DataFrame:
+        """
+        Key of every person named in each match.
+
+        :param people_table: Registry of each match, with the columns
+        `match_id`, `player` and `player_id`.
+        :return: Pandas dataframe with the columns `match_id` and
+        `player_key`.
+        """
+        return pd.DataFrame({
+            "match_id": people_table["match_id"].to_numpy(),
+            "player_key": self.intern(people_table["player_id"], people_table["player"])
+        })
+
+    def encode_ball_by_ball_table(
+            self,
+            ball_by_ball_table: pd.DataFrame,
+            people_table: pd.DataFrame
+    ) -> pd.DataFrame:
+        """
+        Replace the names of players in a ball-by-ball table by their keys.
+
+        :param ball_by_ball_table: Ball-by-ball table of one or more matches,
+        with player names.
+        :param people_table: Registry of each of those matches, with the
+        columns `match_id`, `player` and `player_id`, e.g. the `people` table
+        of a `MatchBatch`.
+        :return: New ball-by-ball table with the columns in
+        `PLAYER_KEY_COLUMN_DTYPES` holding player keys and
+        `fielders_in_dismissal` holding lists of player keys.
+        """
+        people_keys: np.ndarray = self.intern(people_table["player_id"], people_table["player"])
+        # Names are only unique within a match.
+        people_index = pd.MultiIndex.from_arrays([
+            people_table["match_id"].astype("object").to_numpy(),
+            people_table["player"].astype("object").to_numpy()
+        ])
+        match_ids: np.ndarray = ball_by_ball_table["match_id"].astype("object").to_numpy()
+
+        def get_people_positions(row_match_ids: np.ndarray, player_names: np.ndarray) -> np.ndarray:
+            # Position of each player in `people_table`, or -1 if the name is
+            # missing.
+            positions: np.ndarray = people_index.get_indexer(
+                pd.MultiIndex.from_arrays([row_match_ids, player_names])
+            )
+            is_unknown: np.ndarray = (positions == -1) & pd.notna(player_names)
+            if is_unknown.any():
+                raise KeyError(
+                    f"Players missing from the registry of their match: "
+                    f"{sorted(set(player_names[is_unknown]))}"
+                )
+            return positions
+
+        encoded_table: pd.DataFrame = ball_by_ball_table.copy()
+        column: str
+        dtype: str
+        for column, dtype in PLAYER_KEY_COLUMN_DTYPES.items():
+            positions: np.ndarray = get_people_positions(
+                match_ids, ball_by_ball_table[column].astype("object").to_numpy()
+            )
+            player_keys = pd.array(people_keys[positions], dtype=dtype)
+            if (positions == -1).any():
+                player_keys[positions == -1] = pd.NA
+            encoded_table[column] = pd.Series(player_keys, index=ball_by_ball_table.index)
+
+        # Only the few deliveries with a dismissal have fielders, so their
+        # lists are flattened, encoded at once and split up again.
+        has_fielders: np.ndarray = ball_by_ball_table["fielders_in_dismissal"].notna().to_numpy()
+        encoded_fielders: np.ndarray = ball_by_ball_table["fielders_in_dismissal"].to_numpy(copy=True)
+        if has_fielders.any():
+            fielder_lists: np.ndarray = encoded_fielders[has_fielders]
+            fielder_counts: np.ndarray = np.array([len(names) for names in fielder_lists])
+            fielder_positions: np.ndarray = get_people_positions(
+                np.repeat(match_ids[has_fielders], fielder_counts),
+                np.array([name for names in fielder_lists for name in names], dtype="object")
+            )
+            fielder_keys: List[np.ndarray] = np.split(
+                people_keys[fielder_positions], np.cumsum(fielder_counts)[:-1]
+            )
+            row_idx: int
+            row_fielder_keys: np.ndarray
+            for row_idx, row_fielder_keys in zip(np.flatnonzero(has_fielders), fielder_keys):
+                encoded_fielders[row_idx] = row_fielder_keys.tolist()
+        encoded_table["fielders_in_dismissal"] = encoded_fielders
+        return encoded_table
@@ -0,0 +1,335 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Columns identifying an innings in the ball-by-ball table.
+INNINGS_COLUMNS: List[str] = ["match_id", "innings"]
+
+# Dismissals credited to the bowler. Run outs, for example, are not.
+BOWLER_DISMISSAL_TYPES: List[str] = ["bowled", "caught", "caught and bowled", "lbw", "stumped", "hit wicket"]
+
+# Dismissals that end a batsman's innings, and so a partnership, but do not
+# count as a wicket.
+RETIRED_DISMISSAL_TYPES: List[str] = ["retired hurt", "retired not out"]
+
+# Extras that do not count as one of the balls of an over, and are charged
+# to the bowler. Byes, leg byes and penalty runs are neither.
+ILLEGAL_DELIVERY_EXTRAS_TYPES: List[str] = ["wides", "noballs"]
+
+DEFAULT_BALLS_PER_OVER: int = 6
+
+BATTING_SCORECARD_COLUMNS: List[str] = [
+    "match_id", "innings", "batting_team", "batting_position", "batsman", "runs", "balls_faced",
+    "fours", "sixes", "strike_rate", "dismissal_type", "dismissed_by"
+]
+BOWLING_FIGURES_COLUMNS: List[str] = [
+    "match_id", "innings", "bowler", "overs", "balls", "maidens", "runs_conceded", "wickets",
+    "wides", "noballs", "economy"
+]
+PARTNERSHIP_COLUMNS: List[str] = [
+    "match_id", "innings", "partnership", "batsman_1", "batsman_1_runs", "batsman_2", "batsman_2_runs",
+    "runs", "balls"
+]
+FALL_OF_WICKETS_COLUMNS: List[str] = [
+    "match_id", "innings", "wicket", "score", "overs", "dismissed_batsman", "dismissal_type"
+]
+
+
+def _factorize_columns(columns: List[pd.Series]) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Integer codes of the values of several columns, e.g. the batsman and
+    non-striker columns, in one shared set of values. Missing values get
+    the code -1. Categorical columns are coded from their categories, so
+    their rows are never hashed.
+
+    :return: Codes of each column, and the value of each code.
+    """
+    if all(isinstance(column.dtype, pd.CategoricalDtype) for column in columns):
+        category_codes, uniques = pd.factorize(np.concatenate([
+            column.cat.categories.to_numpy(dtype="object") for column in columns
+        ]))
+        offsets: np.ndarray = np.cumsum([0] + [len(column.cat.categories) for column in columns])
+        column_codes: List[np.ndarray] = []
+        for column, offset in zip(columns, offsets):
+            codes: np.ndarray = column.cat.codes.to_numpy().astype("int64")
+            column_codes.append(np.where(codes >= 0, category_codes[offset + codes], -1))
+        return column_codes, np.asarray(uniques, dtype="object")
+
+    codes, uniques = pd.factorize(np.concatenate([column.to_numpy() for column in columns]))
+    return np.split(codes.astype("int64"), len(columns)), np.asarray(uniques, dtype="object")
+
+
+def _group(*keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group rows by several non-negative integer keys at once.
+
+    :return: Group of each row, numbered in order of first appearance, and
+    the position of the first row of each group.
+    """
+    combined_key: np.ndarray = np.zeros(len(keys[0]), dtype="int64")
+    key: np.ndarray
+    for key in keys:
+        combined_key = combined_key * (int(key.max(initial=0)) + 1) + key
+    group_ids: np.ndarray = pd.factorize(combined_key)[0]
+    return group_ids, np.unique(group_ids, return_index=True)[1]
+
+
+def _sum_by_group(group_ids: np.ndarray, n_groups: int, values: np.ndarray) -> np.ndarray:
+    return np.bincount(group_ids, weights=values, minlength=n_groups).astype("int64")
+
+
+class _Deliveries:
+    def __init__(self, ball_by_ball_table: pd.DataFrame):
+        """
+        Flags and run totals of each delivery of a ball-by-ball table, as
+        NumPy arrays, which the aggregations are built from. The deliveries
+        of each innings must be consecutive.
+        """
+        self.table = ball_by_ball_table
+
+        extras_type: pd.Series = ball_by_ball_table["extras_type"]
+        self.is_wide: np.ndarray = extras_type.isin(["wides"]).to_numpy()
+        self.is_noball: np.ndarray = extras_type.isin(["noballs"]).to_numpy()
+        self.is_legal: np.ndarray = ~extras_type.isin(ILLEGAL_DELIVERY_EXTRAS_TYPES).to_numpy()
+
+        self.runs_by_batsman: np.ndarray = ball_by_ball_table["runs_by_batsman"].to_numpy(dtype="int64")
+        runs_from_extras: np.ndarray = ball_by_ball_table["runs_from_extras"].to_numpy(dtype="int64")
+        self.total_runs: np.ndarray = self.runs_by_batsman + runs_from_extras
+        self.bowler_runs: np.ndarray = self.runs_by_batsman + np.where(self.is_legal, 0, runs_from_extras)
+
+        dismissal_type: pd.Series = ball_by_ball_table["dismissal_type"]
+        self.is_dismissal: np.ndarray = ball_by_ball_table["dismissed_batsman"].notna().to_numpy()
+        self.is_wicket: np.ndarray = self.is_dismissal & ~dismissal_type.isin(RETIRED_DISMISSAL_TYPES).to_numpy()
+        self.is_bowler_wicket: np.ndarray = dismissal_type.isin(BOWLER_DISMISSAL_TYPES).to_numpy()
+
+        # Position of each delivery's innings among the innings of the
+        # table, and of the first delivery of each innings.
+        self.innings_idx, self.innings_starts = _group(
+            pd.factorize(ball_by_ball_table["match_id"])[0].astype("int64"),
+            ball_by_ball_table["innings"].to_numpy(dtype="int64")
+        )
+
+    def cumsum_by_innings(self, values: np.ndarray) -> np.ndarray:
+        cumsum: np.ndarray = np.cumsum(values, dtype="int64")
+        innings_offsets: np.ndarray = cumsum[self.innings_starts] - values[self.innings_starts]
+        return cumsum - innings_offsets[self.innings_idx]
+
+    def take(self, columns: List[str], positions: np.ndarray) -> Dict[str, pd.Series]:
+        # Columns of the table at some deliveries. Categorical columns of
+        # compact tables are decoded, so that scorecards have the same
+        # columns whichever kind of table they are computed from.
+        taken: Dict[str, pd.Series] = {}
+        column: str
+        for column in columns:
+            values: pd.Series = self.table[column].take(positions).reset_index(drop=True)
+            taken[column] = values.astype("object") if isinstance(values.dtype, pd.CategoricalDtype) else values
+        return taken
+
+
+def _format_overs(n_balls: np.ndarray, balls_per_over: int) -> np.ndarray:
+    # Completed overs and the balls of the over in progress, e.g. "9.4".
+    n_balls = np.asarray(n_balls, dtype="int64")
+    return np.char.add(
+        np.char.add((n_balls // balls_per_over).astype(str), "."),
+        (n_balls % balls_per_over).astype(str)
+    ).astype(object)
+
+
+def get_batting_scorecard(ball_by_ball_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Batting scorecard of each innings in a ball-by-ball table, e.g. from
+    `MatchDataProcessor.get_ball_by_ball_table` or a `MatchBatch`.
+
+    Balls faced include no-balls but not wides. Fours and sixes are
+    deliveries off which the batsman scored exactly 4 or 6 runs, as
+    Cricsheet does not say whether runs were boundaries.
+
+    :param ball_by_ball_table: Ball-by-ball table of one or more matches,
+    with the deliveries of each innings consecutive and in order.
+    :return: Pandas dataframe with the columns in
+    `BATTING_SCORECARD_COLUMNS` and one row per batsman per innings, in
+    batting order. Batsmen who were at the crease without facing a ball
+    are included; `dismissal_type` is missing for batsmen not out, and
+    `dismissed_by` is the bowler credited with the wicket, if any.
+    """
+    deliveries = _Deliveries(ball_by_ball_table)
+    n_deliveries: int = len(ball_by_ball_table)
+    (batsman_codes, non_striker_codes, dismissed_codes), player_names = _factorize_columns([
+        ball_by_ball_table["batsman"], ball_by_ball_table["non_striker"], ball_by_ball_table["dismissed_batsman"]
+    ])
+
+    # Batting order is the order batsmen first came to the crease, as the
+    # striker or non-striker of a delivery, so both are grouped together,
+    # each delivery's striker first.
+    group_ids, first_positions = _group(
+        np.repeat(deliveries.innings_idx, 2), np.stack([batsman_codes, non_striker_codes], axis=1).ravel()
+    )
+    n_batsmen: int = len(first_positions)
+    striker_group_ids: np.ndarray = group_ids[0::2]
+    first_deliveries: np.ndarray = first_positions // 2
+    batsman_innings_idx: np.ndarray = deliveries.innings_idx[first_deliveries]
+
+    scorecard: Dict[str, object] = deliveries.take(INNINGS_COLUMNS + ["batting_team"], first_deliveries)
+    scorecard["batting_position"] = np.arange(n_batsmen) - np.searchsorted(
+        batsman_innings_idx, batsman_innings_idx
+    ) + 1
+    scorecard["batsman"] = player_names[np.stack([batsman_codes, non_striker_codes], axis=1).ravel()[first_positions]]
+    scorecard["runs"] = _sum_by_group(striker_group_ids, n_batsmen, deliveries.runs_by_batsman)
+    scorecard["balls_faced"] = _sum_by_group(striker_group_ids, n_batsmen, ~deliveries.is_wide)
+    scorecard["fours"] = _sum_by_group(striker_group_ids, n_batsmen, deliveries.runs_by_batsman == 4)
+    scorecard["sixes"] = _sum_by_group(striker_group_ids, n_batsmen, deliveries.runs_by_batsman == 6)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scorecard["strike_rate"] = np.where(
+            scorecard["balls_faced"] > 0, 100 * scorecard["runs"] / scorecard["balls_faced"], np.nan
+        )
+
+    # Dismissed batsmen are matched to their batting group by innings and
+    # player code; a batsman dismissed twice in an innings, i.e. after
+    # retiring, keeps the last dismissal.
+    dismissals: np.ndarray = np.flatnonzero(deliveries.is_dismissal)
+    n_player_codes: int = max(len(player_names), 1)
+    batsman_keys: pd.Index = pd.Index(
+        batsman_innings_idx * n_player_codes
+        + np.stack([batsman_codes, non_striker_codes], axis=1).ravel()[first_positions]
+    )
+    dismissed_group_ids: np.ndarray = batsman_keys.get_indexer(
+        deliveries.innings_idx[dismissals] * n_player_codes + dismissed_codes[dismissals]
+    )
+    dismissal_types: np.ndarray = np.full(n_batsmen, None, dtype="object")
+    dismissal_types[dismissed_group_ids] = ball_by_ball_table["dismissal_type"].to_numpy(dtype="object")[dismissals]
+    dismissed_by: np.ndarray = np.full(n_batsmen, None, dtype="object")
+    dismissed_by[dismissed_group_ids] = np.where(
+        deliveries.is_bowler_wicket[dismissals],
+        ball_by_ball_table["bowler"].to_numpy(dtype="object")[dismissals],
+        None
+    )
+    scorecard["dismissal_type"] = dismissal_types
+    scorecard["dismissed_by"] = dismissed_by
+    return pd.DataFrame(scorecard, columns=BATTING_SCORECARD_COLUMNS)
+
+
+def get_bowling_figures(
+        ball_by_ball_table: pd.DataFrame,
+        balls_per_over: int = DEFAULT_BALLS_PER_OVER
+) -> pd.DataFrame:
+    """
+    Bowling figures of each innings in a ball-by-ball table.
+
+    Runs conceded are the runs scored off the bat plus wides and no-balls;
+    byes, leg byes and penalty runs are not charged to the bowler. Wickets
+    only count dismissals credited to the bowler, see
+    `BOWLER_DISMISSAL_TYPES`. A maiden is a complete over of one bowler
+    without runs conceded.
+
+    :param ball_by_ball_table: Ball-by-ball table of one or more matches,
+    with the deliveries of each innings consecutive.
+    :param balls_per_over: Legal deliveries per over, see the match info's
+    `balls_per_over`.
+    :return: Pandas dataframe with the columns in `BOWLING_FIGURES_COLUMNS`
+    and one row per bowler per innings, in the order they first bowled.
+    `overs` is formatted as completed overs and balls, e.g. "9.4", and
+    `balls` counts legal deliveries.
+    """
+    deliveries = _Deliveries(ball_by_ball_table)
+    (bowler_codes,), _ = _factorize_columns([ball_by_ball_table["bowler"]])
+    group_ids, first_positions = _group(deliveries.innings_idx, bowler_codes)
+    n_bowlers: int = len(first_positions)
+
+    figures: Dict[str, object] = deliveries.take(INNINGS_COLUMNS + ["bowler"], first_positions)
+    figures["balls"] = _sum_by_group(group_ids, n_bowlers, deliveries.is_legal)
+    figures["runs_conceded"] = _sum_by_group(group_ids, n_bowlers, deliveries.bowler_runs)
+    figures["wickets"] = _sum_by_group(group_ids, n_bowlers, deliveries.is_bowler_wicket)
+    figures["wides"] = _sum_by_group(group_ids, n_bowlers, deliveries.is_wide)
+    figures["noballs"] = _sum_by_group(group_ids, n_bowlers, deliveries.is_noball)
+
+    over_group_ids, over_first_positions = _group(group_ids, ball_by_ball_table["over"].to_numpy(dtype="int64"))
+    n_overs: int = len(over_first_positions)
+    is_maiden: np.ndarray = (
+        (_sum_by_group(over_group_ids, n_overs, deliveries.is_legal) >= balls_per_over)
+        & (_sum_by_group(over_group_ids, n_overs, deliveries.bowler_runs) == 0)
+    )
+    figures["maidens"] = _sum_by_group(group_ids[over_first_positions], n_bowlers, is_maiden)
+
+    figures["overs"] = _format_overs(figures["balls"], balls_per_over)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        figures["economy"] = np.where(
+            figures["balls"] > 0, balls_per_over * figures["runs_conceded"] / figures["balls"], np.nan
+        )
+    return pd.DataFrame(figures, columns=BOWLING_FIGURES_COLUMNS)
+
+
+def get_partnerships(ball_by_ball_table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Partnerships of each innings in a ball-by-ball table. A partnership ends
+    with any dismissal, including a batsman retiring, and the delivery of
+    the dismissal is part of it.
+
+    :param ball_by_ball_table: Ball-by-ball table of one or more matches,
+    with the deliveries of each innings consecutive and in order.
+    :return: Pandas dataframe with the columns in `PARTNERSHIP_COLUMNS` and
+    one row per partnership, numbered from 1 within each innings.
+    `batsman_1` is the striker of the partnership's first delivery. `runs`
+    includes extras, so it can exceed the sum of the batsmen's runs, and
+    `balls` counts legal deliveries.
+    """
+    deliveries = _Deliveries(ball_by_ball_table)
+    (batsman_codes, non_striker_codes), _ = _factorize_columns([
+        ball_by_ball_table["batsman"], ball_by_ball_table["non_striker"]
+    ])
+    partnership: np.ndarray = (deliveries.cumsum_by_innings(deliveries.is_dismissal)
+                               - deliveries.is_dismissal + 1)
+    group_ids, first_positions = _group(deliveries.innings_idx, partnership)
+    n_partnerships: int = len(first_positions)
+
+    partnerships: Dict[str, object] = deliveries.take(INNINGS_COLUMNS, first_positions)
+    partnerships["partnership"] = partnership[first_positions]
+    partnerships.update({
+        column: values.rename(None)
+        for column, values in zip(
+            ["batsman_1", "batsman_2"],
+            deliveries.take(["batsman", "non_striker"], first_positions).values()
+        )
+    })
+    # Whether the striker of each delivery is the partnership's first
+    # striker or first non-striker.
+    is_batsman_1: np.ndarray = batsman_codes == batsman_codes[first_positions][group_ids]
+    is_batsman_2: np.ndarray = batsman_codes == non_striker_codes[first_positions][group_ids]
+    partnerships["batsman_1_runs"] = _sum_by_group(
+        group_ids, n_partnerships, np.where(is_batsman_1, deliveries.runs_by_batsman, 0)
+    )
+    partnerships["batsman_2_runs"] = _sum_by_group(
+        group_ids, n_partnerships, np.where(is_batsman_2, deliveries.runs_by_batsman, 0)
+    )
+    partnerships["runs"] = _sum_by_group(group_ids, n_partnerships, deliveries.total_runs)
+    partnerships["balls"] = _sum_by_group(group_ids, n_partnerships, deliveries.is_legal)
+    return pd.DataFrame(partnerships, columns=PARTNERSHIP_COLUMNS)
+
+
+def get_fall_of_wickets(
+        ball_by_ball_table: pd.DataFrame,
+        balls_per_over: int = DEFAULT_BALLS_PER_OVER
+) -> pd.DataFrame:
+    """
+    Fall of wickets of each innings in a ball-by-ball table. Batsmen
+    retiring are not wickets, see `RETIRED_DISMISSAL_TYPES`.
+
+    :param ball_by_ball_table: Ball-by-ball table of one or more matches,
+    with the deliveries of each innings consecutive and in order.
+    :param balls_per_over: Legal deliveries per over.
+    :return: Pandas dataframe with the columns in `FALL_OF_WICKETS_COLUMNS`
+    and one row per wicket, numbered from 1 within each innings. `score` is
+    the batting team's total, including extras, when the wicket fell, and
+    `overs` the overs bowled by then, e.g. "9.4".
+    """
+    deliveries = _Deliveries(ball_by_ball_table)
+    wickets: np.ndarray = np.flatnonzero(deliveries.is_wicket)
+
+    fall_of_wickets: Dict[str, object] = deliveries.take(INNINGS_COLUMNS, wickets)
+    fall_of_wickets["wicket"] = deliveries.cumsum_by_innings(deliveries.is_wicket)[wickets]
+    fall_of_wickets["score"] = deliveries.cumsum_by_innings(deliveries.total_runs)[wickets]
+    fall_of_wickets["overs"] = _format_overs(
+        deliveries.cumsum_by_innings(deliveries.is_legal)[wickets], balls_per_over
+    )
+    fall_of_wickets.update(deliveries.take(["dismissed_batsman", "dismissal_type"], wickets))
+    return pd.DataFrame(fall_of_wickets, columns=FALL_OF_WICKETS_COLUMNS)
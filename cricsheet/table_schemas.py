@@ -0,0 +1,258 @@
+import re
+from typing import Dict, List, Optional
+
+MATCH_INFO_TABLE_NAME: str = "match_info"
+BALL_BY_BALL_TABLE_NAME: str = "ball_by_ball"
+
+# Table with one row per match whose tables have been fully loaded.
+MATCH_REGISTRY_TABLE_NAME: str = "match_registry"
+
+# Table with one row per ingested match file, recording which version of
+# the file was loaded, see `DataIngestionManager.ingest_data`.
+MATCH_MANIFEST_TABLE_NAME: str = "match_manifest"
+
+# Table with the progress of each named backfill, see `BackfillManager`.
+INGEST_CHECKPOINT_TABLE_NAME: str = "ingest_checkpoint"
+
+# Player dimension, see `PlayerRegistry`.
+PLAYER_TABLE_NAME: str = "player"
+
+# Table with one row per person named in each match.
+PLAYER_MATCH_TABLE_NAME: str = "player_match"
+
+# Column the ball-by-ball table is partitioned by, if it is.
+SEASON_COLUMN: str = "season"
+
+# Postgres types holding integers. Columns of these types are loaded from
+# nullable integer columns, so that e.g. a float column with missing values
+# is not sent as "10.0".
+INTEGER_TYPES: List[str] = ["SMALLINT", "INTEGER", "BIGINT"]
+
+
+class TableSchema:
+    def __init__(
+            self,
+            name: str,
+            columns: Dict[str, str],
+            primary_key: List[str],
+            indexes: Optional[List[List[str]]] = None,
+            unique_indexes: Optional[List[List[str]]] = None,
+            partition_column: Optional[str] = None
+    ):
+        """
+        Declared schema of a database table.
+
+        :param name: Name of the table.
+        :param columns: Postgres type of each column, with any column
+        constraints, in order.
+        :param primary_key: Columns making up the primary key.
+        :param indexes: Columns of each secondary index.
+        :param unique_indexes: Columns of each unique index.
+        :param partition_column: Column to list-partition the table by. A
+        partition is created for each value when rows with it are first
+        loaded, see `get_create_partition_statement`, and rows are routed
+        to their partition by Postgres. It must be part of the primary key.
+        """
+        if partition_column is not None and partition_column not in primary_key:
+            raise ValueError(
+                f"Partition column '{partition_column}' must be part of the primary key {primary_key}."
+            )
+        self.name = name
+        self.columns = columns
+        self.primary_key = primary_key
+        self.indexes = indexes or []
+        self.unique_indexes = unique_indexes or []
+        self.partition_column = partition_column
+
+    @property
+    def integer_columns(self) -> List[str]:
+        return [column for column, column_type in self.columns.items()
+                if column_type.split()[0] in INTEGER_TYPES]
+
+    @property
+    def date_array_columns(self) -> List[str]:
+        return [column for column, column_type in self.columns.items()
+                if column_type.split()[0] == "DATE[]"]
+
+    def _get_create_index_statement(self, columns: List[str], unique: bool) -> str:
+        index_name: str = f"{self.name}_{'_'.join(columns)}_idx"
+        index_columns: str = ", ".join(f'"{column}"' for column in columns)
+        return (f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS "{index_name}" '
+                f'ON "{self.name}" ({index_columns})')
+
+    def get_create_statements(self) -> List[str]:
+        """
+        Statements creating the table and its indexes, each of which does
+        nothing if what it creates already exists.
+
+        :return: List of SQL statements, to be run in order.
+        """
+        column_definitions: List[str] = [
+            f'"{column}" {column_type}' for column, column_type in self.columns.items()
+        ]
+        primary_key_columns: str = ", ".join(f'"{column}"' for column in self.primary_key)
+        column_definitions.append(f"PRIMARY KEY ({primary_key_columns})")
+        create_table_statement: str = (
+            f'CREATE TABLE IF NOT EXISTS "{self.name}" ({", ".join(column_definitions)})'
+        )
+
+        statements: List[str] = []
+        if self.partition_column is None:
+            statements.append(create_table_statement)
+        else:
+            statements.append(f'{create_table_statement} PARTITION BY LIST ("{self.partition_column}")')
+            # Catches rows loaded without first creating their partition.
+            statements.append(
+                f'CREATE TABLE IF NOT EXISTS "{self.name}_default" PARTITION OF "{self.name}" DEFAULT'
+            )
+        # Indexes of a partitioned table are created on every partition.
+        statements.extend(self._get_create_index_statement(columns, unique=False)
+                          for columns in self.indexes)
+        statements.extend(self._get_create_index_statement(columns, unique=True)
+                          for columns in self.unique_indexes)
+        return statements
+
+    def get_partition_name(self, partition_value: str) -> str:
+        return f"{self.name}_{re.sub(r'[^0-9A-Za-z]+', '_', partition_value).strip('_').lower()}"
+
+    def get_create_partition_statement(self, partition_value: str) -> str:
+        """
+        Statement creating the partition holding the rows with a value of
+        the partition column, if it does not exist yet.
+
+        :param partition_value: Value of the partition column, e.g. "2009/10"
+        for the partition `ball_by_ball_2009_10`.
+        :return: SQL statement taking the value as the `partition_value`
+        parameter.
+        """
+        return (f'CREATE TABLE IF NOT EXISTS "{self.get_partition_name(partition_value)}" '
+                f'PARTITION OF "{self.name}" FOR VALUES IN (:partition_value)')
+
+
+def get_table_schemas(
+        player_keys: bool = False,
+        partition_by_season: bool = False
+) -> Dict[str, TableSchema]:
+    """
+    Declared schemas of the tables written by `DatabaseManager`.
+
+    :param player_keys: Whether players in the ball-by-ball table are
+    stored as player keys, see `PlayerRegistry.encode_ball_by_ball_table`,
+    rather than as names.
+    :param partition_by_season: Whether to partition the ball-by-ball table
+    by season. Its rows must then have a `season` column, which is part of
+    the primary key, and queries filtering on season only scan the
+    partitions of those seasons.
+    :return: Table schema of each table, by table name.
+    """
+    player_type: str = "INTEGER" if player_keys else "TEXT"
+    ball_by_ball_columns: Dict[str, str] = {
+        "match_id": "TEXT NOT NULL",
+        "innings": "SMALLINT NOT NULL",
+        "over": "SMALLINT NOT NULL",
+        "ball": "SMALLINT NOT NULL",
+        "batting_team": "TEXT",
+        "batsman": player_type,
+        "bowler": player_type,
+        "non_striker": player_type,
+        "runs_by_batsman": "SMALLINT",
+        "extras_type": "TEXT",
+        "runs_from_extras": "SMALLINT",
+        "dismissed_batsman": player_type,
+        "dismissal_type": "TEXT",
+        "fielders_in_dismissal": f"{player_type}[]"
+    }
+    ball_by_ball_primary_key: List[str] = ["match_id", "innings", "over", "ball"]
+    if partition_by_season:
+        ball_by_ball_columns[SEASON_COLUMN] = "TEXT NOT NULL"
+        ball_by_ball_primary_key.append(SEASON_COLUMN)
+
+    table_schemas: List[TableSchema] = [
+        TableSchema(
+            MATCH_INFO_TABLE_NAME,
+            {
+                "match_id": "TEXT NOT NULL",
+                "balls_per_over": "SMALLINT",
+                "dates": "DATE[]",
+                "venue": "TEXT",
+                "city": "TEXT",
+                "country": "TEXT",
+                "team_1": "TEXT",
+                "team_1_players": "TEXT[]",
+                "team_2": "TEXT",
+                "team_2_players": "TEXT[]",
+                "home_team": "TEXT",
+                "gender": "TEXT",
+                "season": "TEXT",
+                "team_type": "TEXT",
+                "toss_winner": "TEXT",
+                "toss_winner_decision": "TEXT",
+                "match_type": "TEXT",
+                "winner": "TEXT",
+                "won_by_runs": "SMALLINT",
+                "won_by_wickets": "SMALLINT",
+                "umpire_1": "TEXT",
+                "umpire_2": "TEXT",
+                "third_umpire": "TEXT",
+                "match_referee": "TEXT"
+            },
+            primary_key=["match_id"],
+            indexes=[["season"], ["team_1"], ["team_2"]]
+        ),
+        TableSchema(
+            BALL_BY_BALL_TABLE_NAME,
+            ball_by_ball_columns,
+            primary_key=ball_by_ball_primary_key,
+            indexes=[["batsman"], ["bowler"]],
+            partition_column=SEASON_COLUMN if partition_by_season else None
+        ),
+        TableSchema(
+            PLAYER_TABLE_NAME,
+            {
+                "player_key": "INTEGER NOT NULL",
+                "player_id": "TEXT NOT NULL",
+                "player_name": "TEXT"
+            },
+            primary_key=["player_key"],
+            unique_indexes=[["player_id"]]
+        ),
+        TableSchema(
+            PLAYER_MATCH_TABLE_NAME,
+            {
+                "match_id": "TEXT NOT NULL",
+                "player_key": "INTEGER NOT NULL"
+            },
+            primary_key=["match_id", "player_key"],
+            indexes=[["player_key"]]
+        ),
+        TableSchema(
+            MATCH_REGISTRY_TABLE_NAME,
+            {
+                "match_id": "TEXT NOT NULL",
+                "registered_at": "TIMESTAMPTZ NOT NULL DEFAULT now()"
+            },
+            primary_key=["match_id"]
+        ),
+        TableSchema(
+            MATCH_MANIFEST_TABLE_NAME,
+            {
+                "match_id": "TEXT NOT NULL",
+                "revision": "INTEGER",
+                "file_hash": "TEXT NOT NULL",
+                "ingested_at": "TIMESTAMPTZ NOT NULL DEFAULT now()"
+            },
+            primary_key=["match_id"]
+        ),
+        TableSchema(
+            INGEST_CHECKPOINT_TABLE_NAME,
+            {
+                "checkpoint_name": "TEXT NOT NULL",
+                "n_batches": "INTEGER NOT NULL",
+                "n_match_files": "INTEGER NOT NULL",
+                "last_match_id": "TEXT",
+                "updated_at": "TIMESTAMPTZ NOT NULL DEFAULT now()"
+            },
+            primary_key=["checkpoint_name"]
+        )
+    ]
+    return {table_schema.name: table_schema for table_schema in table_schemas}
@@ -1,6 +1,55 @@
 import json
+import os
+import uuid
+from typing import Iterator, Tuple
 
 import pytest
+from sqlalchemy import text
+
+from cricsheet import country_resolver
+from cricsheet.database_manager import DatabaseManager
+
+
+@pytest.fixture(autouse=True)
+def geocode_cache_fp(tmp_path, monkeypatch) -> str:
+    """
+    Path of the default geocoding cache, moved to a temporary directory so
+    that tests neither read nor write the user's cache.
+    """
+    cache_fp: str = str(tmp_path / "country_cache.json")
+    monkeypatch.setenv(country_resolver.CACHE_FP_ENV_VAR, cache_fp)
+    monkeypatch.setattr(country_resolver, "_default_country_resolver", None)
+    return cache_fp
+
+
+@pytest.fixture()
+def database_manager() -> Iterator[DatabaseManager]:
+    """
+    Database manager connected to a throwaway Postgres database. Tests using
+    it are skipped unless CRICSHEET_TEST_DB_HOST is set; the other connection
+    settings default to those of `simple_postgres_container.sh`.
+    """
+    if "CRICSHEET_TEST_DB_HOST" not in os.environ:
+        pytest.skip("CRICSHEET_TEST_DB_HOST is not set")
+
+    schema: str = f"test_{uuid.uuid4().hex}"
+    # Every connection works in the throwaway schema, which is dropped with
+    # everything in it once the test is done.
+    manager = DatabaseManager(
+        os.environ["CRICSHEET_TEST_DB_HOST"],
+        os.environ.get("CRICSHEET_TEST_DB_PORT", "5432"),
+        os.environ.get("CRICSHEET_TEST_DB_USERNAME", "root"),
+        os.environ.get("CRICSHEET_TEST_DB_PASSWORD", "root"),
+        os.environ.get("CRICSHEET_TEST_DB_NAME", "test"),
+        connect_args={"options": f"-csearch_path={schema}"}
+    )
+    with manager.db_engine.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    yield manager
+
+    with manager.db_engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+    manager.db_engine.dispose()
 
 
 @pytest.fixture()
@@ -188,3 +237,84 @@ def sample_test_data() -> str:
             ]
         }
     )
+
+
+@pytest.fixture()
+def sample_test_data_with_full_registry(sample_test_data: str) -> str:
+    """
+    `sample_test_data` with everyone named in the match in its registry, as
+    in Cricsheet's files, rather than only the players of each team.
+    """
+    match_data: dict = json.loads(sample_test_data)
+    people_registry: dict = match_data["info"]["registry"]["people"]
+    for innings in match_data["innings"]:
+        for over in innings["overs"]:
+            for delivery in over["deliveries"]:
+                for name in [delivery["batter"], delivery["bowler"], delivery["non_striker"]]:
+                    people_registry.setdefault(name, f"id_{name}")
+                for wicket in delivery.get("wickets", []):
+                    people_registry.setdefault(wicket["player_out"], f"id_{wicket['player_out']}")
+    return json.dumps(match_data)
+
+
+@pytest.fixture()
+def sample_test_csv_data() -> Tuple[str, str]:
+    """
+    The match in `sample_test_data` in Cricsheet's CSV format, as the
+    contents of the ball-by-ball file and of the info file.
+    """
+    ball_by_ball_csv: str = "\n".join([
+        "match_id,season,start_date,venue,innings,ball,batting_team,bowling_team,striker,non_striker,bowler,"
+        "runs_off_bat,extras,wides,noballs,byes,legbyes,penalty,wicket_type,player_dismissed,"
+        "other_wicket_type,other_player_dismissed",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,1,0.1,Netherlands,Kenya,AN Kervezee,ES Szwarczynski,"
+        "NN Odhiambo,0,0,,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,1,0.2,Netherlands,Kenya,AN Kervezee,ES Szwarczynski,"
+        "NN Odhiambo,1,1,1,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,2,0.1,Kenya,Netherlands,E Otieno,NN Odhiambo,"
+        "B Zuiderent,0,0,,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,2,0.2,Kenya,Netherlands,E Otieno,NN Odhiambo,"
+        "B Zuiderent,0,0,,,,,,caught,E Otieno,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,3,0.1,Netherlands,Kenya,AN Kervezee,ES Szwarczynski,"
+        "NN Odhiambo,6,0,,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,3,0.2,Netherlands,Kenya,AN Kervezee,ES Szwarczynski,"
+        "NN Odhiambo,0,0,,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,4,0.1,Kenya,Netherlands,E Otieno,NN Odhiambo,"
+        "B Zuiderent,1,0,,,,,,,,,",
+        "1,2009/10,2022-01-01,Gymkhana Club Ground,4,0.2,Kenya,Netherlands,NN Odhiambo,E Otieno,"
+        "B Zuiderent,0,0,,,,,,,,,",
+    ]) + "\n"
+    info_csv: str = "\n".join([
+        "version,2.1.0",
+        "info,balls_per_over,6",
+        "info,team,Netherlands",
+        "info,team,Kenya",
+        "info,gender,male",
+        "info,season,2009/10",
+        "info,date,2022/01/01",
+        "info,date,2022/01/02",
+        "info,date,2022/01/03",
+        "info,date,2022/01/04",
+        "info,date,2022/01/05",
+        "info,match_type,MDM",
+        "info,team_type,international",
+        "info,venue,Gymkhana Club Ground",
+        "info,city,Nairobi",
+        "info,toss_winner,Netherlands",
+        "info,toss_decision,bat",
+        "info,umpire,Zameer Haider",
+        "info,umpire,SR Modi",
+        "info,reserve_umpire,D Angara",
+        "info,match_referee,D Govindjee",
+        "info,winner,Kenya",
+        "info,winner_wickets,5",
+        "info,player,Netherlands,AN Kervezee",
+        "info,player,Netherlands,NA Statham",
+        "info,player,Kenya,RR Patel",
+        "info,player,Kenya,MA Ouma",
+        "info,registry,people,AN Kervezee,id1",
+        "info,registry,people,NA Statham,id2",
+        "info,registry,people,RR Patel,id3",
+        "info,registry,people,MA Ouma,id4",
+    ]) + "\n"
+    return ball_by_ball_csv, info_csv
@@ -0,0 +1,125 @@
+import tempfile
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import pytest
+
+import cricsheet.match_data_processor
+from cricsheet.backfill_manager import BackfillManager, BackfillReport
+from cricsheet.database_manager import DatabaseManager
+
+
+def write_match_files(match_dir: str, sample_test_data: str, match_ids: List[str]):
+    for match_id in match_ids:
+        (Path(match_dir) / f"{match_id}.json").write_text(sample_test_data)
+
+
+def get_loaded_match_ids(database_manager: DatabaseManager) -> List[str]:
+    return pd.read_sql(
+        'SELECT DISTINCT match_id FROM ball_by_ball ORDER BY match_id',
+        con=database_manager.db_engine
+    )["match_id"].tolist()
+
+
+def test_backfill_resumes_after_last_committed_batch(
+        database_manager: DatabaseManager,
+        sample_test_data: str,
+        monkeypatch
+):
+    processed_match_fps: List[str] = []
+    process_match_file = cricsheet.match_data_processor._process_match_file
+
+    def recording_process_match_file(match_fp: str, *args):
+        processed_match_fps.append(Path(match_fp).stem)
+        return process_match_file(match_fp, *args)
+
+    monkeypatch.setattr(cricsheet.match_data_processor, "_process_match_file", recording_process_match_file)
+
+    with tempfile.TemporaryDirectory() as match_dir:
+        write_match_files(match_dir, sample_test_data, ["1001", "1002", "1003", "1004", "1005"])
+        (Path(match_dir) / "1003.json").write_text("{}")
+        backfill_manager = BackfillManager(database_manager)
+
+        update_match_tables = database_manager.update_match_tables
+        n_updates: List[int] = []
+
+        def failing_update_match_tables(*args, **kwargs):
+            n_updates.append(1)
+            if len(n_updates) == 3:
+                raise ConnectionError("Connection to the database was lost")
+            update_match_tables(*args, **kwargs)
+
+        monkeypatch.setattr(database_manager, "update_match_tables", failing_update_match_tables)
+        with pytest.raises(ConnectionError):
+            backfill_manager.backfill(match_dir, batch_size=2, n_workers=1)
+        assert get_loaded_match_ids(database_manager) == ["1001", "1002", "1004"]
+        assert backfill_manager.checkpoint["n_match_files"] == 4
+
+        monkeypatch.setattr(database_manager, "update_match_tables", update_match_tables)
+        processed_match_fps.clear()
+        report: BackfillReport = backfill_manager.backfill(match_dir, batch_size=2, n_workers=1)
+
+    assert processed_match_fps == ["1003", "1005"]
+    assert report.loaded == ["1005"]
+    assert report.skipped == ["1001", "1002", "1004"]
+    assert [Path(match_fp).stem for match_fp in report.errors] == ["1003"]
+    assert get_loaded_match_ids(database_manager) == ["1001", "1002", "1004", "1005"]
+    checkpoint: dict = backfill_manager.checkpoint
+    assert (checkpoint["n_batches"], checkpoint["n_match_files"], checkpoint["last_match_id"]) == (3, 5, "1005")
+
+
+def test_backfill_retries_files_that_could_not_be_processed(
+        database_manager: DatabaseManager,
+        sample_test_data: str
+):
+    with tempfile.TemporaryDirectory() as match_dir:
+        write_match_files(match_dir, sample_test_data, ["1001", "1002", "1003"])
+        (Path(match_dir) / "1002.json").write_text("{}")
+        backfill_manager = BackfillManager(database_manager)
+        first_report: BackfillReport = backfill_manager.backfill(match_dir, n_workers=1)
+
+        write_match_files(match_dir, sample_test_data, ["1002"])
+        report: BackfillReport = backfill_manager.backfill(match_dir, n_workers=1)
+
+    assert first_report.loaded == ["1001", "1003"]
+    assert [Path(match_fp).stem for match_fp in first_report.errors] == ["1002"]
+    assert report.loaded == ["1002"]
+    assert report.skipped == ["1001", "1003"]
+    assert report.errors == {}
+    assert get_loaded_match_ids(database_manager) == ["1001", "1002", "1003"]
+
+
+def test_backfill_resumes_from_match_registry_when_files_change(
+        database_manager: DatabaseManager,
+        sample_test_data: str
+):
+    with tempfile.TemporaryDirectory() as match_dir:
+        write_match_files(match_dir, sample_test_data, ["1002", "1004"])
+        backfill_manager = BackfillManager(database_manager, checkpoint_name="test")
+        backfill_manager.backfill(match_dir, n_workers=1)
+
+        write_match_files(match_dir, sample_test_data, ["1001", "1003"])
+        report: BackfillReport = backfill_manager.backfill(match_dir, n_workers=1)
+
+    assert report.loaded == ["1001", "1003"]
+    assert report.skipped == ["1002", "1004"]
+    assert backfill_manager.checkpoint["n_match_files"] == 4
+
+
+def test_reset_starts_backfill_over(database_manager: DatabaseManager, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as match_dir:
+        write_match_files(match_dir, sample_test_data, ["1001", "1002"])
+        backfill_manager = BackfillManager(database_manager)
+        backfill_manager.backfill(match_dir, n_workers=1)
+
+        backfill_manager.reset()
+        assert backfill_manager.checkpoint is None
+        report: BackfillReport = backfill_manager.backfill(match_dir, n_workers=1)
+
+    assert report.loaded == ["1001", "1002"]
+    assert report.skipped == []
+    ball_counts: pd.DataFrame = pd.read_sql(
+        'SELECT COUNT(*) AS n_balls FROM ball_by_ball', con=database_manager.db_engine
+    )
+    assert ball_counts["n_balls"].tolist() == [16]
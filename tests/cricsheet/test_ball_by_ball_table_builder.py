@@ -0,0 +1,128 @@
+import json
+
+import pandas as pd
+
+from cricsheet.ball_by_ball_table_builder import (
+    BALL_BY_BALL_COLUMN_DTYPES,
+    COMPACT_BALL_BY_BALL_COLUMN_DTYPES,
+    BallByBallTableBuilder,
+    compact_ball_by_ball_table,
+    concat_ball_by_ball_tables
+)
+
+
+def test_empty_builder_returns_typed_empty_frame():
+    ball_by_ball_table: pd.DataFrame = BallByBallTableBuilder("sample_match_id").to_frame()
+
+    assert ball_by_ball_table.empty
+    assert list(ball_by_ball_table.columns) == list(BALL_BY_BALL_COLUMN_DTYPES)
+    assert ball_by_ball_table.dtypes.astype(str).to_dict() == BALL_BY_BALL_COLUMN_DTYPES
+
+
+def test_builder_adds_all_innings_with_explicit_dtypes(sample_test_data: str):
+    parsed_sample_test_data: dict = json.loads(sample_test_data)
+
+    table_builder = BallByBallTableBuilder("sample_match_id")
+    innings_idx: int
+    innings_raw_data: dict
+    for innings_idx, innings_raw_data in enumerate(parsed_sample_test_data["innings"]):
+        table_builder.add_innings(innings_raw_data["overs"], innings_raw_data["team"], innings_idx)
+    ball_by_ball_table: pd.DataFrame = table_builder.to_frame()
+
+    assert len(table_builder) == 8
+    assert ball_by_ball_table.dtypes.astype(str).to_dict() == BALL_BY_BALL_COLUMN_DTYPES
+    assert (ball_by_ball_table["match_id"] == "sample_match_id").all()
+    assert ball_by_ball_table["innings"].tolist() == [1, 1, 2, 2, 3, 3, 4, 4]
+    assert ball_by_ball_table["batting_team"].tolist() == ["Netherlands", "Netherlands", "Kenya", "Kenya"] * 2
+    assert ball_by_ball_table["fielders_in_dismissal"].iloc[3] == ["AN Kervezee"]
+
+
+def test_builder_numbers_deliveries_within_each_over():
+    overs: list = [
+        {
+            "over": over_idx,
+            "deliveries": [
+                {
+                    "batter": "A",
+                    "bowler": "B",
+                    "non_striker": "C",
+                    "runs": {"batter": 0, "extras": 0, "total": 0}
+                }
+            ] * n_deliveries
+        }
+        for over_idx, n_deliveries in [(0, 7), (1, 6)]
+    ]
+
+    table_builder = BallByBallTableBuilder("sample_match_id")
+    table_builder.add_innings(overs, "Kenya", 0)
+    ball_by_ball_table: pd.DataFrame = table_builder.to_frame()
+
+    assert ball_by_ball_table["over"].tolist() == [1] * 7 + [2] * 6
+    assert ball_by_ball_table["ball"].tolist() == list(range(1, 8)) + list(range(1, 7))
+
+
+def test_builder_handles_dismissals_without_fielders():
+    overs: list = [
+        {
+            "over": 0,
+            "deliveries": [
+                {
+                    "batter": "A",
+                    "bowler": "B",
+                    "non_striker": "C",
+                    "runs": {"batter": 0, "extras": 0, "total": 0},
+                    "wickets": [{"player_out": "A", "kind": "bowled"}]
+                }
+            ]
+        }
+    ]
+
+    table_builder = BallByBallTableBuilder("sample_match_id")
+    table_builder.add_innings(overs, "Kenya", 0)
+    ball_by_ball_table: pd.DataFrame = table_builder.to_frame()
+
+    assert ball_by_ball_table["dismissed_batsman"].iloc[0] == "A"
+    assert ball_by_ball_table["dismissal_type"].iloc[0] == "bowled"
+    assert ball_by_ball_table["fielders_in_dismissal"].iloc[0] is None
+
+
+def test_compact_table_keeps_values_with_smaller_dtypes(sample_test_data: str):
+    parsed_sample_test_data: dict = json.loads(sample_test_data)
+
+    table_builder = BallByBallTableBuilder("sample_match_id")
+    innings_idx: int
+    innings_raw_data: dict
+    for innings_idx, innings_raw_data in enumerate(parsed_sample_test_data["innings"]):
+        table_builder.add_innings(innings_raw_data["overs"], innings_raw_data["team"], innings_idx)
+    ball_by_ball_table: pd.DataFrame = table_builder.to_frame()
+    compact_table: pd.DataFrame = compact_ball_by_ball_table(ball_by_ball_table)
+
+    assert compact_table.dtypes.astype(str).to_dict() == COMPACT_BALL_BY_BALL_COLUMN_DTYPES
+    assert (compact_table.memory_usage(deep=True).sum()
+            < ball_by_ball_table.memory_usage(deep=True).sum())
+    restored_table: pd.DataFrame = compact_table.astype(BALL_BY_BALL_COLUMN_DTYPES)
+    restored_table = restored_table.where(restored_table.notna(), None)
+    assert restored_table.equals(ball_by_ball_table)
+
+
+def test_concat_keeps_categoricals_with_different_categories():
+    compact_tables: list = []
+    for match_id, batsman in [("1", "A"), ("2", "B")]:
+        table_builder = BallByBallTableBuilder(match_id)
+        table_builder.add_innings([{
+            "over": 0,
+            "deliveries": [{
+                "batter": batsman,
+                "bowler": "C",
+                "non_striker": "D",
+                "runs": {"batter": 4, "extras": 0, "total": 4}
+            }]
+        }], "Kenya", 0)
+        compact_tables.append(compact_ball_by_ball_table(table_builder.to_frame()))
+
+    ball_by_ball_table: pd.DataFrame = concat_ball_by_ball_tables(compact_tables)
+
+    assert ball_by_ball_table.dtypes.astype(str).to_dict() == COMPACT_BALL_BY_BALL_COLUMN_DTYPES
+    assert ball_by_ball_table["match_id"].tolist() == ["1", "2"]
+    assert ball_by_ball_table["batsman"].tolist() == ["A", "B"]
+    assert ball_by_ball_table.index.tolist() == [0, 1]
@@ -0,0 +1,190 @@
+import json
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import cricsheet.cli
+from cricsheet.cli import RunStats, format_run_stats, main
+from cricsheet.database_manager import DatabaseManager
+from cricsheet.parquet_manager import ParquetManager
+from cricsheet.table_schemas import get_table_schemas
+
+
+def write_sample_zip(zip_fp: str, sample_test_data: str, match_ids: List[str]):
+    with zipfile.ZipFile(zip_fp, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        for match_id in match_ids:
+            zip_file.writestr(f"{match_id}.json", sample_test_data)
+
+
+def write_sample_dir(match_dir: Path, sample_test_data: str, match_ids: List[str]):
+    match_dir.mkdir()
+    for match_id in match_ids:
+        with open(match_dir / f"{match_id}.json", "w") as f:
+            f.write(sample_test_data)
+
+
+def test_run_stats_are_formatted():
+    assert format_run_stats(RunStats(1204, 310_552, 10, {}, 12.5)) == (
+        "1,204 matches, 310,552 deliveries in 12.5 s (96.3 matches/s, 24,844 deliveries/s); 10 skipped, 0 errors"
+    )
+    assert format_run_stats(RunStats(3, None, 0, {"1004": "KeyError: 'info'"}, 2.0)) == (
+        "3 matches in 2.0 s (1.5 matches/s); 0 skipped, 1 errors"
+    )
+
+
+@pytest.mark.parametrize("stream", [pytest.param([], id="whole file"), pytest.param(["--stream"], id="streamed")])
+@pytest.mark.parametrize("source", ["matches.zip", "matches"])
+def test_ingest_dry_run_writes_nothing(sample_test_data: str, source: str, stream: List[str], capsys):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_sample_zip(str(Path(temp_dir) / "matches.zip"), sample_test_data, ["1001", "1002", "1003"])
+        write_sample_dir(Path(temp_dir) / "matches", sample_test_data, ["1001", "1002", "1003"])
+
+        exit_status: int = main([
+            "ingest", str(Path(temp_dir) / source), "--dry-run", "--offline", "--workers", "1", "--batch-size", "2",
+            *stream
+        ])
+
+        assert sorted(path.name for path in Path(temp_dir).iterdir()) == ["matches", "matches.zip"]
+    assert exit_status == 0
+    assert capsys.readouterr().out.startswith("3 matches, 24 deliveries in ")
+
+
+def test_ingest_writes_parquet_datasets(sample_test_data: str, capsys):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002", "1003"])
+        output_dir: str = str(Path(temp_dir) / "parquet")
+
+        ingest_args: List[str] = ["ingest", zip_fp, "--sink", "parquet", "--output-dir", output_dir, "--offline"]
+        main(ingest_args + ["--workers", "2"])
+        main(ingest_args + ["--workers", "1"])
+        # A revised match replaces the rows written for it.
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002"])
+        with zipfile.ZipFile(zip_fp, "a") as zip_file:
+            zip_file.writestr("1003.json", sample_test_data.replace('"revision": 1', '"revision": 2'))
+        main(ingest_args + ["--workers", "1"])
+
+        parquet_manager = ParquetManager(output_dir)
+        assert sorted(parquet_manager.read_table("match_info")["match_id"]) == ["1001", "1002", "1003"]
+        assert len(parquet_manager.read_table("ball_by_ball")) == 24
+    assert [line.split(" in ")[0] + line.split(";")[1] for line in capsys.readouterr().out.splitlines()] == [
+        "3 matches, 24 deliveries 0 skipped, 0 errors",
+        "0 matches, 0 deliveries 3 skipped, 0 errors",
+        "1 matches, 8 deliveries 2 skipped, 0 errors",
+    ]
+
+
+def test_exit_status_is_non_zero_when_a_match_fails(sample_test_data: str, capsys):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_sample_dir(Path(temp_dir) / "matches", sample_test_data, ["1001"])
+        (Path(temp_dir) / "matches" / "1002.json").write_text("{}")
+
+        exit_status: int = main(["ingest", str(Path(temp_dir) / "matches"), "--dry-run", "--offline", "--workers", "1"])
+
+    assert exit_status == 1
+    assert capsys.readouterr().err.startswith(str(Path(temp_dir) / "matches" / "1002.json"))
+
+
+def test_parquet_sink_needs_output_dir(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_sample_dir(Path(temp_dir) / "matches", sample_test_data, ["1001"])
+
+        with pytest.raises(SystemExit):
+            main(["ingest", str(Path(temp_dir) / "matches"), "--sink", "parquet"])
+        with pytest.raises(SystemExit):
+            main(["ingest", str(Path(temp_dir) / "missing.zip"), "--dry-run"])
+
+
+def test_bench_prints_a_line_per_configuration(sample_test_data: str, capsys):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_sample_dir(Path(temp_dir) / "matches", sample_test_data, ["1001", "1002", "1003"])
+
+        main(["bench", str(Path(temp_dir) / "matches"), "--offline", "--workers", "1", "--batch-size", "1", "2"])
+
+    lines: List[str] = capsys.readouterr().out.splitlines()
+    assert lines[0].split() == ["workers", "batch", "size", "matches", "deliveries", "seconds", "matches/s",
+                                "deliveries/s"]
+    assert [line.split()[:4] for line in lines[1:]] == [["1", "1", "3", "24"], ["1", "2", "3", "24"]]
+
+
+def test_ingest_backfill_and_export_with_postgres(
+        database_manager: DatabaseManager,
+        sample_test_data: str,
+        monkeypatch,
+        capsys
+):
+    monkeypatch.setattr(cricsheet.cli, "_get_database_manager", lambda args: database_manager)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_dir: str = str(Path(temp_dir) / "matches")
+        write_sample_dir(Path(match_dir), sample_test_data, ["1001", "1002"])
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1002", "1003"])
+        output_dir: str = str(Path(temp_dir) / "parquet")
+
+        main(["ingest", match_dir, "--offline", "--workers", "1"])
+        main(["ingest", match_dir, "--offline", "--workers", "1"])
+        main(["ingest", zip_fp, "--offline", "--workers", "1"])
+        main(["backfill", match_dir, "--offline", "--workers", "1"])
+        main(["export", "--output-dir", output_dir, "--batch-size", "2"])
+
+        assert len(ParquetManager(output_dir).read_table("ball_by_ball")) == 24
+    assert [line.split(" in ")[0] + line.split(";")[1] for line in capsys.readouterr().out.splitlines()] == [
+        "2 matches, 16 deliveries 0 skipped, 0 errors",
+        "0 matches, 0 deliveries 2 skipped, 0 errors",
+        # Matches loaded from a directory are not in the manifest of archives.
+        "2 matches 0 skipped, 0 errors",
+        "2 matches 0 skipped, 0 errors",
+        "3 matches, 24 deliveries 0 skipped, 0 errors",
+    ]
+
+
+def test_ingest_with_player_keys(
+        database_manager: DatabaseManager,
+        sample_test_data_with_full_registry: str,
+        monkeypatch
+):
+    database_manager.table_schemas.update(get_table_schemas(player_keys=True))
+    monkeypatch.setattr(cricsheet.cli, "_get_database_manager", lambda args: database_manager)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_dir: str = str(Path(temp_dir) / "matches")
+        write_sample_dir(Path(match_dir), sample_test_data_with_full_registry, ["1001", "1002"])
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data_with_full_registry, ["1003"])
+
+        main(["ingest", match_dir, "--offline", "--workers", "1", "--player-keys"])
+        main(["ingest", zip_fp, "--offline", "--workers", "1", "--player-keys"])
+
+    ball_by_ball_table = database_manager.read_table("ball_by_ball")
+    assert len(ball_by_ball_table) == 24
+    assert ball_by_ball_table["batsman"].map(type).eq(int).all()
+    people_registry: dict = json.loads(sample_test_data_with_full_registry)["info"]["registry"]["people"]
+    assert len(database_manager.load_player_registry()) == len(people_registry)
+    assert set(ball_by_ball_table["batsman"]) <= set(database_manager.load_player_registry().player_table["player_key"])
+
+
+def test_ingest_profiles_a_sample_of_matches(
+        database_manager: DatabaseManager,
+        sample_test_data: str,
+        monkeypatch,
+        capsys
+):
+    monkeypatch.setattr(cricsheet.cli, "_get_database_manager", lambda args: database_manager)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002", "1003"])
+        write_sample_dir(Path(temp_dir) / "matches", sample_test_data, ["1001"])
+        profile_dir: Path = Path(temp_dir) / "profiles"
+
+        # Profiling forces the serial path, whatever the number of workers.
+        main(["ingest", zip_fp, "--offline", "--workers", "2", "--profile-dir", str(profile_dir),
+              "--profile-every", "2"])
+
+        assert sorted(path.name for path in profile_dir.iterdir()) == ["1002.pstats", "1002.tracemalloc"]
+        with pytest.raises(SystemExit):
+            main(["ingest", str(Path(temp_dir) / "matches"), "--profile-dir", str(profile_dir)])
+        with pytest.raises(SystemExit):
+            main(["ingest", zip_fp, "--profile-every", "2"])
+    assert capsys.readouterr().out.startswith("3 matches in ")
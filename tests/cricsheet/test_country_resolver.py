@@ -0,0 +1,158 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from cricsheet.country_resolver import (
+    CountryLookupBackend,
+    CountryResolver,
+    GazetteerBackend,
+    NominatimBackend,
+    get_default_cache_fp,
+    get_default_country_resolver
+)
+
+
+class CountingBackend(CountryLookupBackend):
+    is_remote = True
+
+    def __init__(self, place_to_country: Dict[str, str]):
+        self.place_to_country = place_to_country
+        self.lookups: List[str] = []
+
+    def lookup(self, place: str) -> Optional[str]:
+        self.lookups.append(place)
+        return self.place_to_country.get(place)
+
+
+def test_gazetteer_backend_resolves_bundled_city():
+    assert GazetteerBackend().lookup("Nairobi") == "Kenya"
+    assert GazetteerBackend().lookup("Atlantis") is None
+
+
+def test_resolver_falls_back_to_later_backends_only_when_needed():
+    remote_backend = CountingBackend({"Atlantis": "Neverland"})
+    resolver = CountryResolver(backends=[GazetteerBackend(), remote_backend])
+
+    assert resolver.resolve("Nairobi") == "Kenya"
+    assert resolver.resolve("Atlantis") == "Neverland"
+    assert remote_backend.lookups == ["Atlantis"]
+
+
+def test_resolver_looks_up_each_place_once():
+    remote_backend = CountingBackend({"Atlantis": "Neverland"})
+    resolver = CountryResolver(backends=[remote_backend])
+
+    for _ in range(3):
+        resolver.resolve("Atlantis")
+        resolver.resolve("El Dorado")
+
+    assert remote_backend.lookups == ["Atlantis", "El Dorado"]
+
+
+def test_resolver_uses_venue_when_city_is_missing():
+    resolver = CountryResolver(backends=[GazetteerBackend()])
+
+    assert resolver.resolve(None, "Sharjah Cricket Stadium") == "United Arab Emirates"
+    assert resolver.resolve("Atlantis", "Gymkhana Club Ground") == "Kenya"
+
+
+def test_resolve_many_resolves_distinct_places():
+    remote_backend = CountingBackend({"Atlantis": "Neverland"})
+    resolver = CountryResolver(backends=[remote_backend])
+
+    resolved: dict = resolver.resolve_many(["Atlantis", "Atlantis", None, "El Dorado"])
+
+    assert resolved == {"Atlantis": "Neverland", "El Dorado": None}
+    assert sorted(remote_backend.lookups) == ["Atlantis", "El Dorado"]
+
+
+def test_resolver_persists_cache_across_instances():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_fp: str = str(Path(temp_dir) / "country_cache.json")
+
+        remote_backend = CountingBackend({"Atlantis": "Neverland"})
+        CountryResolver(backends=[remote_backend], cache_fp=cache_fp).resolve("Atlantis")
+
+        with open(cache_fp, "r") as f:
+            assert json.load(f) == {"Atlantis": "Neverland"}
+
+        another_remote_backend = CountingBackend({})
+        resolver = CountryResolver(backends=[another_remote_backend], cache_fp=cache_fp)
+
+        assert resolver.resolve("Atlantis") == "Neverland"
+        assert another_remote_backend.lookups == []
+
+
+def test_cache_is_replaced_rather_than_rewritten_in_place():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_fp: Path = Path(temp_dir) / "country_cache.json"
+        resolver = CountryResolver(
+            backends=[CountingBackend({"Atlantis": "Neverland", "El Dorado": "Neverland"})],
+            cache_fp=str(cache_fp)
+        )
+
+        resolver.resolve_many(["Atlantis"])
+        resolver.resolve_many(["El Dorado"])
+
+        assert json.loads(cache_fp.read_text()) == {"Atlantis": "Neverland", "El Dorado": "Neverland"}
+        assert [path.name for path in Path(temp_dir).iterdir()] == ["country_cache.json"]
+
+
+def test_offline_copy_keeps_the_cache_but_not_remote_backends():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_fp: str = str(Path(temp_dir) / "country_cache.json")
+        remote_backend = CountingBackend({"Atlantis": "Neverland", "El Dorado": "Neverland"})
+        resolver = CountryResolver(backends=[GazetteerBackend(), remote_backend], cache_fp=cache_fp)
+        resolver.resolve("Atlantis")
+
+        offline_copy: CountryResolver = resolver.get_offline_copy()
+
+        assert offline_copy.resolve("Atlantis") == "Neverland"
+        assert offline_copy.resolve("Nairobi") == "Kenya"
+        assert offline_copy.resolve("El Dorado") is None
+        assert remote_backend.lookups == ["Atlantis"]
+        assert offline_copy.cache_fp is None
+        assert "Nairobi" not in resolver.cache
+
+
+def test_remote_misses_are_retried_by_later_runs():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache_fp: Path = Path(temp_dir) / "country_cache.json"
+        # Misses written by earlier versions are dropped too.
+        cache_fp.write_text(json.dumps({"Lost City": None}))
+
+        first_run_backend = CountingBackend({"Atlantis": "Neverland"})
+        first_run_resolver = CountryResolver(backends=[first_run_backend], cache_fp=str(cache_fp))
+        first_run_resolver.resolve_many(["Atlantis", "El Dorado"])
+        first_run_resolver.resolve("El Dorado")
+
+        second_run_backend = CountingBackend({"El Dorado": "Neverland", "Lost City": "Neverland"})
+        second_run_resolver = CountryResolver(backends=[second_run_backend], cache_fp=str(cache_fp))
+
+        assert json.loads(cache_fp.read_text()) == {"Atlantis": "Neverland"}
+        assert len(first_run_backend.lookups) == 2
+        assert second_run_resolver.resolve_many(["Atlantis", "El Dorado", "Lost City"]) == {
+            "Atlantis": "Neverland", "El Dorado": "Neverland", "Lost City": "Neverland"
+        }
+        assert sorted(second_run_backend.lookups) == ["El Dorado", "Lost City"]
+
+
+def test_nominatim_errors_leave_the_place_unresolved():
+    GeocoderTimedOut = pytest.importorskip("geopy.exc").GeocoderTimedOut
+
+    class TimingOutGeolocator:
+        def geocode(self, place: str, **kwargs):
+            raise GeocoderTimedOut("Service timed out")
+
+    nominatim_backend = NominatimBackend()
+    nominatim_backend._geolocator = TimingOutGeolocator()
+
+    assert nominatim_backend.lookup("Atlantis") is None
+
+
+def test_default_resolver_persists_its_cache(geocode_cache_fp: str):
+    assert get_default_cache_fp() == geocode_cache_fp
+    assert get_default_country_resolver().cache_fp == geocode_cache_fp
@@ -0,0 +1,294 @@
+import asyncio
+import hashlib
+import http.server
+import json
+import pstats
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+from typing import Iterator, List
+
+import pandas as pd
+import pytest
+
+from cricsheet.data_ingestion_manager import DataIngestionManager, IngestReport
+from cricsheet.database_manager import DatabaseManager
+from cricsheet.match_data_processor import MatchDataProcessor
+from cricsheet.match_profiler import MatchProfiler
+
+
+def write_sample_zip(zip_fp: str, sample_test_data: str, match_ids: list):
+    with zipfile.ZipFile(zip_fp, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("README.txt", "Cricsheet match data")
+        for match_id in match_ids:
+            zip_file.writestr(f"{match_id}.json", sample_test_data)
+
+
+class ArchiveRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Stand-in for cricsheet.org serving one archive, with support for
+    `If-None-Match` and for resuming with `Range` and `If-Range`.
+    """
+    archive: bytes = b""
+    # Status of each response.
+    statuses: List[int] = []
+
+    def do_GET(self):
+        etag: str = f'"{hashlib.md5(self.archive).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._respond(304, b"", etag)
+        elif self.headers.get("Range") and self.headers.get("If-Range") == etag:
+            start: int = int(self.headers["Range"].removeprefix("bytes=").removesuffix("-"))
+            self._respond(206, self.archive[start:], etag)
+        else:
+            self._respond(200, self.archive, etag)
+
+    def _respond(self, status: int, body: bytes, etag: str):
+        self.statuses.append(status)
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def archive_server() -> Iterator[http.server.HTTPServer]:
+    ArchiveRequestHandler.statuses = []
+    server = http.server.HTTPServer(("127.0.0.1", 0), ArchiveRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+def test_match_ids_are_listed_from_zip(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002"])
+
+        data_ingestion_manager = DataIngestionManager(zip_fp=zip_fp)
+
+        assert data_ingestion_manager.match_ids() == ["1001", "1002"]
+
+
+def test_match_data_is_read_from_zip_members(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002", "1003"])
+
+        data_ingestion_manager = DataIngestionManager(zip_fp=zip_fp)
+        match_data_processors: list = list(data_ingestion_manager.iter_match_data_processors(["1003", "1001"]))
+
+        assert [p.match_parser.match_id for p in match_data_processors] == ["1003", "1001"]
+        ball_by_ball_table: pd.DataFrame = match_data_processors[0].get_ball_by_ball_table()
+        assert len(ball_by_ball_table) == 8
+        assert (ball_by_ball_table["match_id"] == "1003").all()
+        assert match_data_processors[1].get_match_info()["venue"] == "Gymkhana Club Ground"
+        assert list(Path(temp_dir).iterdir()) == [Path(zip_fp)]
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_match_batches_are_built_from_zip_members(sample_test_data: str, n_workers: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002", "1003"])
+        with zipfile.ZipFile(zip_fp, "a") as zip_file:
+            zip_file.writestr("1004.json", "{}")
+
+        match_batches: list = list(DataIngestionManager(zip_fp=zip_fp).iter_match_batches(
+            batch_size=2, n_workers=n_workers, chunk_size=1
+        ))
+
+    assert [batch.match_info["match_id"].tolist() for batch in match_batches] == [["1001", "1002"], ["1003"]]
+    assert [len(batch.ball_by_ball) for batch in match_batches] == [16, 8]
+    assert list(match_batches[1].errors) == ["1004"]
+
+
+def test_download_data_keeps_archive_in_memory(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: Path = Path(temp_dir) / "matches.zip"
+        write_sample_zip(str(zip_fp), sample_test_data, ["1001"])
+
+        data_ingestion_manager = DataIngestionManager(data_url=zip_fp.as_uri())
+
+        assert data_ingestion_manager.match_ids() == ["1001"]
+        assert isinstance(data_ingestion_manager.zip_source, bytes)
+
+
+def test_download_data_saves_archive_to_data_dir(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: Path = Path(temp_dir) / "matches.zip"
+        write_sample_zip(str(zip_fp), sample_test_data, ["1001"])
+        data_dir: Path = Path(temp_dir) / "downloads"
+
+        data_ingestion_manager = DataIngestionManager(data_dir=str(data_dir), data_url=zip_fp.as_uri())
+
+        assert data_ingestion_manager.download_data() == str(data_dir / "matches.zip")
+        assert data_ingestion_manager.match_ids() == ["1001"]
+
+
+def test_download_data_skips_unchanged_archive(archive_server: http.server.HTTPServer, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: Path = Path(temp_dir) / "matches.zip"
+        write_sample_zip(str(zip_fp), sample_test_data, ["1001"])
+        ArchiveRequestHandler.archive = zip_fp.read_bytes()
+        data_dir: Path = Path(temp_dir) / "downloads"
+        data_url: str = f"http://127.0.0.1:{archive_server.server_port}/matches.zip"
+
+        DataIngestionManager(data_dir=str(data_dir), data_url=data_url).download_data()
+        DataIngestionManager(data_dir=str(data_dir), data_url=data_url).download_data()
+        write_sample_zip(str(zip_fp), sample_test_data, ["1001", "1002"])
+        ArchiveRequestHandler.archive = zip_fp.read_bytes()
+        data_ingestion_manager = DataIngestionManager(data_dir=str(data_dir), data_url=data_url)
+        data_ingestion_manager.download_data()
+
+        assert ArchiveRequestHandler.statuses == [200, 304, 200]
+        assert data_ingestion_manager.match_ids() == ["1001", "1002"]
+        assert sorted(path.name for path in data_dir.iterdir()) == ["matches.zip", "matches.zip.validators.json"]
+
+
+def test_download_data_resumes_interrupted_download(archive_server: http.server.HTTPServer, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: Path = Path(temp_dir) / "matches.zip"
+        write_sample_zip(str(zip_fp), sample_test_data, ["1001", "1002"])
+        ArchiveRequestHandler.archive = zip_fp.read_bytes()
+        data_dir: Path = Path(temp_dir) / "downloads"
+        data_url: str = f"http://127.0.0.1:{archive_server.server_port}/matches.zip"
+        data_ingestion_manager = DataIngestionManager(data_dir=str(data_dir), data_url=data_url)
+        data_ingestion_manager.download_data()
+        # As if the connection had dropped half way through the download.
+        (data_dir / "matches.zip").unlink()
+        (data_dir / "matches.zip.part").write_bytes(ArchiveRequestHandler.archive[:100])
+
+        data_ingestion_manager.download_data()
+
+        assert ArchiveRequestHandler.statuses == [200, 206]
+        assert (data_dir / "matches.zip").read_bytes() == ArchiveRequestHandler.archive
+        assert not (data_dir / "matches.zip.part").exists()
+
+
+def test_csv_match_data_is_read_from_zip_members(sample_test_csv_data: tuple):
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        with zipfile.ZipFile(zip_fp, "w") as zip_file:
+            zip_file.writestr("README.txt", "Cricsheet match data")
+            for match_id in ["1001", "1002"]:
+                zip_file.writestr(f"{match_id}.csv", ball_by_ball_csv)
+                zip_file.writestr(f"{match_id}_info.csv", info_csv)
+
+        data_ingestion_manager = DataIngestionManager(zip_fp=zip_fp)
+        match_data_processors: list = list(data_ingestion_manager.iter_match_data_processors())
+
+        assert data_ingestion_manager.match_ids() == ["1001", "1002"]
+        assert [p.get_match_info()["match_id"] for p in match_data_processors] == ["1001", "1002"]
+        assert len(match_data_processors[1].get_ball_by_ball_table()) == 8
+
+
+def get_revised_match_data(sample_test_data: str) -> str:
+    match_data: dict = json.loads(sample_test_data)
+    match_data["meta"]["revision"] = 2
+    match_data["innings"] = match_data["innings"][:2]
+    return json.dumps(match_data)
+
+
+def test_file_hashes_change_with_file_contents(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002"])
+        file_hashes: dict = DataIngestionManager(zip_fp=zip_fp).file_hashes()
+
+        with zipfile.ZipFile(zip_fp, "w") as zip_file:
+            zip_file.writestr("1001.json", sample_test_data)
+            zip_file.writestr("1002.json", get_revised_match_data(sample_test_data))
+        new_file_hashes: dict = DataIngestionManager(zip_fp=zip_fp).file_hashes()
+
+        assert new_file_hashes["1001"] == file_hashes["1001"]
+        assert new_file_hashes["1002"] != file_hashes["1002"]
+
+
+def test_ingest_data_only_loads_new_and_changed_matches(database_manager: DatabaseManager, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002"])
+
+        first_report: IngestReport = DataIngestionManager(zip_fp=zip_fp).ingest_data(database_manager)
+        second_report: IngestReport = DataIngestionManager(zip_fp=zip_fp).ingest_data(database_manager)
+
+        with zipfile.ZipFile(zip_fp, "w") as zip_file:
+            zip_file.writestr("1001.json", sample_test_data)
+            zip_file.writestr("1002.json", get_revised_match_data(sample_test_data))
+            zip_file.writestr("1003.json", sample_test_data)
+            zip_file.writestr("1004.json", "{}")
+        third_report: IngestReport = DataIngestionManager(zip_fp=zip_fp).ingest_data(database_manager, batch_size=1)
+
+    assert first_report == IngestReport(new=["1001", "1002"], updated=[], skipped=[], errors={})
+    assert second_report == IngestReport(new=[], updated=[], skipped=["1001", "1002"], errors={})
+    assert third_report.new == ["1003"]
+    assert third_report.updated == ["1002"]
+    assert third_report.skipped == ["1001"]
+    assert list(third_report.errors) == ["1004"]
+
+    ball_counts: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, COUNT(*) AS n_balls FROM ball_by_ball GROUP BY match_id ORDER BY match_id',
+        con=database_manager.db_engine
+    )
+    assert ball_counts.to_dict("list") == {"match_id": ["1001", "1002", "1003"], "n_balls": [8, 4, 8]}
+    match_manifest: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, revision FROM match_manifest ORDER BY match_id',
+        con=database_manager.db_engine
+    )
+    assert match_manifest.to_dict("list") == {"match_id": ["1001", "1002", "1003"], "revision": [1, 2, 1]}
+    assert database_manager.get_existing_match_ids(refresh=True) == {"1001", "1002", "1003"}
+
+
+def test_ingest_data_profiles_sampled_matches(database_manager: DatabaseManager, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002", "1003", "1004"])
+        profiler = MatchProfiler(str(Path(temp_dir) / "profiles"), every_nth=2, trace_memory=False)
+
+        report: IngestReport = DataIngestionManager(zip_fp=zip_fp).ingest_data(
+            database_manager, batch_size=3, profiler=profiler
+        )
+
+        assert sorted(report.new) == ["1001", "1002", "1003", "1004"]
+        assert [match_profile.match_id for match_profile in profiler.profiles] == ["1002", "1004"]
+        # The profile of a match covers loading it as well as parsing it.
+        function_names: set = {
+            function_name for _, _, function_name in pstats.Stats(profiler.profiles[0].stats_fp).stats
+        }
+        assert {"get_match_info", "update_table"} <= function_names
+    assert database_manager.get_existing_match_ids(refresh=True) == {"1001", "1002", "1003", "1004"}
+
+
+def test_ingest_data_concurrently_matches_ingest_data(database_manager: DatabaseManager, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_fp: str = str(Path(temp_dir) / "matches.zip")
+        write_sample_zip(zip_fp, sample_test_data, ["1001", "1002"])
+        DataIngestionManager(zip_fp=zip_fp).ingest_data(database_manager)
+
+        with zipfile.ZipFile(zip_fp, "w") as zip_file:
+            for match_id in ["1001", "1003", "1004", "1005"]:
+                zip_file.writestr(f"{match_id}.json", sample_test_data)
+            zip_file.writestr("1002.json", get_revised_match_data(sample_test_data))
+            zip_file.writestr("1006.json", "{}")
+        report: IngestReport = asyncio.run(DataIngestionManager(zip_fp=zip_fp).ingest_data_concurrently(
+            database_manager, batch_size=2, n_workers=2, chunk_size=1, queue_size=1
+        ))
+
+    assert report.new == ["1003", "1004", "1005"]
+    assert report.updated == ["1002"]
+    assert report.skipped == ["1001"]
+    assert list(report.errors) == ["1006"]
+    ball_counts: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, COUNT(*) AS n_balls FROM ball_by_ball GROUP BY match_id ORDER BY match_id',
+        con=database_manager.db_engine
+    )
+    assert ball_counts["n_balls"].tolist() == [8, 4, 8, 8, 8]
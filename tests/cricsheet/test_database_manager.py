@@ -0,0 +1,316 @@
+import io
+import tempfile
+from pathlib import Path
+from typing import List
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from cricsheet.ball_by_ball_table_builder import BALL_BY_BALL_PRIMARY_KEY
+from cricsheet.database_manager import COPY_NULL, DatabaseManager, _insert_with_copy, _write_copy_csv
+from cricsheet.match_data_processor import MatchBatch, MatchDataProcessor
+from cricsheet.player_registry import PlayerRegistry
+from cricsheet.table_schemas import get_table_schemas
+
+
+class FakePandasTable:
+    schema = None
+    name = "ball_by_ball"
+
+
+class FakeCursor:
+    def __init__(self):
+        self.statements: List[str] = []
+        self.payloads: List[str] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def copy_expert(self, sql: str, file: io.StringIO):
+        self.statements.append(sql)
+        self.payloads.append(file.read())
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cursor_instance = FakeCursor()
+        self.connection = self
+
+    def cursor(self) -> FakeCursor:
+        return self.cursor_instance
+
+
+def test_write_copy_csv_distinguishes_nulls_from_empty_strings():
+    buffer = io.StringIO()
+    _write_copy_csv([("a", None, ""), ("b,c", 1, 'say "hi"')], buffer)
+
+    assert buffer.getvalue() == f'a,{COPY_NULL},\n"b,c",1,"say ""hi"""\n'
+
+
+def test_write_copy_csv_writes_lists_as_postgres_arrays():
+    buffer = io.StringIO()
+    _write_copy_csv([(["AN Kervezee", 'A "B" C'], None), ([], None)], buffer)
+
+    assert buffer.getvalue() == f'"{{""AN Kervezee"",""A \\""B\\"" C""}}",{COPY_NULL}\n{{}},{COPY_NULL}\n'
+
+
+def test_insert_with_copy_streams_rows_through_copy_expert():
+    conn = FakeConnection()
+    _insert_with_copy(FakePandasTable(), conn, ["match_id", "over"], iter([("m1", 1), ("m1", 2)]))
+
+    assert conn.cursor_instance.statements == [
+        f'COPY "ball_by_ball" ("match_id", "over") FROM STDIN WITH (FORMAT csv, NULL \'{COPY_NULL}\')'
+    ]
+    assert conn.cursor_instance.payloads == ["m1,1\nm1,2\n"]
+
+
+def test_update_table_rejects_unknown_method():
+    database_manager = object.__new__(DatabaseManager)
+
+    with pytest.raises(ValueError):
+        database_manager.update_table("ball_by_ball", pd.DataFrame({"over": [1]}), method="bulk")
+
+
+def test_update_table_rejects_unknown_mode():
+    database_manager = object.__new__(DatabaseManager)
+
+    with pytest.raises(ValueError):
+        database_manager.update_table("ball_by_ball", pd.DataFrame({"over": [1]}), mode="merge")
+
+
+def test_update_table_upsert_replaces_rows_of_reloaded_matches(database_manager: DatabaseManager):
+    first_load: pd.DataFrame = pd.DataFrame({
+        "match_id": ["m1", "m1", "m2"],
+        "innings": [1, 1, 1],
+        "over": [1, 1, 1],
+        "ball": [1, 2, 1],
+        "runs_by_batsman": [0, 4, 1]
+    })
+    # A revision of m1 that drops a delivery and corrects another, and a
+    # new match m3.
+    second_load: pd.DataFrame = pd.DataFrame({
+        "match_id": ["m1", "m3"],
+        "innings": [1, 1],
+        "over": [1, 1],
+        "ball": [1, 1],
+        "runs_by_batsman": [6, 2]
+    })
+
+    for table in [first_load, second_load, second_load]:
+        database_manager.update_table(
+            "ball_by_ball",
+            table,
+            mode="upsert",
+            primary_key=BALL_BY_BALL_PRIMARY_KEY
+        )
+
+    stored_table: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, runs_by_batsman FROM ball_by_ball ORDER BY match_id',
+        con=database_manager.db_engine
+    )
+    assert stored_table.to_dict("list") == {
+        "match_id": ["m1", "m2", "m3"],
+        "runs_by_batsman": [6, 1, 2]
+    }
+
+
+def test_create_table_adds_primary_key(database_manager: DatabaseManager):
+    table: pd.DataFrame = pd.DataFrame({"match_id": ["m1"], "innings": [1], "over": [1], "ball": [1]})
+    database_manager.create_table("ball_by_ball", table, primary_key=BALL_BY_BALL_PRIMARY_KEY)
+
+    primary_key: dict = sqlalchemy.inspect(database_manager.db_engine).get_pk_constraint("ball_by_ball")
+    assert primary_key["constrained_columns"] == BALL_BY_BALL_PRIMARY_KEY
+
+
+def test_get_existing_match_ids_reads_registry_once(database_manager: DatabaseManager):
+    assert database_manager.get_existing_match_ids() == set()
+
+    database_manager.register_match_ids(["m1", "m2"])
+    database_manager.register_match_ids(["m2", "m3"])
+
+    assert database_manager.get_existing_match_ids() == {"m1", "m2", "m3"}
+    assert database_manager.get_existing_match_ids(refresh=True) == {"m1", "m2", "m3"}
+    assert database_manager.get_existing_match_ids() is database_manager.get_existing_match_ids()
+
+
+def test_get_new_match_ids_preserves_order(database_manager: DatabaseManager):
+    database_manager.register_match_ids(["m2"])
+
+    assert database_manager.get_new_match_ids(["m3", "m2", "m1"]) == ["m3", "m1"]
+
+
+def test_match_manifest_replaces_entries_of_reloaded_matches(database_manager: DatabaseManager):
+    assert database_manager.get_match_manifest() == {}
+
+    database_manager.update_match_manifest(pd.DataFrame({
+        "match_id": ["m1", "m2"], "revision": [1, None], "file_hash": ["h1", "h2"]
+    }))
+    database_manager.update_match_manifest(pd.DataFrame({
+        "match_id": ["m2"], "revision": [2], "file_hash": ["h2b"]
+    }))
+
+    assert database_manager.get_match_manifest() == {"m1": "h1", "m2": "h2b"}
+    assert database_manager.get_match_manifest(refresh=True) == {"m1": "h1", "m2": "h2b"}
+    stored_table: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, revision FROM match_manifest ORDER BY match_id',
+        con=database_manager.db_engine
+    )
+    assert stored_table.to_dict("list") == {"match_id": ["m1", "m2"], "revision": [1, 2]}
+
+
+def test_player_dimension_keeps_keys_across_runs(database_manager: DatabaseManager):
+    first_run_registry: PlayerRegistry = database_manager.load_player_registry()
+    first_run_registry.intern(["id_a", "id_b"], ["A", "B"])
+    database_manager.update_player_id_table(first_run_registry)
+    database_manager.update_player_id_table(first_run_registry)
+
+    second_run_registry: PlayerRegistry = database_manager.load_player_registry()
+    assert second_run_registry.intern(["id_b", "id_c"]).tolist() == [2, 3]
+    database_manager.update_player_id_table(second_run_registry)
+
+    stored_table: pd.DataFrame = pd.read_sql(
+        'SELECT player_key, player_id FROM player ORDER BY player_key',
+        con=database_manager.db_engine
+    )
+    assert stored_table.to_dict("list") == {"player_key": [1, 2, 3], "player_id": ["id_a", "id_b", "id_c"]}
+
+
+def test_players_are_only_marked_persisted_once_the_transaction_commits(database_manager: DatabaseManager):
+    player_registry: PlayerRegistry = database_manager.load_player_registry()
+    player_registry.intern(["id_a", "id_b"], ["A", "B"])
+
+    with pytest.raises(RuntimeError):
+        with database_manager.transaction():
+            database_manager.update_player_id_table(player_registry)
+            assert len(player_registry.get_new_players()) == 2
+            raise RuntimeError("Batch failed")
+    assert len(player_registry.get_new_players()) == 2
+
+    with database_manager.transaction():
+        database_manager.update_player_id_table(player_registry)
+        player_registry.intern(["id_c"], ["C"])
+    assert player_registry.get_new_players()["player_id"].tolist() == ["id_c"]
+    assert len(database_manager.load_player_registry()) == 2
+
+
+def test_update_player_match_table_replaces_people_of_reloaded_matches(database_manager: DatabaseManager):
+    database_manager.update_player_match_table(pd.DataFrame({"match_id": ["m1", "m1"], "player_key": [1, 2]}))
+    database_manager.update_player_match_table(pd.DataFrame({"match_id": ["m1", "m1"], "player_key": [2, 3]}))
+
+    stored_table: pd.DataFrame = pd.read_sql(
+        'SELECT match_id, player_key FROM player_match ORDER BY player_key',
+        con=database_manager.db_engine
+    )
+    assert stored_table.to_dict("list") == {"match_id": ["m1", "m1"], "player_key": [2, 3]}
+
+
+def test_engine_uses_configured_pool():
+    database_manager = DatabaseManager("localhost", "5432", "root", "root", "test", pool_size=3, max_overflow=1)
+
+    assert database_manager.db_engine.pool.size() == 3
+    assert database_manager.db_engine.pool._max_overflow == 1
+    assert database_manager.db_engine.pool._pre_ping
+
+
+def test_table_names_are_read_once(database_manager: DatabaseManager, monkeypatch):
+    table: pd.DataFrame = pd.DataFrame({"match_id": ["m1"], "innings": [1], "over": [1], "ball": [1]})
+    database_manager.update_table("deliveries", table)
+
+    statements: List[str] = []
+    sqlalchemy.event.listen(
+        database_manager.db_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    for _ in range(3):
+        database_manager.update_table("deliveries", table, method="multi")
+
+    assert all(statement.startswith("INSERT") for statement in statements)
+    assert len(statements) == 3
+
+    database_manager.delete_table("deliveries")
+    assert not database_manager.table_exists("deliveries")
+
+
+def test_transaction_shares_one_connection_and_rolls_back(database_manager: DatabaseManager):
+    table: pd.DataFrame = pd.DataFrame({"match_id": ["m1"], "innings": [1], "over": [1], "ball": [1]})
+    with database_manager.transaction() as conn:
+        database_manager.update_table("ball_by_ball", table, mode="upsert", primary_key=BALL_BY_BALL_PRIMARY_KEY)
+        database_manager.update_table("ball_by_ball", table, mode="upsert")
+        database_manager.register_match_ids(["m1"])
+        assert database_manager.db_engine.pool.checkedout() == 1
+        assert conn.in_transaction()
+
+    with pytest.raises(RuntimeError):
+        with database_manager.transaction():
+            database_manager.update_table("match_info", pd.DataFrame({"match_id": ["m1"]}))
+            database_manager.register_match_ids(["m2"])
+            raise RuntimeError()
+
+    assert database_manager.table_exists("ball_by_ball")
+    assert not database_manager.table_exists("match_info")
+    assert database_manager.get_existing_match_ids() == {"m1"}
+    assert pd.read_sql("SELECT match_id FROM ball_by_ball", con=database_manager.db_engine)["match_id"].tolist() == ["m1"]
+
+
+def make_sample_match_batch(sample_test_data: str, seasons: List[str]) -> MatchBatch:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id, season in enumerate(seasons):
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                f.write(sample_test_data.replace('"2009/10"', f'"{season}"'))
+        return MatchDataProcessor.process_matches(temp_dir, n_workers=1)
+
+
+def test_update_match_tables_uses_declared_schemas(database_manager: DatabaseManager, sample_test_data: str):
+    match_batch: MatchBatch = make_sample_match_batch(sample_test_data, ["2009/10", "2010"])
+
+    database_manager.update_match_tables(match_batch)
+    database_manager.update_match_tables(match_batch)
+
+    with database_manager.db_engine.connect() as conn:
+        column_types: dict = dict(conn.execute(sqlalchemy.text(
+            "SELECT table_name || '.' || column_name, udt_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema()"
+        )).all())
+        index_names: set = set(conn.execute(sqlalchemy.text(
+            "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"
+        )).scalars())
+        n_deliveries: int = conn.execute(sqlalchemy.text("SELECT count(*) FROM ball_by_ball")).scalar()
+        dates: list = conn.execute(sqlalchemy.text("SELECT dates FROM match_info LIMIT 1")).scalar()
+    assert column_types["ball_by_ball.innings"] == "int2"
+    assert column_types["ball_by_ball.fielders_in_dismissal"] == "_text"
+    assert column_types["match_info.dates"] == "_date"
+    assert "ball_by_ball.index" not in column_types
+    assert {"ball_by_ball_batsman_idx", "ball_by_ball_bowler_idx", "match_info_season_idx"} <= index_names
+    assert n_deliveries == 16
+    assert str(dates[0]) == "2022-01-01"
+
+
+def test_update_match_tables_partitions_deliveries_by_season(database_manager: DatabaseManager, sample_test_data: str):
+    database_manager.table_schemas.update(get_table_schemas(partition_by_season=True))
+    match_batch: MatchBatch = make_sample_match_batch(sample_test_data, ["2009/10", "2010", "2010"])
+
+    database_manager.update_match_tables(match_batch)
+    database_manager.update_match_tables(match_batch)
+
+    with database_manager.db_engine.connect() as conn:
+        partition_sizes: dict = dict(conn.execute(sqlalchemy.text(
+            "SELECT tableoid::regclass::text, count(*) FROM ball_by_ball GROUP BY 1"
+        )).all())
+    assert partition_sizes == {"ball_by_ball_2009_10": 8, "ball_by_ball_2010": 16}
+
+
+def test_read_table_reads_rows_of_some_matches(database_manager: DatabaseManager, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in ["1001", "1002", "1003"]:
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                f.write(sample_test_data)
+        database_manager.update_match_tables(MatchDataProcessor.process_matches(temp_dir, n_workers=1))
+
+    assert sorted(database_manager.read_table("match_info")["match_id"]) == ["1001", "1002", "1003"]
+    ball_by_ball_table: pd.DataFrame = database_manager.read_table("ball_by_ball", ["1001", "1003"])
+    assert len(ball_by_ball_table) == 16
+    assert set(ball_by_ball_table["match_id"]) == {"1001", "1003"}
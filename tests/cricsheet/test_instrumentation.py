@@ -0,0 +1,132 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from cricsheet.country_resolver import CountryResolver, GazetteerBackend
+from cricsheet.instrumentation import Instrumentation, Metrics, instrumentation
+from cricsheet.match_data_processor import MatchDataProcessor
+
+
+@pytest.fixture()
+def enabled_instrumentation() -> Iterator[Instrumentation]:
+    """
+    The shared instrumentation, enabled and emptied for the test, and put
+    back as it was afterwards.
+    """
+    was_enabled: bool = instrumentation.enabled
+    instrumentation.enable()
+    instrumentation.reset()
+    yield instrumentation
+
+    instrumentation.enabled = was_enabled
+    instrumentation.reset()
+
+
+def test_disabled_instrumentation_records_nothing():
+    disabled_instrumentation = Instrumentation()
+
+    with disabled_instrumentation.timer("parse"):
+        pass
+    disabled_instrumentation.count("matches_parsed")
+    disabled_instrumentation.timed("decorated")(lambda: None)()
+
+    assert disabled_instrumentation.get_metrics() == Metrics({}, {})
+
+
+def test_timers_and_counters_are_recorded_by_name_and_labels():
+    test_instrumentation = Instrumentation(enabled=True)
+
+    for _ in range(3):
+        with test_instrumentation.timer("update_table", table="match_info"):
+            pass
+    test_instrumentation.timed("update_table", table="ball_by_ball")(lambda: None)()
+    test_instrumentation.count("rows_written", 10, table="ball_by_ball")
+    test_instrumentation.count("rows_written", 5, table="ball_by_ball")
+
+    metrics: Metrics = test_instrumentation.get_metrics()
+    assert metrics.timers[("update_table", (("table", "match_info"),))].count == 3
+    assert metrics.timers[("update_table", (("table", "ball_by_ball"),))].count == 1
+    assert metrics.counters == {("rows_written", (("table", "ball_by_ball"),)): 15}
+
+
+def test_collected_metrics_are_merged():
+    worker_instrumentation = Instrumentation(enabled=True)
+    worker_instrumentation.count("matches_parsed", 2)
+    with worker_instrumentation.timer("decode_json"):
+        pass
+    test_instrumentation = Instrumentation(enabled=True)
+    test_instrumentation.count("matches_parsed")
+
+    test_instrumentation.merge(worker_instrumentation.collect())
+    test_instrumentation.merge(worker_instrumentation.collect())
+
+    assert worker_instrumentation.get_metrics() == Metrics({}, {})
+    metrics: Metrics = test_instrumentation.get_metrics()
+    assert metrics.counters == {("matches_parsed", ()): 3}
+    assert metrics.timers[("decode_json", ())].count == 1
+
+
+def test_metrics_are_exported():
+    test_instrumentation = Instrumentation(enabled=True)
+    with test_instrumentation.timer("update_table", table="match_info"):
+        pass
+    test_instrumentation.count("rows_written", 4, table="match_info")
+
+    prometheus_lines: list = test_instrumentation.to_prometheus().splitlines()
+    assert "# TYPE cricsheet_update_table_seconds summary" in prometheus_lines
+    assert 'cricsheet_update_table_seconds_count{table="match_info"} 1' in prometheus_lines
+    assert "# TYPE cricsheet_rows_written_total counter" in prometheus_lines
+    assert 'cricsheet_rows_written_total{table="match_info"} 4' in prometheus_lines
+
+    exported: dict = json.loads(test_instrumentation.to_json())
+    assert exported["counters"] == [{"name": "rows_written", "labels": {"table": "match_info"}, "value": 4}]
+    assert exported["timers"][0]["count"] == 1
+
+    summary_lines: list = test_instrumentation.summary().splitlines()
+    assert summary_lines[1].startswith('update_table{table="match_info"}')
+    assert summary_lines[-1].startswith('rows_written{table="match_info"}')
+
+
+def test_match_processing_is_instrumented(enabled_instrumentation: Instrumentation, sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fp: str = str(Path(temp_dir) / "1.json")
+        with open(match_fp, "w") as f:
+            f.write(sample_test_data)
+
+        match_data_processor = MatchDataProcessor(match_fp, CountryResolver([GazetteerBackend()]))
+        match_data_processor.get_match_info()
+        match_data_processor.get_match_info()
+        match_data_processor.get_ball_by_ball_table()
+
+    metrics: Metrics = enabled_instrumentation.get_metrics()
+    assert metrics.counters[("bytes_read", ())] == len(sample_test_data.encode())
+    assert metrics.counters[("matches_parsed", ())] == 2
+    assert metrics.counters[("deliveries_parsed", ())] == 8
+    # The country is resolved once per match, and the city once per resolver.
+    assert metrics.counters[("geocode_cache_misses", ())] == 1
+    assert ("geocode_cache_hits", ()) not in metrics.counters
+    assert metrics.timers[("resolve_country", ())].count == 1
+    assert metrics.timers[("build_ball_by_ball_table", ())].count == 1
+    assert metrics.timers[("decode_json", ())].count == 1
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_metrics_of_worker_processes_are_merged(
+        enabled_instrumentation: Instrumentation,
+        sample_test_data: str,
+        n_workers: int
+):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in range(3):
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                f.write(sample_test_data)
+
+        MatchDataProcessor.process_matches(temp_dir, n_workers=n_workers, chunk_size=1)
+
+    metrics: Metrics = enabled_instrumentation.get_metrics()
+    assert metrics.counters[("matches_parsed", ())] == 3
+    assert metrics.counters[("deliveries_parsed", ())] == 24
+    assert metrics.timers[("decode_json", ())].count == 3
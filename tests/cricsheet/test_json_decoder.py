@@ -0,0 +1,47 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from cricsheet.json_decoder import (
+    JSON_DECODERS,
+    available_json_decoders,
+    get_json_decoder,
+    read_json_bytes
+)
+
+
+def test_stdlib_decoder_is_always_available():
+    assert available_json_decoders()[-1] == "json"
+    assert get_json_decoder("json") is JSON_DECODERS["json"]
+    assert get_json_decoder() is JSON_DECODERS[available_json_decoders()[0]]
+
+
+@pytest.mark.parametrize("json_decoder", available_json_decoders())
+def test_decoders_agree_with_stdlib(sample_test_data: str, json_decoder: str):
+    decode = get_json_decoder(json_decoder)
+    match_bytes: bytes = sample_test_data.encode()
+
+    assert decode(match_bytes) == json.loads(sample_test_data)
+    assert decode(memoryview(match_bytes)) == json.loads(sample_test_data)
+
+
+def test_unknown_decoder_raises_value_error():
+    with pytest.raises(ValueError):
+        get_json_decoder("yaml")
+
+
+def test_read_json_bytes_reads_every_kind_of_source(sample_test_data: str):
+    match_bytes: bytes = sample_test_data.encode()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fp: Path = Path(temp_dir) / "1001.json"
+        match_fp.write_bytes(match_bytes)
+
+        assert read_json_bytes(str(match_fp)) == match_bytes
+        assert read_json_bytes(match_fp) == match_bytes
+        with open(match_fp, "rb") as f:
+            assert read_json_bytes(f) == match_bytes
+    assert read_json_bytes(io.StringIO(sample_test_data)) == match_bytes
+    assert read_json_bytes(match_bytes) is match_bytes
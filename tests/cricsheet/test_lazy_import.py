@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+from cricsheet.lazy_import import lazy_import
+
+
+def test_module_is_imported_on_first_attribute_access():
+    lazy_module = lazy_import("colorsys")
+    sys.modules.pop("colorsys", None)
+
+    assert "colorsys" not in sys.modules
+    assert lazy_module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules
+    assert lazy_module.rgb_to_hsv is sys.modules["colorsys"].rgb_to_hsv
+
+
+def test_missing_module_is_none():
+    assert lazy_import("not_an_installed_package") is None
+    assert lazy_import("not_an_installed_package.submodule") is None
+
+
+def test_heavy_dependencies_are_not_imported_with_the_package():
+    # In a fresh interpreter, as this one has imported them for other tests.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "import cricsheet.cli, cricsheet.match_csv_parser\n"
+            "print(' '.join(m for m in ['pandas', 'numpy', 'pyarrow', 'sqlalchemy', 'geopy'] if m in sys.modules))"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_optional_decoders_are_only_imported_when_used():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "import cricsheet.cli\n"
+            "print(' '.join(m for m in ['ijson', 'orjson', 'simdjson', 'concurrent.futures'] if m in sys.modules))"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert result.stdout.strip() == ""
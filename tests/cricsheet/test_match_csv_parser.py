@@ -0,0 +1,89 @@
+import io
+import tempfile
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+import pytest
+
+from cricsheet.match_csv_parser import MatchCSVParser
+from cricsheet.match_json_parser import MatchJSONParser
+
+
+def write_sample_csv_files(temp_dir: str, sample_test_csv_data: Tuple[str, str]) -> str:
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    match_fp: Path = Path(temp_dir) / "1001.csv"
+    match_fp.write_text(ball_by_ball_csv)
+    (Path(temp_dir) / "1001_info.csv").write_text(info_csv)
+    return str(match_fp)
+
+
+@pytest.mark.parametrize(
+    "property_name",
+    [
+        "balls_per_over", "dates", "venue", "city", "country", "team_1", "team_2", "home_team",
+        "team_1_players", "team_2_players", "gender", "season", "match_type", "team_type",
+        "toss_winner", "toss_winner_decision", "winner", "won_by_runs", "won_by_wickets",
+        "umpire_1", "umpire_2", "third_umpire", "match_referee"
+    ]
+)
+def test_csv_parser_returns_same_match_info_as_json_parser(
+        sample_test_data: str,
+        sample_test_csv_data: Tuple[str, str],
+        property_name: str
+):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_parser = MatchCSVParser(write_sample_csv_files(temp_dir, sample_test_csv_data))
+        json_parser = MatchJSONParser(io.StringIO(sample_test_data))
+
+        assert getattr(csv_parser, property_name) == getattr(json_parser, property_name)
+
+
+def test_csv_parser_returns_correct_player_id_table(sample_test_csv_data: Tuple[str, str]):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_parser = MatchCSVParser(write_sample_csv_files(temp_dir, sample_test_csv_data))
+
+        assert csv_parser.match_id == "1001"
+        assert csv_parser.player_id_table["player"].tolist() == ["AN Kervezee", "NA Statham", "RR Patel", "MA Ouma"]
+        assert csv_parser.player_id_table["player_id"].tolist() == ["id1", "id2", "id3", "id4"]
+
+
+def test_csv_parser_returns_same_ball_by_ball_data_as_json_parser(
+        sample_test_data: str,
+        sample_test_csv_data: Tuple[str, str]
+):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        csv_parser = MatchCSVParser(write_sample_csv_files(temp_dir, sample_test_csv_data))
+        json_parser = MatchJSONParser(io.StringIO(sample_test_data))
+        json_parser.match_id = csv_parser.match_id
+
+        # The CSV format does not name fielders.
+        expected_output: pd.DataFrame = json_parser.ball_by_ball_data.assign(fielders_in_dismissal=None)
+
+        assert csv_parser.ball_by_ball_data.equals(expected_output)
+        assert len(csv_parser.innings) == 4
+        assert csv_parser.fourth_innings_data.equals(json_parser.fourth_innings_data)
+
+
+def test_csv_parser_reads_file_like_objects(sample_test_csv_data: Tuple[str, str]):
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    match_file = io.BytesIO(ball_by_ball_csv.encode())
+    match_file.name = "1001.csv"
+
+    csv_parser = MatchCSVParser(match_file, io.BytesIO(info_csv.encode()))
+
+    assert csv_parser.match_id == "1001"
+    assert csv_parser.venue == "Gymkhana Club Ground"
+    assert len(csv_parser.ball_by_ball_data) == 8
+
+
+def test_csv_parser_numbers_deliveries_beyond_nine_in_an_over(sample_test_csv_data: Tuple[str, str]):
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    header: str = ball_by_ball_csv.splitlines()[0]
+    delivery: str = ball_by_ball_csv.splitlines()[1]
+    ball_by_ball_csv = "\n".join([header] + [delivery.replace(",0.1,", f",4.{ball},") for ball in range(1, 11)])
+
+    csv_parser = MatchCSVParser(io.StringIO(ball_by_ball_csv), io.StringIO(info_csv))
+
+    assert csv_parser.ball_by_ball_data["over"].tolist() == [5] * 10
+    assert csv_parser.ball_by_ball_data["ball"].tolist() == list(range(1, 11))
@@ -1,10 +1,16 @@
+import json
 import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import pandas as pd
+import pytest
 
-from cricsheet.match_data_processor import MatchDataProcessor
+from cricsheet import match_data_processor
+from cricsheet.ball_by_ball_table_builder import COMPACT_BALL_BY_BALL_COLUMN_DTYPES
+from cricsheet.country_resolver import CountryLookupBackend, CountryResolver, GazetteerBackend
+from cricsheet.match_data_processor import MatchBatch, MatchDataProcessor, MatchFile
+from cricsheet.player_registry import PlayerRegistry
 
 
 def test_get_match_info(sample_test_data: str):
@@ -83,6 +89,7 @@ def test_get_ball_by_ball_data(sample_test_data):
             "match_id": [Path(temp_file).stem] * 8,
             "innings": [1, 1, 2, 2, 3, 3, 4, 4],
             "over": [1] * 8,
+            "ball": [1, 2] * 4,
             "batting_team": ["Netherlands", "Netherlands", "Kenya", "Kenya",
                              "Netherlands", "Netherlands", "Kenya", "Kenya"],
             "batsman": ["AN Kervezee", "AN Kervezee", "E Otieno", "E Otieno",
@@ -100,3 +107,217 @@ def test_get_ball_by_ball_data(sample_test_data):
         })
 
         assert ball_by_ball_table.equals(expected_output)
+
+
+def test_get_ball_by_ball_data_is_only_built_once(sample_test_data):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file: str = tempfile.mkstemp(suffix="_sample.json", dir=temp_dir)[1]
+        with open(temp_file, "w") as f:
+            f.write(sample_test_data)
+
+        match_data_manager = MatchDataProcessor(temp_file)
+
+        assert match_data_manager.get_ball_by_ball_table() is match_data_manager.get_ball_by_ball_table()
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_process_matches_combines_tables_in_file_order(sample_test_data: str, n_workers: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fps: list = []
+        for match_id in ["3", "1", "2"]:
+            match_fp: str = str(Path(temp_dir) / f"{match_id}.json")
+            with open(match_fp, "w") as f:
+                f.write(sample_test_data)
+            match_fps.append(match_fp)
+        broken_match_fp: str = str(Path(temp_dir) / "0.json")
+        with open(broken_match_fp, "w") as f:
+            f.write("{")
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(
+            match_fps + [broken_match_fp],
+            n_workers=n_workers,
+            chunk_size=1
+        )
+
+        assert match_batch.match_info["match_id"].tolist() == ["3", "1", "2"]
+        assert match_batch.ball_by_ball["match_id"].tolist() == ["3"] * 8 + ["1"] * 8 + ["2"] * 8
+        assert match_batch.ball_by_ball.index.tolist() == list(range(24))
+        assert list(match_batch.errors) == [broken_match_fp]
+        assert match_batch.errors[broken_match_fp].startswith("JSONDecodeError")
+
+        directory_match_batch: MatchBatch = MatchDataProcessor.process_matches(temp_dir, n_workers=n_workers)
+        assert directory_match_batch.match_info["match_id"].tolist() == ["1", "2", "3"]
+
+
+def test_iter_match_batches_yields_batches_of_requested_size(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in range(5):
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                f.write(sample_test_data)
+
+        match_batches: list = list(MatchDataProcessor.iter_match_batches(temp_dir, batch_size=2, n_workers=1))
+
+        assert [len(match_batch.match_info) for match_batch in match_batches] == [2, 2, 1]
+        assert [len(match_batch.ball_by_ball) for match_batch in match_batches] == [16, 16, 8]
+
+
+class AtlantisBackend(CountryLookupBackend):
+    is_remote = True
+
+    def __init__(self):
+        self.lookups: List[str] = []
+
+    def lookup(self, place: str) -> Optional[str]:
+        self.lookups.append(place)
+        return "Kenya" if place == "Atlantis" else None
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_remote_lookups_happen_in_the_calling_process(sample_test_data: str, n_workers: int):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in ["1", "2", "3"]:
+            (Path(temp_dir) / f"{match_id}.json").write_text(
+                sample_test_data.replace("Nairobi", "Atlantis").replace("Gymkhana Club Ground", "Atlantis Oval")
+            )
+        cache_fp: str = str(Path(temp_dir) / "cache" / "country_cache.json")
+        remote_backend = AtlantisBackend()
+        country_resolver = CountryResolver([GazetteerBackend(), remote_backend], cache_fp)
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(
+            temp_dir, n_workers=n_workers, chunk_size=1, country_resolver=country_resolver
+        )
+
+        assert match_batch.match_info["country"].tolist() == ["Kenya"] * 3
+        assert match_batch.match_info["home_team"].tolist() == ["Kenya"] * 3
+        # Workers only get offline copies, so the place was looked up here.
+        assert remote_backend.lookups == ["Atlantis"]
+        assert json.loads(Path(cache_fp).read_text()) == {"Atlantis": "Kenya"}
+
+
+def test_in_process_settings_do_not_leak_into_this_process(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / "1.json").write_text(sample_test_data)
+        country_resolver = CountryResolver([GazetteerBackend()])
+
+        MatchDataProcessor.process_matches(temp_dir, n_workers=1, country_resolver=country_resolver, stream=True)
+
+        results: list = match_data_processor.process_match_files([str(Path(temp_dir) / "1.json")])
+
+    assert match_data_processor._worker_country_resolver is None
+    assert not match_data_processor._worker_stream
+    assert not match_data_processor._worker_sends_metrics
+    assert not match_data_processor.get_match_batch(results).errors
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_match_files_are_processed_from_their_contents(sample_test_data: str, sample_test_csv_data: tuple,
+                                                       n_workers: int):
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    match_files: List[MatchFile] = [
+        MatchFile("1001.json", sample_test_data.encode()),
+        MatchFile("1002.csv", ball_by_ball_csv.encode(), info_csv.encode()),
+        MatchFile("1003.json", b"{}")
+    ]
+
+    match_batches: list = list(MatchDataProcessor.iter_match_batches(
+        iter(match_files), batch_size=2, n_workers=n_workers, chunk_size=1
+    ))
+
+    assert match_batches[0].match_info["match_id"].tolist() == ["1001", "1002"]
+    assert len(match_batches[1].match_info) == 0
+    assert match_batches[0].revisions == {"1001": 1, "1002": None}
+    assert list(match_batches[1].errors) == ["1003.json"]
+
+
+@pytest.mark.parametrize("n_workers", [pytest.param(1, id="in process"), pytest.param(2, id="process pool")])
+def test_streamed_batches_match_whole_file_batches(sample_test_data: str, n_workers: int):
+    pytest.importorskip("ijson")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in ["1", "2", "3"]:
+            (Path(temp_dir) / f"{match_id}.json").write_text(sample_test_data)
+        match_files: List[MatchFile] = [MatchFile("4.json", sample_test_data.encode())]
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(temp_dir, n_workers=n_workers)
+        streamed_match_batch: MatchBatch = MatchDataProcessor.process_matches(
+            temp_dir, n_workers=n_workers, stream=True
+        )
+        streamed_match_file_batch: MatchBatch = MatchDataProcessor.process_matches(
+            match_files, n_workers=n_workers, stream=True
+        )
+
+    pd.testing.assert_frame_equal(streamed_match_batch.match_info, match_batch.match_info)
+    pd.testing.assert_frame_equal(streamed_match_batch.ball_by_ball, match_batch.ball_by_ball)
+    assert streamed_match_batch.revisions == match_batch.revisions
+    assert len(streamed_match_file_batch.ball_by_ball) == 8
+
+
+def test_process_matches_reads_csv_matches(sample_test_csv_data: tuple):
+    ball_by_ball_csv, info_csv = sample_test_csv_data
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in ["1002", "1001"]:
+            (Path(temp_dir) / f"{match_id}.csv").write_text(ball_by_ball_csv)
+            (Path(temp_dir) / f"{match_id}_info.csv").write_text(info_csv)
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(temp_dir, n_workers=1)
+
+        assert not match_batch.errors
+        assert match_batch.match_info["match_id"].tolist() == ["1001", "1002"]
+        assert match_batch.match_info["country"].tolist() == ["Kenya", "Kenya"]
+        assert len(match_batch.ball_by_ball) == 16
+
+
+def test_process_matches_builds_compact_tables(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in range(3):
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                f.write(sample_test_data)
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(temp_dir, n_workers=1, compact=True)
+        batches: list = list(MatchDataProcessor.iter_match_batches(temp_dir, batch_size=2, n_workers=1, compact=True))
+
+        assert match_batch.ball_by_ball.dtypes.astype(str).to_dict() == COMPACT_BALL_BY_BALL_COLUMN_DTYPES
+        assert match_batch.ball_by_ball["match_id"].tolist() == ["0"] * 8 + ["1"] * 8 + ["2"] * 8
+        assert all(batch.ball_by_ball["batsman"].dtype == "category" for batch in batches)
+        assert (MatchDataProcessor(str(Path(temp_dir) / "0.json")).get_ball_by_ball_table(compact=True)
+                .dtypes.astype(str).to_dict() == COMPACT_BALL_BY_BALL_COLUMN_DTYPES)
+
+
+@pytest.mark.parametrize("stream", [pytest.param(False, id="whole file"), pytest.param(True, id="streamed")])
+def test_iter_ball_by_ball_tables_yields_one_table_per_innings(sample_test_data: str, stream: bool):
+    if stream:
+        pytest.importorskip("ijson")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fp: str = str(Path(temp_dir) / "1001.json")
+        with open(match_fp, "w") as f:
+            f.write(sample_test_data)
+
+        match_data_processor = MatchDataProcessor(match_fp, stream=stream)
+        innings_tables: list = list(match_data_processor.iter_ball_by_ball_tables(compact=True))
+
+        assert [table["innings"].tolist() for table in innings_tables] == [[1, 1], [2, 2], [3, 3], [4, 4]]
+        assert all(table["batsman"].dtype == "category" for table in innings_tables)
+        assert match_data_processor.get_match_info()["match_id"] == "1001"
+
+
+def test_process_matches_replaces_players_by_keys(sample_test_data: str, sample_test_data_with_full_registry: str):
+    match_data: dict = json.loads(sample_test_data_with_full_registry)
+    people_registry: dict = match_data["info"]["registry"]["people"]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_id in range(2):
+            with open(Path(temp_dir) / f"{match_id}.json", "w") as f:
+                json.dump(match_data, f)
+        player_registry = PlayerRegistry()
+
+        match_batch: MatchBatch = MatchDataProcessor.process_matches(
+            temp_dir, n_workers=1, compact=True, player_registry=player_registry
+        )
+
+        assert len(match_batch.people) == 2 * len(people_registry)
+        assert len(player_registry) == len(people_registry)
+        assert match_batch.ball_by_ball["batsman"].dtype == "int32"
+        assert match_batch.ball_by_ball["dismissed_batsman"].dtype == "Int32"
+        assert match_batch.ball_by_ball["batting_team"].dtype == "category"
+        assert match_batch.ball_by_ball["batsman"].iloc[0] == player_registry.get_player_key(
+            people_registry[json.loads(sample_test_data)["innings"][0]["overs"][0]["deliveries"][0]["batter"]]
+        )
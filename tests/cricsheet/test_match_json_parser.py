@@ -1,10 +1,14 @@
+import io
 import json
+import mmap
 import tempfile
 from typing import Optional
 
 import pandas as pd
 import pytest
 
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder
+from cricsheet.json_decoder import available_json_decoders
 from cricsheet.match_json_parser import MatchJSONParser
 
 
@@ -155,6 +159,13 @@ def test_json_parser_returns_correct_season(sample_test_data: str):
         assert json_parser.season == expected_test_season
 
 
+def test_json_parser_returns_correct_revision(sample_test_data: str):
+    json_parser = MatchJSONParser(sample_test_data.encode())
+
+    assert json_parser.revision == 1
+    assert MatchJSONParser(b'{"info": {}}').revision is None
+
+
 def test_json_parser_returns_correct_match_and_team_types(sample_test_data: str):
     with tempfile.TemporaryDirectory() as temp_dir:
         temp_file: str = tempfile.mkstemp(suffix="_sample.json", dir=temp_dir)[1]
@@ -244,6 +255,7 @@ def test_json_parser_returns_correct_team_players(sample_test_data: str):
             pd.DataFrame({
                 "innings": [1] * 2,
                 "over": [1] * 2,
+                "ball": [1, 2],
                 "batting_team": ["Netherlands"] * 2,
                 "batsman": ["AN Kervezee"] * 2,
                 "bowler": ["NN Odhiambo"] * 2,
@@ -262,6 +274,7 @@ def test_json_parser_returns_correct_team_players(sample_test_data: str):
             pd.DataFrame({
                 "innings": [2] * 2,
                 "over": [1] * 2,
+                "ball": [1, 2],
                 "batting_team": ["Kenya"] * 2,
                 "batsman": ["E Otieno"] * 2,
                 "bowler": ["B Zuiderent"] * 2,
@@ -280,6 +293,7 @@ def test_json_parser_returns_correct_team_players(sample_test_data: str):
             pd.DataFrame({
                 "innings": [3] * 2,
                 "over": [1] * 2,
+                "ball": [1, 2],
                 "batting_team": ["Netherlands"] * 2,
                 "batsman": ["AN Kervezee"] * 2,
                 "bowler": ["NN Odhiambo"] * 2,
@@ -298,6 +312,7 @@ def test_json_parser_returns_correct_team_players(sample_test_data: str):
             pd.DataFrame({
                 "innings": [4] * 2,
                 "over": [1] * 2,
+                "ball": [1, 2],
                 "batting_team": ["Kenya"] * 2,
                 "batsman": ["E Otieno", "NN Odhiambo"],
                 "bowler": ["B Zuiderent"] * 2,
@@ -350,6 +365,7 @@ def test__get_parsed_innings_data_returns_correct_dataframe(sample_test_data: st
     assert len(innings_data) == 2
     assert all(innings_data["innings"] == 1)
     assert all(innings_data["over"] == 1)
+    assert innings_data["ball"].tolist() == [1, 2]
     assert all(innings_data["batting_team"] == "Netherlands")
     assert all(innings_data["batsman"] == "AN Kervezee")
     assert all(innings_data["bowler"] == "NN Odhiambo")
@@ -412,18 +428,118 @@ def test__get_parsed_innings_data_returns_correct_dataframe(sample_test_data: st
             id="wickets")
     ]
 )
-def test__get_parsed_delivery_data(
+def test_ball_by_ball_table_builder_parses_deliveries(
         sample_test_data: str,
         innings_idx: int,
         delivery_idx: int,
         expected_output: dict
 ):
     parsed_sample_test_data: dict = json.loads(sample_test_data)
+    innings: dict = parsed_sample_test_data["innings"][innings_idx]
 
-    json_parser = object.__new__(MatchJSONParser)
-    json_parser.match_id = "sample_match_id"
+    table_builder = BallByBallTableBuilder("sample_match_id")
+    table_builder.add_innings(innings["overs"], innings["team"], innings_idx)
+    delivery: dict = table_builder.to_frame().iloc[delivery_idx].to_dict()
+
+    assert {column: delivery[column] for column in expected_output} == expected_output
+
+
+def test__get_parsed_match_data_returns_all_innings(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file: str = tempfile.mkstemp(suffix="_sample.json", dir=temp_dir)[1]
+        with open(temp_file, "w") as f:
+            f.write(sample_test_data)
+
+        json_parser = MatchJSONParser(temp_file)
+        match_data: pd.DataFrame = json_parser._get_parsed_match_data()
+
+        expected_output: pd.DataFrame = pd.concat([
+            json_parser.first_innings_data,
+            json_parser.second_innings_data,
+            json_parser.third_innings_data,
+            json_parser.fourth_innings_data
+        ]).reset_index(drop=True)
+
+        assert match_data.equals(expected_output)
+
+
+def test_json_parser_parses_innings_once(sample_test_data: str, monkeypatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file: str = tempfile.mkstemp(suffix="_sample.json", dir=temp_dir)[1]
+        with open(temp_file, "w") as f:
+            f.write(sample_test_data)
+
+        json_parser = MatchJSONParser(temp_file)
+
+        n_parses: list = []
+        original_get_parsed_match_data = json_parser._get_parsed_match_data
+
+        def counting_get_parsed_match_data() -> pd.DataFrame:
+            n_parses.append(1)
+            return original_get_parsed_match_data()
+
+        monkeypatch.setattr(json_parser, "_get_parsed_match_data", counting_get_parsed_match_data)
+
+        for _ in range(2):
+            json_parser.innings
+            json_parser.first_innings_data
+            json_parser.fourth_innings_data
+            json_parser.ball_by_ball_data
+
+        assert len(n_parses) == 1
+        assert len(json_parser.innings) == 4
+        assert json_parser.innings is json_parser.innings
+
+
+@pytest.mark.parametrize(
+    "n_innings",
+    [
+        pytest.param(0, id="abandoned"),
+        pytest.param(2, id="limited overs"),
+        pytest.param(6, id="super overs")
+    ]
+)
+def test_json_parser_returns_variable_number_of_innings(sample_test_data: str, n_innings: int):
+    parsed_sample_test_data: dict = json.loads(sample_test_data)
+    innings: list = parsed_sample_test_data["innings"] * 2
+    parsed_sample_test_data["innings"] = innings[:n_innings]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_file: str = tempfile.mkstemp(suffix="_sample.json", dir=temp_dir)[1]
+        with open(temp_file, "w") as f:
+            json.dump(parsed_sample_test_data, f)
+
+        json_parser = MatchJSONParser(temp_file)
+
+        assert len(json_parser.innings) == n_innings
+        assert [innings_data["innings"].unique().tolist() for innings_data in json_parser.innings] == \
+               [[innings_idx + 1] for innings_idx in range(n_innings)]
+        assert len(json_parser.ball_by_ball_data) == 2 * n_innings
+        if n_innings < 4:
+            assert json_parser.fourth_innings_data.empty
+            assert json_parser.fourth_innings_data.dtypes.equals(json_parser.ball_by_ball_data.dtypes)
+
+
+def test_json_parser_reads_file_like_objects(sample_test_data: str):
+    match_file = io.BytesIO(sample_test_data.encode())
+    match_file.name = "1001.json"
+
+    json_parser = MatchJSONParser(match_file)
+
+    assert json_parser.match_id == "1001"
+    assert json_parser.venue == "Gymkhana Club Ground"
+
+
+@pytest.mark.parametrize("json_decoder", available_json_decoders())
+def test_json_parser_decodes_in_memory_documents(sample_test_data: str, json_decoder: str):
+    with tempfile.TemporaryFile() as f:
+        f.write(sample_test_data.encode())
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as match_buffer:
+            mmap_json_parser = MatchJSONParser(match_buffer, json_decoder=json_decoder)
+            assert mmap_json_parser.match_id is None
+            assert mmap_json_parser.venue == "Gymkhana Club Ground"
+
+    json_parser = MatchJSONParser(sample_test_data.encode(), json_decoder=json_decoder)
 
-    # Currently, the sample test data only has one over per innings.
-    delivery_data: dict = parsed_sample_test_data["innings"][innings_idx]["overs"][0]["deliveries"][delivery_idx]
-    parsed_delivery_data: dict = json_parser._get_parsed_delivery_data(delivery_data)
-    assert parsed_delivery_data == expected_output
+    assert json_parser.data == json.loads(sample_test_data)
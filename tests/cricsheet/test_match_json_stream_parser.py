@@ -0,0 +1,74 @@
+import io
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cricsheet.match_json_parser import MatchJSONParser
+
+pytest.importorskip("ijson")
+
+from cricsheet.match_json_stream_parser import MatchJSONStreamParser  # noqa: E402
+
+
+def test_stream_parser_matches_json_parser(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        match_fp: str = str(Path(temp_dir) / "1001.json")
+        with open(match_fp, "w") as f:
+            f.write(sample_test_data)
+
+        json_parser = MatchJSONParser(match_fp)
+        stream_parser = MatchJSONStreamParser(match_fp)
+
+        assert stream_parser.match_id == "1001"
+        assert stream_parser.venue == json_parser.venue
+        assert stream_parser.team_1_players == json_parser.team_1_players
+        assert stream_parser.n_innings == 4
+        assert stream_parser.ball_by_ball_data.equals(json_parser.ball_by_ball_data)
+        assert stream_parser.fourth_innings_data.equals(json_parser.fourth_innings_data)
+
+
+def test_stream_parser_yields_each_innings_on_every_pass(sample_test_data: str):
+    match_file = io.BytesIO(sample_test_data.encode())
+    match_file.name = "1001.json"
+    json_parser = MatchJSONParser(io.StringIO(sample_test_data))
+    json_parser.match_id = "1001"
+
+    stream_parser = MatchJSONStreamParser(match_file)
+
+    for _ in range(2):
+        innings_tables: list = list(stream_parser.iter_innings_data())
+        assert len(innings_tables) == 4
+        for innings_table, expected_innings_table in zip(innings_tables, json_parser.innings):
+            assert innings_table.equals(expected_innings_table)
+
+
+def test_stream_parser_reads_in_memory_documents(sample_test_data: str):
+    stream_parser = MatchJSONStreamParser(sample_test_data.encode())
+
+    assert stream_parser.match_id is None
+    assert stream_parser.toss_winner == "Netherlands"
+    assert len(stream_parser.ball_by_ball_data) == 8
+
+
+def test_stream_parser_reads_revision_from_metadata(sample_test_data: str):
+    match_file = io.BytesIO(sample_test_data.encode())
+    stream_parser = MatchJSONStreamParser(match_file)
+
+    assert stream_parser.revision == 1
+    assert len(stream_parser.ball_by_ball_data) == 8
+
+
+def test_stream_parser_requires_match_info():
+    with pytest.raises(ValueError):
+        MatchJSONStreamParser(b'{"innings": []}')
+
+
+def test_stream_parser_handles_matches_without_innings(sample_test_data: str):
+    stream_parser = MatchJSONStreamParser(sample_test_data.split('"innings"')[0].rstrip().rstrip(",").encode() + b"}")
+
+    assert stream_parser.n_innings == 0
+    assert list(stream_parser.iter_innings_data()) == []
+    assert isinstance(stream_parser.first_innings_data, pd.DataFrame)
+    assert stream_parser.first_innings_data.empty
@@ -0,0 +1,57 @@
+import pstats
+import tempfile
+import tracemalloc
+
+import pytest
+
+from cricsheet.match_json_parser import MatchJSONParser
+from cricsheet.match_profiler import MatchProfile, MatchProfiler
+
+
+def test_matches_are_sampled_by_position_and_size():
+    every_third_profiler = MatchProfiler("profiles", every_nth=3)
+    large_match_profiler = MatchProfiler("profiles", min_bytes=100)
+    combined_profiler = MatchProfiler("profiles", every_nth=3, min_bytes=100)
+    all_match_profiler = MatchProfiler("profiles")
+    match_sizes: list = [10, 200, 10, 10, 10, 300]
+
+    assert [every_third_profiler.should_profile(n_bytes) for n_bytes in match_sizes] == [
+        False, False, True, False, False, True
+    ]
+    assert [large_match_profiler.should_profile(n_bytes) for n_bytes in match_sizes] == [
+        False, True, False, False, False, True
+    ]
+    assert [combined_profiler.should_profile(n_bytes) for n_bytes in match_sizes] == [
+        False, True, True, False, False, True
+    ]
+    assert all(all_match_profiler.should_profile(n_bytes) for n_bytes in match_sizes)
+    with pytest.raises(ValueError):
+        MatchProfiler("profiles", every_nth=0)
+
+
+@pytest.mark.parametrize("trace_memory", [True, False])
+def test_profile_writes_stats_and_memory_snapshot(sample_test_data: str, trace_memory: bool):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        profiler = MatchProfiler(temp_dir, trace_memory=trace_memory)
+
+        with profiler.profile("1001", n_bytes=len(sample_test_data)):
+            json_parser = MatchJSONParser(sample_test_data.encode())
+            json_parser.match_id = "1001"
+            _ = json_parser.ball_by_ball_data
+
+        [match_profile] = profiler.profiles
+        assert isinstance(match_profile, MatchProfile)
+        assert match_profile.match_id == "1001"
+        assert match_profile.n_bytes == len(sample_test_data)
+        assert match_profile.stats_fp.endswith("1001.pstats")
+        stats = pstats.Stats(match_profile.stats_fp)
+        assert any(function_name == "_get_parsed_match_data" for _, _, function_name in stats.stats)
+
+        if trace_memory:
+            assert match_profile.peak_memory_bytes > 0
+            snapshot: tracemalloc.Snapshot = tracemalloc.Snapshot.load(match_profile.snapshot_fp)
+            assert snapshot.traceback_limit == profiler.n_frames
+        else:
+            assert match_profile.peak_memory_bytes is None
+            assert match_profile.snapshot_fp is None
+        assert not tracemalloc.is_tracing()
@@ -0,0 +1,94 @@
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from cricsheet.match_data_processor import MatchBatch, MatchDataProcessor
+
+pytest.importorskip("pyarrow")
+
+from cricsheet.parquet_manager import (  # noqa: E402
+    BALL_BY_BALL_TABLE_NAME,
+    MATCH_INFO_TABLE_NAME,
+    ParquetManager
+)
+
+
+def make_match_batch(sample_test_data: str, temp_dir: str, match_ids: list, season: str) -> MatchBatch:
+    match_fps: list = []
+    for match_id in match_ids:
+        match_fp: Path = Path(temp_dir) / f"{match_id}.json"
+        match_fp.write_text(sample_test_data.replace('"2009/10"', f'"{season}"'))
+        match_fps.append(str(match_fp))
+    return MatchDataProcessor.process_matches(match_fps, n_workers=1, compact=True)
+
+
+def test_update_tables_appends_partitioned_datasets(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as match_dir, tempfile.TemporaryDirectory() as data_dir:
+        parquet_manager = ParquetManager(data_dir)
+
+        parquet_manager.update_tables(make_match_batch(sample_test_data, match_dir, ["1", "2"], "2009/10"))
+        parquet_manager.update_tables(make_match_batch(sample_test_data, match_dir, ["3"], "2023"))
+
+        assert parquet_manager.table_exists(BALL_BY_BALL_TABLE_NAME)
+        assert sorted(path.name for path in Path(data_dir, BALL_BY_BALL_TABLE_NAME).iterdir()) == [
+            "season=2009%2F10", "season=2023"
+        ]
+        assert (Path(data_dir) / MATCH_INFO_TABLE_NAME / "season=2023" / "match_type=MDM" / "gender=male").is_dir()
+
+        ball_by_ball_table: pd.DataFrame = parquet_manager.read_table(BALL_BY_BALL_TABLE_NAME)
+        assert sorted(ball_by_ball_table["match_id"].unique()) == ["1", "2", "3"]
+        assert len(ball_by_ball_table) == 24
+        assert ball_by_ball_table["fielders_in_dismissal"].dropna().map(list).tolist() == [["AN Kervezee"]] * 3
+
+        season_table: pd.DataFrame = parquet_manager.read_table(
+            BALL_BY_BALL_TABLE_NAME, columns=["match_id", "runs_by_batsman"], season="2023", gender="male"
+        )
+        assert season_table["match_id"].unique().tolist() == ["3"]
+        assert list(season_table.columns) == ["match_id", "runs_by_batsman"]
+
+        match_info: pd.DataFrame = parquet_manager.read_table(MATCH_INFO_TABLE_NAME, season="2009/10")
+        assert sorted(match_info["match_id"]) == ["1", "2"]
+        assert match_info["dates"].map(list).iloc[0] == [
+            "2022-01-01", "2022-01-02", "2022-01-03", "2022-01-04", "2022-01-05"
+        ]
+
+
+def test_deleted_matches_are_removed_from_every_dataset(sample_test_data: str):
+    with tempfile.TemporaryDirectory() as match_dir, tempfile.TemporaryDirectory() as data_dir:
+        parquet_manager = ParquetManager(data_dir)
+        parquet_manager.update_tables(make_match_batch(sample_test_data, match_dir, ["1", "2"], "2009/10"))
+        parquet_manager.update_tables(make_match_batch(sample_test_data, match_dir, ["3"], "2023"))
+        parquet_manager.update_match_manifest({"1": "a", "2": "b"})
+        parquet_manager.update_match_manifest({"2": "c", "3": None})
+
+        parquet_manager.delete_matches(["2", "3"])
+
+        assert parquet_manager.get_match_manifest() == {"1": "a", "2": "c", "3": None}
+        assert parquet_manager.read_table(MATCH_INFO_TABLE_NAME)["match_id"].tolist() == ["1"]
+        assert parquet_manager.read_table(BALL_BY_BALL_TABLE_NAME)["match_id"].unique().tolist() == ["1"]
+        assert not list(Path(data_dir, BALL_BY_BALL_TABLE_NAME, "season=2023").rglob("*.parquet"))
+
+
+def test_read_table_rejects_unknown_partition_columns():
+    with tempfile.TemporaryDirectory() as data_dir:
+        with pytest.raises(ValueError):
+            ParquetManager(data_dir).read_table(BALL_BY_BALL_TABLE_NAME, venue="Gymkhana Club Ground")
+
+
+def test_columns_keep_their_declared_type_when_all_null_in_a_batch(sample_test_data: str):
+    # The sample match is won by wickets, so `won_by_runs` is all null in the
+    # first batch and `won_by_wickets` in the second.
+    won_by_runs_data: str = sample_test_data.replace('"by": {"wickets": 5}', '"by": {"runs": 20}')
+    with tempfile.TemporaryDirectory() as match_dir, tempfile.TemporaryDirectory() as data_dir:
+        parquet_manager = ParquetManager(data_dir)
+
+        parquet_manager.update_tables(make_match_batch(sample_test_data, match_dir, ["1"], "2023"))
+        parquet_manager.update_tables(make_match_batch(won_by_runs_data, match_dir, ["2"], "2023"))
+
+        match_info: pd.DataFrame = parquet_manager.read_table(MATCH_INFO_TABLE_NAME).sort_values("match_id")
+        assert match_info["won_by_runs"].tolist()[1] == 20
+        assert pd.isna(match_info["won_by_runs"].tolist()[0])
+        assert match_info["won_by_wickets"].tolist()[0] == 5
+        assert len(parquet_manager.read_table(BALL_BY_BALL_TABLE_NAME)) == 16
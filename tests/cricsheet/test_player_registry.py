@@ -0,0 +1,87 @@
+import io
+
+import pandas as pd
+import pytest
+
+from cricsheet.match_json_parser import MatchJSONParser
+from cricsheet.player_registry import PLAYER_KEY_COLUMN_DTYPES, PLAYER_TABLE_COLUMNS, PlayerRegistry
+
+
+def test_intern_hands_out_keys_in_order_of_first_sight():
+    player_registry = PlayerRegistry()
+
+    assert player_registry.intern(["b", "a", "b"], ["B", "A", "B"]).tolist() == [1, 2, 1]
+    assert player_registry.intern(["c", "a"]).tolist() == [3, 2]
+    assert player_registry.intern([]).dtype == "int32"
+    assert len(player_registry) == 3
+    assert player_registry.player_table.to_dict("list") == {
+        "player_key": [1, 2, 3],
+        "player_id": ["b", "a", "c"],
+        "player_name": ["B", "A", None]
+    }
+
+
+def test_registry_continues_after_loaded_players():
+    player_registry = PlayerRegistry(pd.DataFrame({
+        "player_key": [1, 5],
+        "player_id": ["a", "b"],
+        "player_name": ["A", "B"]
+    }, columns=PLAYER_TABLE_COLUMNS))
+
+    assert player_registry.get_new_players().empty
+    assert player_registry.intern(["b", "c"]).tolist() == [5, 6]
+    assert player_registry.get_new_players()["player_id"].tolist() == ["c"]
+
+    player_registry.mark_persisted()
+
+    assert player_registry.get_new_players().empty
+
+
+def get_complete_people_table(json_parser: MatchJSONParser) -> pd.DataFrame:
+    # The sample match's registry only lists the players of each team, while
+    # Cricsheet's lists everyone named in the match.
+    ball_by_ball_data: pd.DataFrame = json_parser.ball_by_ball_data
+    names: set = set(json_parser.people_registry)
+    for column in PLAYER_KEY_COLUMN_DTYPES:
+        names.update(ball_by_ball_data[column].dropna())
+    for fielders in ball_by_ball_data["fielders_in_dismissal"].dropna():
+        names.update(fielders)
+    return pd.DataFrame({
+        "match_id": json_parser.match_id,
+        "player": sorted(names),
+        "player_id": [json_parser.people_registry.get(name, f"id_{name}") for name in sorted(names)]
+    })
+
+
+def test_encode_ball_by_ball_table_replaces_names_by_keys(sample_test_data: str):
+    json_parser = MatchJSONParser(io.StringIO(sample_test_data))
+    json_parser.match_id = "1001"
+    people_table: pd.DataFrame = get_complete_people_table(json_parser)
+    player_keys: dict = dict(zip(people_table["player"], PlayerRegistry().intern(people_table["player_id"])))
+    player_registry = PlayerRegistry()
+
+    encoded_table: pd.DataFrame = player_registry.encode_ball_by_ball_table(
+        json_parser.ball_by_ball_data, people_table
+    )
+
+    for column, dtype in PLAYER_KEY_COLUMN_DTYPES.items():
+        assert str(encoded_table[column].dtype) == dtype
+    assert encoded_table["batsman"].tolist() == [
+        player_keys[name] for name in json_parser.ball_by_ball_data["batsman"]
+    ]
+    assert encoded_table["dismissed_batsman"].isna().sum() == 7
+    assert encoded_table["dismissed_batsman"].iloc[3] == player_keys["E Otieno"]
+    assert encoded_table["fielders_in_dismissal"].iloc[3] == [player_keys["AN Kervezee"]]
+    assert encoded_table["fielders_in_dismissal"].iloc[0] is None
+    assert (encoded_table.memory_usage(deep=True).sum()
+            < json_parser.ball_by_ball_data.memory_usage(deep=True).sum())
+
+
+def test_encode_ball_by_ball_table_rejects_unknown_players(sample_test_data: str):
+    json_parser = MatchJSONParser(io.StringIO(sample_test_data))
+    json_parser.match_id = "1001"
+
+    with pytest.raises(KeyError):
+        PlayerRegistry().encode_ball_by_ball_table(
+            json_parser.ball_by_ball_data, json_parser.people_table
+        )
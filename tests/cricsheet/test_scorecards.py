@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cricsheet.ball_by_ball_table_builder import BallByBallTableBuilder, compact_ball_by_ball_table
+from cricsheet.match_json_parser import MatchJSONParser
+from cricsheet.scorecards import (
+    BATTING_SCORECARD_COLUMNS,
+    BOWLING_FIGURES_COLUMNS,
+    get_batting_scorecard,
+    get_bowling_figures,
+    get_fall_of_wickets,
+    get_partnerships
+)
+
+
+@pytest.fixture()
+def sample_ball_by_ball_table(sample_test_data: str) -> pd.DataFrame:
+    json_parser = MatchJSONParser(sample_test_data.encode())
+    json_parser.match_id = "1001"
+    return json_parser.ball_by_ball_data
+
+
+def make_ball_by_ball_table(deliveries: list) -> pd.DataFrame:
+    # One innings of one over, from (batter, non-striker, bowler, batter
+    # runs, extras, wicket) tuples.
+    table_builder = BallByBallTableBuilder("1001")
+    table_builder.add_innings([{"over": 0, "deliveries": [
+        {
+            "batter": batter,
+            "non_striker": non_striker,
+            "bowler": bowler,
+            "runs": {"batter": runs, "extras": sum((extras or {}).values())},
+            **({"extras": extras} if extras else {}),
+            **({"wickets": [wicket]} if wicket else {})
+        }
+        for batter, non_striker, bowler, runs, extras, wicket in deliveries
+    ]}], "Kenya", 0)
+    return table_builder.to_frame()
+
+
+def test_batting_scorecard_of_sample_match(sample_ball_by_ball_table: pd.DataFrame):
+    batting_scorecard: pd.DataFrame = get_batting_scorecard(sample_ball_by_ball_table)
+
+    assert list(batting_scorecard.columns) == BATTING_SCORECARD_COLUMNS
+    assert batting_scorecard[["innings", "batting_position", "batsman", "runs", "balls_faced", "sixes"]] \
+        .values.tolist() == [
+            [1, 1, "AN Kervezee", 1, 1, 0],
+            [1, 2, "ES Szwarczynski", 0, 0, 0],
+            [2, 1, "E Otieno", 0, 2, 0],
+            [2, 2, "NN Odhiambo", 0, 0, 0],
+            [3, 1, "AN Kervezee", 6, 2, 1],
+            [3, 2, "ES Szwarczynski", 0, 0, 0],
+            [4, 1, "E Otieno", 1, 1, 0],
+            [4, 2, "NN Odhiambo", 0, 1, 0]
+        ]
+    otieno_first_innings: pd.Series = batting_scorecard.iloc[2]
+    assert otieno_first_innings["dismissal_type"] == "caught"
+    assert otieno_first_innings["dismissed_by"] == "B Zuiderent"
+    assert otieno_first_innings["strike_rate"] == 0
+    assert batting_scorecard["dismissal_type"].isna().sum() == 7
+    assert np.isnan(batting_scorecard.iloc[1]["strike_rate"])
+
+
+def test_bowling_figures_of_sample_match(sample_ball_by_ball_table: pd.DataFrame):
+    bowling_figures: pd.DataFrame = get_bowling_figures(sample_ball_by_ball_table)
+
+    assert list(bowling_figures.columns) == BOWLING_FIGURES_COLUMNS
+    assert bowling_figures[["innings", "bowler", "overs", "runs_conceded", "wickets", "wides"]].values.tolist() == [
+        [1, "NN Odhiambo", "0.1", 2, 0, 1],
+        [2, "B Zuiderent", "0.2", 0, 1, 0],
+        [3, "NN Odhiambo", "0.2", 6, 0, 0],
+        [4, "B Zuiderent", "0.2", 1, 0, 0]
+    ]
+
+
+def test_partnerships_and_fall_of_wickets_of_sample_match(sample_ball_by_ball_table: pd.DataFrame):
+    partnerships: pd.DataFrame = get_partnerships(sample_ball_by_ball_table)
+    fall_of_wickets: pd.DataFrame = get_fall_of_wickets(sample_ball_by_ball_table)
+
+    assert partnerships[["innings", "batsman_1", "batsman_2", "runs", "balls"]].values.tolist() == [
+        [1, "AN Kervezee", "ES Szwarczynski", 2, 1],
+        [2, "E Otieno", "NN Odhiambo", 0, 2],
+        [3, "AN Kervezee", "ES Szwarczynski", 6, 2],
+        [4, "E Otieno", "NN Odhiambo", 1, 2]
+    ]
+    assert fall_of_wickets[["innings", "wicket", "score", "overs", "dismissed_batsman"]].values.tolist() == [
+        [2, 1, 0, "0.2", "E Otieno"]
+    ]
+
+
+def test_only_bowler_dismissals_and_charged_extras_count_for_bowlers():
+    ball_by_ball_table: pd.DataFrame = make_ball_by_ball_table([
+        ("A", "B", "X", 0, {"byes": 4}, None),
+        ("A", "B", "X", 1, {"noballs": 1}, None),
+        ("B", "A", "X", 0, None, {"player_out": "A", "kind": "run out"}),
+        ("C", "B", "X", 4, None, None),
+        ("C", "B", "X", 0, None, {"player_out": "C", "kind": "lbw"}),
+        ("D", "B", "X", 0, {"legbyes": 1}, None),
+        ("B", "D", "X", 0, None, {"player_out": "B", "kind": "retired hurt"}),
+        ("D", "E", "X", 6, None, None)
+    ])
+
+    bowling_figures: pd.DataFrame = get_bowling_figures(ball_by_ball_table)
+    batting_scorecard: pd.DataFrame = get_batting_scorecard(ball_by_ball_table).set_index("batsman")
+    partnerships: pd.DataFrame = get_partnerships(ball_by_ball_table)
+    fall_of_wickets: pd.DataFrame = get_fall_of_wickets(ball_by_ball_table)
+
+    assert bowling_figures[["overs", "runs_conceded", "wickets", "noballs", "maidens"]].values.tolist() == [
+        ["1.1", 12, 1, 1, 0]
+    ]
+    assert batting_scorecard["batting_position"].to_dict() == {"A": 1, "B": 2, "C": 3, "D": 4, "E": 5}
+    assert batting_scorecard.loc["A", "dismissed_by"] is None
+    assert batting_scorecard.loc["C", "dismissed_by"] == "X"
+    assert batting_scorecard.loc["C", "fours"] == 1
+    assert partnerships[["partnership", "batsman_1", "batsman_2", "runs"]].values.tolist() == [
+        [1, "A", "B", 6], [2, "C", "B", 4], [3, "D", "B", 1], [4, "D", "E", 6]
+    ]
+    assert fall_of_wickets[["wicket", "score", "overs", "dismissed_batsman"]].values.tolist() == [
+        [1, 6, "0.2", "A"], [2, 10, "0.4", "C"]
+    ]
+
+
+def test_scorecards_of_batches_of_matches(sample_test_data: str):
+    tables: list = []
+    for match_id in ["1001", "1002"]:
+        json_parser = MatchJSONParser(sample_test_data.encode())
+        json_parser.match_id = match_id
+        tables.append(json_parser.ball_by_ball_data)
+    ball_by_ball_table: pd.DataFrame = pd.concat(tables, ignore_index=True)
+
+    batting_scorecard: pd.DataFrame = get_batting_scorecard(ball_by_ball_table)
+    fall_of_wickets: pd.DataFrame = get_fall_of_wickets(ball_by_ball_table)
+
+    assert len(batting_scorecard) == 16
+    assert batting_scorecard.groupby("match_id")["runs"].sum().to_dict() == {"1001": 8, "1002": 8}
+    assert fall_of_wickets["match_id"].tolist() == ["1001", "1002"]
+    assert fall_of_wickets["wicket"].tolist() == [1, 1]
+
+
+def test_scorecards_of_compact_tables(sample_ball_by_ball_table: pd.DataFrame):
+    compact_table: pd.DataFrame = compact_ball_by_ball_table(sample_ball_by_ball_table)
+
+    for get_scorecard in [get_batting_scorecard, get_bowling_figures, get_partnerships, get_fall_of_wickets]:
+        pd.testing.assert_frame_equal(
+            get_scorecard(compact_table), get_scorecard(sample_ball_by_ball_table), check_dtype=False
+        )
@@ -0,0 +1,42 @@
+import pytest
+
+from cricsheet.table_schemas import (
+    BALL_BY_BALL_TABLE_NAME,
+    MATCH_INFO_TABLE_NAME,
+    TableSchema,
+    get_table_schemas
+)
+
+
+def test_ball_by_ball_schema_uses_small_types_and_indexes_players():
+    table_schema: TableSchema = get_table_schemas()[BALL_BY_BALL_TABLE_NAME]
+    create_statements: list = table_schema.get_create_statements()
+
+    assert table_schema.columns["runs_by_batsman"] == "SMALLINT"
+    assert table_schema.columns["fielders_in_dismissal"] == "TEXT[]"
+    assert "runs_by_batsman" in table_schema.integer_columns
+    assert create_statements[0].endswith('PRIMARY KEY ("match_id", "innings", "over", "ball"))')
+    assert create_statements[1:] == [
+        'CREATE INDEX IF NOT EXISTS "ball_by_ball_batsman_idx" ON "ball_by_ball" ("batsman")',
+        'CREATE INDEX IF NOT EXISTS "ball_by_ball_bowler_idx" ON "ball_by_ball" ("bowler")'
+    ]
+    assert get_table_schemas()[MATCH_INFO_TABLE_NAME].columns["dates"] == "DATE[]"
+
+
+def test_ball_by_ball_schema_with_player_keys_and_season_partitions():
+    table_schema: TableSchema = get_table_schemas(player_keys=True, partition_by_season=True)[BALL_BY_BALL_TABLE_NAME]
+    create_statements: list = table_schema.get_create_statements()
+
+    assert table_schema.columns["batsman"] == "INTEGER"
+    assert table_schema.columns["fielders_in_dismissal"] == "INTEGER[]"
+    assert table_schema.primary_key[-1] == "season"
+    assert create_statements[0].endswith('PARTITION BY LIST ("season")')
+    assert create_statements[1] == (
+        'CREATE TABLE IF NOT EXISTS "ball_by_ball_default" PARTITION OF "ball_by_ball" DEFAULT'
+    )
+    assert table_schema.get_partition_name("2009/10") == "ball_by_ball_2009_10"
+
+
+def test_partition_column_must_be_in_primary_key():
+    with pytest.raises(ValueError):
+        TableSchema("deliveries", {"match_id": "TEXT", "season": "TEXT"}, ["match_id"], partition_column="season")